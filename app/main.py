@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -5,10 +7,24 @@ from starlette.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator 
 from prometheus_client import REGISTRY
 
-from app.routers import api
+from app.routers import api, serving
+from app.src.exporter.metrics_server import start_metrics_server, watch
 import os
 
-app = FastAPI(title="Snake AI Web App")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Exporteur interne sur un port dédié (si SNAKE_EXPORTER_PORT est défini)
+    start_metrics_server()
+    pool = serving.manager.start_pool(serving.INFERENCE_WORKERS, serving.INFERENCE_TORCH_THREADS)
+    watch(inference_pool=pool)
+    yield
+    # Arrêt propre des processus d'entraînement encore actifs
+    api.training_scheduler.shutdown()
+    serving.manager.stop_pool()
+
+
+app = FastAPI(title="Snake AI Web App", lifespan=lifespan)
 
 # Configuration CORS
 app.add_middleware(
@@ -1,45 +1,23 @@
 import asyncio
 import uuid
-import torch
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Optional
 import os
-import json
-import numpy as np
-from huggingface_hub import HfApi, hf_hub_download
-from stable_baselines3 import PPO
 from dotenv import load_dotenv
-from prometheus_client import Counter, REGISTRY
 from starlette.websockets import WebSocket, WebSocketDisconnect
 
 # Import du manager mis à jour
-from app.src.agent.training.train import train_snake, training_manager
+from app.src.agent.training.train import training_manager
+from app.src.agent.training.scheduler import TrainingScheduler
+from app.src.agent.training.checkpoints import get_checkpoint_manager
+from app.routers.serving import (
+    router as serving_router, ModelManager, manager, prediction_cache, game_sessions
+)
+from app.src.serving.hub import BroadcastHub
+from app.src.exporter import metrics_server
 
 load_dotenv()
 
-MODELE_LOADED_COUNTER = Counter('snake_model_loaded_total', 'Modèles chargés', ['grid_size'], registry=REGISTRY)
-GAMES_STARTED_COUNTER = Counter('snake_games_started_total', 'Parties lancées', ['grid_size'], registry=REGISTRY)
-
-
-class GameState(BaseModel): grid: List[List[int]]
-
-
-class ModelInfo(BaseModel):
-    uuid: str
-    grid_size: int
-    algorithm: str
-    date: str
-    final_mean_reward: Optional[float] = 0.0
-    game_mode: str | None = "classic"
-    n_envs: int | None = 4
-
-
-class LoadModelRequest(BaseModel): uuid: str; grid_size: int
-
-
-class StartGameRequest(BaseModel): grid_size: int
-
 
 class TrainRequest(BaseModel):
     base_uuid: str | None = None
@@ -47,96 +25,104 @@ class TrainRequest(BaseModel):
     timesteps: int = 50_000
     n_envs: int = 4
     game_mode: str = "classic"
+    vec_env: str = "dummy"
+    observation: str = "grid"  # "grid" ou "egocentric" (fenêtre centrée sur la tête, taille fixe)
+    view_radius: int = 5
+    profile: str = "phases"  # "off", "phases" ou "sample"
+    checkpoint_every: int | None = None  # Timesteps entre deux checkpoints (None : SNAKE_CHECKPOINT_EVERY, 0 : aucun)
+    hyperparams: dict | None = None  # Hyperparamètres PPO (ex. meilleure config d'un sweep), défauts SB3 sinon
 
 
 class TrainingResponse(BaseModel): run_id: str; status: str
 
 
-class ModelManager:
-    def __init__(self):
-        self.current_agent = None
-        self.current_uuid = None
-
-    def load_model(self, uuid: str, grid_size: int):
-        try:
-            path = hf_hub_download(repo_id="snakeRL/snake-rl-models",
-                                   filename=f"{grid_size}x{grid_size}/{uuid}/model.zip",
-                                   token=os.getenv("HF_HUB_TOKEN"))
-            self.current_agent = PPO.load(path)
-            self.current_uuid = uuid
-            return True
-        except Exception as e:
-            print(f"Load error: {e}")
-            return False
-
-
-manager = ModelManager()
+# Entraînements dans des processus dédiés (hors du processus qui sert /predict)
+training_scheduler = TrainingScheduler(
+    training_manager,
+    max_workers=int(os.getenv("SNAKE_TRAINING_WORKERS", "1")),
+    max_restarts=int(os.getenv("SNAKE_TRAINING_MAX_RESTARTS", "1")),
+    torch_threads=int(os.getenv("SNAKE_TRAINING_TORCH_THREADS", "1")),
+    nice=int(os.getenv("SNAKE_TRAINING_NICE", "10")),
+)
+# Sources lues par l'exporteur Prometheus au moment du scrape
+metrics_server.watch(training_state=training_manager, scheduler=training_scheduler, model_cache=manager.cache,
+                     prediction_cache=prediction_cache)
+# Progression des entraînements poussée aux WebSockets admin (plus de polling)
+training_hub = BroadcastHub()
+TERMINAL_STATUSES = ("finished", "cancelled", "error")
+
+
+def training_message(data):
+    """État du TrainingStateManager → message WebSocket de /ws/training/{run_id}"""
+    if data is None:
+        return {"status": "finished"}
+    status = data.get("status")
+    if status == "cancelled":
+        return {"status": "cancelled"}
+    if status == "error":
+        return {"status": "error", "message": (data.get("stats") or {}).get("message")}
+    return {
+        "progress": data.get("progress", 0),
+        "current_step": data.get("timesteps", 0),
+        "total_steps": data.get("total_timesteps", 1),
+        "stats": data.get("stats", {})
+    }
+
+
+def runs_message():
+    return {"type": "runs", "runs": list(training_manager.active_trainings.keys())}
+
+
+def _publish_training_event(run_id, data):
+    training_hub.publish(f"run:{run_id}", training_message(data))
+    runs = runs_message()
+    if runs != training_hub.latest("runs"):
+        training_hub.publish("runs", runs)
+
+
+training_manager.add_listener(_publish_training_event)
 router = APIRouter()
-
-
-@router.get("/models", response_model=List[ModelInfo])
-def list_models():
-    api = HfApi(token=os.getenv("HF_HUB_TOKEN"))
-    try:
-        files = api.list_repo_files(repo_id="snakeRL/snake-rl-models", repo_type="model")
-        models = []
-        for f in files:
-            if f.endswith("metadata.json"):
-                path = hf_hub_download(repo_id="snakeRL/snake-rl-models", filename=f, force_download=True,
-                                       token=os.getenv("HF_HUB_TOKEN"))
-                with open(path, "r") as j: data = json.load(j)
-                models.append(ModelInfo(
-                    uuid=data.get("uuid"), grid_size=data.get("grid_size"), algorithm=data.get("algorithm", "PPO"),
-                    date=data.get("date", "N/A"), final_mean_reward=data.get("final_mean_reward", 0.0),
-                    game_mode=data.get("game_mode", "classic"), n_envs=data.get("n_envs", 4)
-                ))
-        return sorted(models, key=lambda x: (x.grid_size, -(x.final_mean_reward or -999)))
-    except Exception as e:
-        raise HTTPException(500, str(e))
-
-
-@router.post("/load")
-def load_model(req: LoadModelRequest):
-    if manager.load_model(req.uuid, req.grid_size):
-        MODELE_LOADED_COUNTER.labels(grid_size=str(req.grid_size)).inc()
-        return {"status": "loaded", "uuid": req.uuid}
-    raise HTTPException(404, "Model not found")
-
-
-@router.post("/start")
-async def start_game(req: StartGameRequest):
-    GAMES_STARTED_COUNTER.labels(grid_size=str(req.grid_size)).inc()
-    return {"status": "ok"}
-
-
-@router.post("/predict")
-def predict(state: GameState):
-    if not manager.current_agent: return {"action": 0, "probabilities": [0] * 4}
-    obs = np.array(state.grid, dtype=np.float32)
-    action, _ = manager.current_agent.predict(obs, deterministic=True)
-    probs = [0.0] * 4
-    try:
-        with torch.no_grad():
-            t_obs = manager.current_agent.policy.obs_to_tensor(obs if obs.ndim > 2 else np.expand_dims(obs, 0))[0]
-            probs = manager.current_agent.policy.get_distribution(t_obs).distribution.probs.cpu().numpy()[0].tolist()
-    except:
-        pass
-    return {"action": int(action), "probabilities": probs}
+# Routes d'inférence (modèles, /predict, parties serveur) : voir app/routers/serving.py
+router.include_router(serving_router)
 
 
 @router.post("/train/start", response_model=TrainingResponse)
-def start_train(req: TrainRequest, bg: BackgroundTasks):
+def start_train(req: TrainRequest):
     run_id = str(uuid.uuid4())
-    bg.add_task(train_snake, run_id=run_id, timesteps=req.timesteps, grid_size=req.grid_size, n_envs=req.n_envs,
-                game_mode=req.game_mode, base_uuid=req.base_uuid)
-    return {"run_id": run_id, "status": "started"}
+    position = training_scheduler.submit(run_id, timesteps=req.timesteps, grid_size=req.grid_size, n_envs=req.n_envs,
+                                         game_mode=req.game_mode, base_uuid=req.base_uuid, vec_env=req.vec_env,
+                                         profile=req.profile, checkpoint_every=req.checkpoint_every,
+                                         hyperparams=req.hyperparams, observation=req.observation,
+                                         view_radius=req.view_radius)
+    return {"run_id": run_id, "status": "started" if position == 0 else "queued"}
+
+
+@router.post("/train/resume/{run_id}", response_model=TrainingResponse)
+def resume_train(run_id: str):
+    """Relance un run interrompu (redéploiement, annulation) depuis son dernier checkpoint"""
+    stats = training_scheduler.stats()
+    if run_id in stats["running"] or run_id in stats["queued"]:
+        raise HTTPException(status_code=409, detail="Run déjà en cours")
+    checkpoint = get_checkpoint_manager(run_id).latest()
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="Aucun checkpoint pour ce run")
+    training_manager.stop_training(run_id)  # Oublie l'état "cancelled" / "error" de la session précédente
+    # train_snake relit la configuration du run dans le checkpoint
+    config = checkpoint.state["config"]
+    position = training_scheduler.submit(run_id, timesteps=config["timesteps"], grid_size=config["grid_size"],
+                                         n_envs=config["n_envs"], game_mode=config["game_mode"],
+                                         base_uuid=config["base_uuid"], vec_env=config["vec_env"],
+                                         profile=config.get("profile", "phases"),
+                                         checkpoint_every=config.get("checkpoint_every"))
+    return {"run_id": run_id, "status": "started" if position == 0 else "queued"}
 
 
 # --- NOUVEAU : Endpoint STOP ---
 @router.delete("/train/stop/{run_id}")
 def stop_train(run_id: str):
-    # Appel de la méthode qu'on a ajoutée dans train.py
-    training_manager.cancel_job(run_id)
+    # Retire le job de la file, ou signale l'arrêt au processus worker
+    if not training_scheduler.cancel(run_id):
+        training_manager.cancel_job(run_id)
     return {"status": "stop_requested"}
 
 
@@ -144,30 +130,56 @@ def stop_train(run_id: str):
 def list_active(): return list(training_manager.active_trainings.keys())
 
 
-# --- MODIFIÉ : WebSocket avec données précises ---
+@router.get("/train/queue")
+def training_queue(): return training_scheduler.stats()
+
+
+# --- WebSockets poussés par le hub (dernier état à la connexion, puis chaque nouvel événement) ---
+async def _forward_topic(websocket: WebSocket, topic: str, initial, stop_on_terminal: bool = False):
+    """Relaie le topic au client jusqu'à sa déconnexion (surveillée en parallèle de la file)"""
+
+    async def forward():
+        async for message in training_hub.subscribe(topic, initial=initial):
+            await websocket.send_json(message)
+            if stop_on_terminal and message.get("status") in TERMINAL_STATUSES:
+                return
+
+    async def watch_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.create_task(forward()), asyncio.create_task(watch_disconnect())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 @router.websocket("/ws/training/{run_id}")
 async def ws_endpoint(websocket: WebSocket, run_id: str):
+    await websocket.accept()
+    topic = f"run:{run_id}"
+    try:
+        data = training_manager.get_status(run_id)
+        if data is None and training_hub.latest(topic) is None:
+            # Run inconnu ou déjà terminé
+            await websocket.send_json({"status": "finished"})
+            return
+        await _forward_topic(websocket, topic, training_message(data), stop_on_terminal=True)
+    except WebSocketDisconnect:
+        pass
+
+
+@router.websocket("/ws/trainings")
+async def ws_trainings(websocket: WebSocket):
+    """Liste des runs actifs, poussée à chaque création / fin de run (remplace le polling de /train/active)"""
     await websocket.accept()
     try:
-        while True:
-            data = training_manager.get_status(run_id)
-
-            if data:
-                # Si annulé, on prévient le front
-                if data.get("status") == "cancelled":
-                    await websocket.send_json({"status": "cancelled"})
-                    break
-
-                # Envoi des données complètes pour le graph et la barre
-                await websocket.send_json({
-                    "progress": data.get("progress", 0),
-                    "current_step": data.get("timesteps", 0),
-                    "total_steps": data.get("total_timesteps", 1),
-                    "stats": data.get("stats", {})
-                })
-            else:
-                await websocket.send_json({"status": "finished"})
-                break
-            await asyncio.sleep(0.5)  # Mise à jour plus rapide (0.5s)
+        await _forward_topic(websocket, "runs", runs_message())
     except WebSocketDisconnect:
         pass
\ No newline at end of file
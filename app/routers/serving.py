@@ -0,0 +1,471 @@
+import asyncio
+import json
+import os
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from fastapi import APIRouter, HTTPException, Response
+from prometheus_client import Counter, REGISTRY
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app.src.agent.utils.catalog import get_catalog
+from app.src.env.observations import observation_from_grid, observation_spec, spec_from_space
+from app.src.serving import protocol
+from app.src.serving.batching import batcher
+from app.src.serving.model_cache import ModelCache, LoadedModel, estimate_model_bytes
+from app.src.serving.prediction_cache import PredictionCache
+from app.src.serving.sessions import GameSessionManager
+
+# Routes d'inférence seules (modèles, /predict, parties serveur), partagées par l'app complète
+# (app/main.py) et l'app de serving (app/src/serving/main.py). Rien ici n'importe l'entraînement
+# ni mlflow ; torch et SB3 ne sont importés qu'au chargement du premier modèle.
+load_dotenv()
+
+MODELE_LOADED_COUNTER = Counter('snake_model_loaded_total', 'Modèles chargés', ['grid_size'], registry=REGISTRY)
+GAMES_STARTED_COUNTER = Counter('snake_games_started_total', 'Parties lancées', ['grid_size'], registry=REGISTRY)
+
+
+class GameState(BaseModel):
+    grid: List[List[int]]
+    uuid: Optional[str] = None  # Modèle explicite
+    session_id: Optional[str] = None  # Ou modèle choisi par ce client via /load
+    # Requis par les modèles à observation égocentrique (la grille ne distingue pas la tête du corps)
+    head: Optional[List[int]] = None  # [x, y] comme côté navigateur
+    wall_timer: int = 0
+    wall_cooldown: int = 0
+
+
+class ModelInfo(BaseModel):
+    uuid: str
+    grid_size: int
+    algorithm: str
+    date: str
+    final_mean_reward: Optional[float] = 0.0
+    game_mode: str | None = "classic"
+    n_envs: int | None = 4
+
+
+class LoadModelRequest(BaseModel): uuid: str; grid_size: int; session_id: Optional[str] = None
+
+
+class StartGameRequest(BaseModel): grid_size: int
+
+
+class ModelManager:
+    """
+    Modèles servis : cache LRU multi-modèles + choix du modèle par session.
+    current_uuid reste le modèle par défaut (requêtes sans uuid ni session_id).
+
+    variant : variante servie quand le modèle en a une ("int8", "distilled", voir
+    agent/optimizing/variants.py) dont l'accord avec le modèle complet atteint min_agreement ;
+    sinon model.zip complet.
+
+    pool : pool de workers d'inférence (start_pool) ; les modèles complets chargés ensuite y sont
+    partagés et leurs forwards tournent dans les workers. Variantes et modèles hors CPU restent en processus.
+    """
+
+    MAX_SESSIONS = 10_000
+
+    def __init__(self, cache_mb: float = 256, variant: str = "full", min_agreement: float = 0.95):
+        self.cache = ModelCache(max_bytes=int(cache_mb * 1024 * 1024), on_evict=self._on_evict)
+        self.pool = None
+        self.current_uuid = None
+        self.sessions = OrderedDict()  # session_id -> uuid
+        self.variant = variant
+        self.min_agreement = min_agreement
+
+    @property
+    def current_agent(self):
+        entry = self.cache.peek(self.current_uuid) if self.current_uuid else None
+        return entry.agent if entry else None
+
+    @property
+    def current_runner(self):
+        entry = self.cache.peek(self.current_uuid) if self.current_uuid else None
+        return entry.runner if entry else None
+
+    def load_model(self, uuid: str, grid_size: int, session_id: str = None):
+        if self.ensure_loaded(uuid, grid_size) is None:
+            return False
+        if session_id:
+            self.sessions[session_id] = uuid
+            self.sessions.move_to_end(session_id)
+            while len(self.sessions) > self.MAX_SESSIONS:
+                self.sessions.popitem(last=False)
+        else:
+            self.current_uuid = uuid
+        return True
+
+    def ensure_loaded(self, uuid: str, grid_size: int):
+        """Retourne le modèle depuis le cache, ou le télécharge et l'y insère"""
+        entry = self.cache.get(uuid)
+        if entry is not None:
+            return entry
+        try:
+            catalog = get_catalog()
+            model_path = catalog.model_path(uuid) or f"{grid_size}x{grid_size}/{uuid}/model.zip"
+            metadata = catalog.get(uuid, refresh_on_miss=False) or {}
+            variant = self._load_variant(catalog, uuid, grid_size, metadata)
+            if variant is not None:
+                return self.cache.put(variant)
+
+            # Imports lourds différés au premier modèle complet (une variante n'a besoin que de torch)
+            from stable_baselines3 import PPO
+            from app.src.serving.inference import PolicyRunner
+
+            agent = PPO.load(catalog.store.download(model_path))
+            # Observation enregistrée dans les métadonnées, sinon déduite de l'espace du modèle
+            observation = observation_spec(metadata) if metadata.get("observation") \
+                else spec_from_space(agent.observation_space)
+            if self.pool is not None and agent.device.type == "cpu":
+                runner = self.pool.register(uuid, agent.policy)
+            else:
+                runner = PolicyRunner(agent.policy)
+            return self.cache.put(LoadedModel(uuid, grid_size, agent, runner, estimate_model_bytes(agent),
+                                              observation))
+        except Exception as e:
+            print(f"Load error: {e}")
+            return None
+
+    def _load_variant(self, catalog, uuid: str, grid_size: int, metadata: dict):
+        """LoadedModel de la variante demandée, ou None (pas de variante, ou accord insuffisant)"""
+        info = (metadata.get("variants") or {}).get(self.variant)
+        if self.variant == "full" or not info or info.get("agreement", 0) < self.min_agreement:
+            return None
+        from app.src.serving.inference import VariantRunner
+
+        path = catalog.store.download(f"{metadata['folder']}/{info['file']}")
+        runner = VariantRunner.load(path, info["obs_shape"], self.variant)
+        return LoadedModel(uuid, grid_size, None, runner, os.path.getsize(path), info["observation"], self.variant)
+
+    def start_pool(self, n_workers: int, torch_threads: int = 1):
+        """Démarre le pool de workers d'inférence (rien si n_workers <= 0 ; torch importé seulement ici)"""
+        if n_workers <= 0 or self.pool is not None:
+            return self.pool
+        from app.src.serving.worker_pool import InferencePool
+
+        self.pool = InferencePool(n_workers, torch_threads=torch_threads)
+        print(f"🧵 Pool d'inférence : {n_workers} workers x {torch_threads} thread(s) torch")
+        return self.pool
+
+    def stop_pool(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def _on_evict(self, entry):
+        if self.pool is not None:
+            self.pool.unregister(entry.uuid)
+
+    def resolve_uuid(self, uuid: str = None, session_id: str = None):
+        if uuid:
+            return uuid
+        if session_id and session_id in self.sessions:
+            return self.sessions[session_id]
+        return self.current_uuid
+
+
+manager = ModelManager(
+    cache_mb=float(os.getenv("SNAKE_MODEL_CACHE_MB", "256")),
+    variant=os.getenv("SNAKE_MODEL_VARIANT", "full"),
+    min_agreement=float(os.getenv("SNAKE_VARIANT_MIN_AGREEMENT", "0.95")),
+)
+# Réponses de /predict déjà calculées (0 Mo : désactivé)
+prediction_cache = PredictionCache(
+    max_bytes=int(float(os.getenv("SNAKE_PREDICT_CACHE_MB", "32")) * 1024 * 1024),
+    symmetries=os.getenv("SNAKE_PREDICT_CACHE_SYMMETRY", "0") == "1",
+)
+game_sessions = GameSessionManager(idle_timeout=float(os.getenv("SNAKE_SESSION_IDLE_S", "120")))
+GAME_TICK_SECONDS = float(os.getenv("SNAKE_SESSION_TICK_MS", "150")) / 1000.0
+# Pool de processus d'inférence démarré par le lifespan de l'app (0 : forwards dans le processus API)
+INFERENCE_WORKERS = int(os.getenv("SNAKE_INFERENCE_WORKERS", "0"))
+INFERENCE_TORCH_THREADS = int(os.getenv("SNAKE_INFERENCE_TORCH_THREADS", "1"))
+# Modèles liés (bind) au plus par connexion /ws/predict (model_id sur u16 : protocol.MAX_MODEL_ID au maximum)
+PREDICT_MAX_BINDINGS = min(int(os.getenv("SNAKE_PREDICT_MAX_BINDINGS", "256")), protocol.MAX_MODEL_ID)
+
+router = APIRouter()
+
+
+@router.get("/models", response_model=List[ModelInfo])
+def list_models():
+    try:
+        # Lecture mémoire du catalogue local (rafraîchi en arrière-plan quand il expire)
+        catalog = get_catalog()
+        catalog.maybe_refresh()
+        models = []
+        for data in catalog.list_models():
+            models.append(ModelInfo(
+                uuid=data.get("uuid"), grid_size=data.get("grid_size"), algorithm=data.get("algorithm", "PPO"),
+                date=data.get("date", "N/A"), final_mean_reward=data.get("final_mean_reward", 0.0),
+                game_mode=data.get("game_mode", "classic"), n_envs=data.get("n_envs", 4)
+            ))
+        return sorted(models, key=lambda x: (x.grid_size, -(x.final_mean_reward or -999)))
+    except Exception as e:
+        raise HTTPException(500, str(e))
+
+
+@router.post("/load")
+def load_model(req: LoadModelRequest):
+    if manager.load_model(req.uuid, req.grid_size, req.session_id):
+        MODELE_LOADED_COUNTER.labels(grid_size=str(req.grid_size)).inc()
+        return {"status": "loaded", "uuid": req.uuid}
+    raise HTTPException(404, "Model not found")
+
+
+@router.post("/start")
+async def start_game(req: StartGameRequest):
+    GAMES_STARTED_COUNTER.labels(grid_size=str(req.grid_size)).inc()
+    return {"status": "ok"}
+
+
+async def resolve_entry(model_uuid: str, grid_size: int):
+    """Modèle depuis le cache, sinon chargé hors de la boucle asyncio (None si introuvable)"""
+    entry = manager.cache.get(model_uuid)
+    if entry is None:
+        # Modèle évincé ou jamais chargé : la taille de grille se déduit de l'observation
+        entry = await run_in_threadpool(manager.ensure_loaded, model_uuid, grid_size)
+    return entry
+
+
+async def infer(model_uuid: str, entry, grid, head=None, wall_timer: int = 0, wall_cooldown: int = 0):
+    """
+    (action, probabilités) pour une grille, communs à /predict et /ws/predict.
+    ValueError si la grille ne convient pas au modèle.
+    """
+    # Position déjà vue pour ce modèle : réponse servie sans forward
+    if entry.observation["mode"] == "egocentric":
+        key, transform = prediction_cache.key(model_uuid, grid, head, (wall_timer, wall_cooldown))
+    else:
+        key, transform = prediction_cache.key(model_uuid, grid)
+    cached = prediction_cache.get(key, transform)
+    if cached is not None:
+        return cached
+
+    obs = observation_from_grid(grid, entry.observation, head, wall_timer, wall_cooldown)
+    # Regroupé avec les requêtes concurrentes du même modèle (un seul forward par batch)
+    action, probs = await batcher.predict(model_uuid, entry.runner, obs)
+    prediction_cache.put(key, transform, action, probs)
+    return action, probs
+
+
+@router.post("/predict")
+async def predict(state: GameState):
+    model_uuid = manager.resolve_uuid(state.uuid, state.session_id)
+    if not model_uuid: return {"action": 0, "probabilities": [0] * 4}
+    entry = await resolve_entry(model_uuid, len(state.grid))
+    if entry is None: return {"action": 0, "probabilities": [0] * 4}
+    head = (state.head[1], state.head[0]) if state.head else None
+    try:
+        action, probs = await infer(model_uuid, entry, np.array(state.grid), head, state.wall_timer,
+                                    state.wall_cooldown)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {"action": action, "probabilities": probs}
+
+
+@router.get("/predict/cache")
+def predict_cache_stats():
+    """Taux de hit et mémoire du cache de réponses de /predict"""
+    return prediction_cache.stats()
+
+
+@router.get("/inference/pool")
+def inference_pool_stats():
+    """Workers d'inférence : vivants, batchs en vol et traités par worker, poids partagés"""
+    return manager.pool.stats() if manager.pool is not None else {"workers": 0}
+
+
+@router.get("/sessions/{session_id}/replay")
+def session_replay(session_id: str):
+    """Partie serveur en cours au format EpisodeLog (quelques octets au lieu des grilles complètes)"""
+    session = game_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(404, "Session not found")
+    return Response(content=session.replay(), media_type="application/octet-stream",
+                    headers={"Content-Disposition": f'attachment; filename="{session_id}.snkr"'})
+
+
+# --- CANAL BINAIRE D'INFÉRENCE (WebSocket) ---
+@router.websocket("/ws/predict")
+async def ws_predict(websocket: WebSocket):
+    """
+    /predict sur une connexion persistante, en trames binaires (format : app/src/serving/protocol.py).
+    Message texte {"type": "bind", "uuid", "grid_size"} → {"type": "bound", "model_id", "uuid"} :
+    model_id (≥ 1) désigne ensuite ce modèle dans les trames ; 0 : modèle par défaut du serveur.
+    Chaque message binaire est traité dans sa propre tâche : les requêtes en vol de plusieurs
+    messages (ou parties) sont regroupées par le batcher, les réponses portent leur seq.
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    models = {}  # model_id -> uuid
+    tasks = set()
+
+    async def answer(seq, model_id, grid, head, wall_timer, wall_cooldown):
+        model_uuid = models.get(model_id) if model_id else manager.resolve_uuid()
+        entry = await resolve_entry(model_uuid, grid.shape[0]) if model_uuid else None
+        if entry is None:
+            return protocol.encode_reply(seq, protocol.STATUS_UNKNOWN_MODEL)
+        try:
+            action, probs = await infer(model_uuid, entry, grid, head, wall_timer, wall_cooldown)
+        except ValueError:
+            return protocol.encode_reply(seq, protocol.STATUS_BAD_FRAME)
+        except Exception as e:
+            # Toujours une réponse par seq : le client n'attend jamais indéfiniment
+            print(f"Inference error: {e}")
+            return protocol.encode_reply(seq, protocol.STATUS_SERVER_ERROR)
+        return protocol.encode_reply(seq, protocol.STATUS_OK, action, probs)
+
+    async def handle(data):
+        try:
+            requests = protocol.decode_requests(data)
+        except protocol.FrameError as e:
+            async with send_lock:
+                await websocket.send_json({"type": "error", "message": str(e)})
+            return
+        replies = await asyncio.gather(*(answer(*request) for request in requests))
+        async with send_lock:
+            await websocket.send_bytes(b"".join(replies))
+
+    async def bind(msg):
+        try:
+            model_uuid, grid_size = msg["uuid"], int(msg["grid_size"])
+        except (KeyError, TypeError, ValueError):
+            return {"type": "error", "message": "bind : uuid et grid_size requis"}
+        if model_uuid not in models.values() and len(models) >= PREDICT_MAX_BINDINGS:
+            return {"type": "error", "message": f"bind : {PREDICT_MAX_BINDINGS} modèles au plus par connexion"}
+        if await run_in_threadpool(manager.ensure_loaded, model_uuid, grid_size) is None:
+            return {"type": "error", "message": "Model not found"}
+        model_id = next((i for i, u in models.items() if u == model_uuid), len(models) + 1)
+        models[model_id] = model_uuid
+        MODELE_LOADED_COUNTER.labels(grid_size=str(grid_size)).inc()
+        return {"type": "bound", "model_id": model_id, "uuid": model_uuid}
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                task = asyncio.create_task(handle(message["bytes"]))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            elif message.get("text") is not None:
+                try:
+                    msg = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    msg = None
+                reply = await bind(msg) if isinstance(msg, dict) and msg.get("type") == "bind" else \
+                    {"type": "error", "message": "Message texte attendu : bind"}
+                async with send_lock:
+                    await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+# --- PARTIES CÔTÉ SERVEUR (WebSocket) ---
+@router.websocket("/ws/game")
+async def ws_game(websocket: WebSocket):
+    """
+    Partie jouée par le serveur (SnakeEnv + policy), frames delta poussées à chaque tick.
+    Messages client : start {uuid, grid_size, game_mode, session_id}, place_food / place_wall {x, y},
+    pause, resume, reset.
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    state = {"session": None}
+
+    async def send(message):
+        async with send_lock:
+            await websocket.send_json(message)
+
+    async def start(msg):
+        try:
+            model_uuid, grid_size = str(msg["uuid"]), int(msg["grid_size"])
+        except (KeyError, TypeError, ValueError):
+            await send({"type": "error", "message": "start : uuid et grid_size (entier) requis"})
+            return
+        entry = await run_in_threadpool(manager.ensure_loaded, model_uuid, grid_size)
+        if entry is None:
+            await send({"type": "error", "message": "Model not found"})
+            return
+        session_id = msg.get("session_id") or str(uuid.uuid4())
+        session = game_sessions.get(session_id)
+        if session is not None and session.model_uuid == model_uuid and not session.dead:
+            # Reconnexion : on reprend la partie en cours
+            session.touch()
+            snapshot = session.snapshot()
+        else:
+            session = game_sessions.create(session_id, model_uuid, entry.runner, grid_size,
+                                           msg.get("game_mode") or "classic", entry.observation)
+            snapshot = session.reset()
+            GAMES_STARTED_COUNTER.labels(grid_size=str(grid_size)).inc()
+        state["session"] = session
+        await send(snapshot)
+
+    async def reader():
+        while True:
+            # Message mal formé : réponse d'erreur, la partie continue
+            try:
+                msg = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError:
+                msg = None
+            if not isinstance(msg, dict):
+                await send({"type": "error", "message": "Message JSON (objet) attendu"})
+                continue
+            kind = msg.get("type")
+            session = state["session"]
+            if kind == "start":
+                await start(msg)
+            elif session is None:
+                await send({"type": "error", "message": "Send 'start' first"})
+            elif kind in ("place_food", "place_wall"):
+                try:
+                    x, y = int(msg.get("x", 0)), int(msg.get("y", 0))
+                except (TypeError, ValueError):
+                    await send({"type": "error", "message": f"{kind} : x et y (entiers) requis"})
+                    continue
+                session.interact(kind, x, y)
+            elif kind in ("pause", "resume"):
+                session.paused = kind == "pause"
+                session.touch()
+            elif kind == "reset":
+                session.touch()
+                GAMES_STARTED_COUNTER.labels(grid_size=str(session.env.grid_size)).inc()
+                await send(session.reset())
+
+    async def ticker():
+        while True:
+            await asyncio.sleep(GAME_TICK_SECONDS)
+            session = state["session"]
+            if session is None or session.paused or session.dead:
+                continue
+            try:
+                action, probs = await batcher.predict(session.model_uuid, session.runner, session.observation())
+            except Exception as e:
+                # Échec d'inférence (worker arrêté, pool fermé...) : partie en pause, le client peut reprendre
+                print(f"Inference error: {e}")
+                session.paused = True
+                await send({"type": "error", "message": "Inference error", "paused": True})
+                continue
+            if state["session"] is session and not session.paused:
+                session.touch()
+                await send(session.step(action, probs))
+
+    tasks = [asyncio.create_task(reader()), asyncio.create_task(ticker())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,217 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from app.src.env.snake_env import SnakeEnv
+from app.src.env.observations import spec_from_space
+from app.src.env.rendering import DEFAULT_CELL_SIZE, open_frame_writer, render_indexed
+from app.src.agent.utils.catalog import get_catalog
+from app.src.agent.utils.model_store import DEFAULT_REPO_ID
+
+
+# =============================================================================
+# 1. ROLLOUTS BATCHÉS
+# =============================================================================
+def _record_frames(envs, writers, idx, cell_size: int):
+    """Rasterise les parties idx en un appel et envoie chaque frame à son writer"""
+    grids = np.stack([envs[i]._grid for i in idx])
+    heads = np.array([envs[i].snake[0] for i in idx])
+    for i, frame in zip(idx, render_indexed(grids, heads, cell_size)):
+        writers[i].write(frame)
+
+
+def play_episodes(runner, grid_size: int, seeds, game_mode: str = "classic", max_steps: int = None,
+                  record_dir: str = None, record_format: str = "gif", cell_size: int = DEFAULT_CELL_SIZE):
+    """
+    Joue un épisode par seed, toutes les parties en parallèle :
+    à chaque pas, un seul forward de la policy sur les grilles des parties encore en vie.
+    Retourne une liste de dicts {seed, score, length, reward, death_cause}.
+    L'observation (grille ou égocentrique) est celle attendue par la policy du runner.
+    record_dir : chaque épisode est filmé dans record_dir/episode_{seed}.{record_format}
+    ("gif" ou "snkf", archive de frames brutes), rendu NumPy par lot, sans pygame.
+    """
+    observation = spec_from_space(runner.policy.observation_space)
+    env_kwargs = {"grid_size": grid_size, "game_mode": game_mode, "obs_mode": observation["mode"]}
+    if observation["mode"] == "egocentric":
+        env_kwargs["view_radius"] = observation["radius"]
+    if max_steps is not None:
+        env_kwargs["max_steps"] = max_steps
+    envs = [SnakeEnv(**env_kwargs) for _ in seeds]
+
+    obs = np.stack([env.reset(seed=int(seed))[0] for env, seed in zip(envs, seeds)]).astype(np.float32)
+    rewards = np.zeros(len(envs))
+    live = np.arange(len(envs))
+    results = [None] * len(envs)
+    writers = None
+    if record_dir is not None:
+        Path(record_dir).mkdir(parents=True, exist_ok=True)
+        writers = [open_frame_writer(Path(record_dir) / f"episode_{int(seed)}.{record_format}") for seed in seeds]
+        _record_frames(envs, writers, live, cell_size)
+
+    while live.size:
+        actions, _ = runner.predict_batch(obs[live])
+        still_alive = np.ones(live.size, dtype=bool)
+        for k, (i, action) in enumerate(zip(live, actions)):
+            env = envs[i]
+            ob, reward, terminated, truncated, info = env.step(int(action))
+            obs[i] = ob
+            rewards[i] += reward
+            if terminated or truncated:
+                still_alive[k] = False
+                results[i] = {
+                    "seed": int(seeds[i]), "score": len(env.snake) - 1, "length": env.step_count,
+                    "reward": float(rewards[i]),
+                    "death_cause": info.get("death_cause") if terminated else "timeout",
+                }
+        if writers is not None:
+            _record_frames(envs, writers, live, cell_size)
+            for i in live[~still_alive]:
+                writers[i].close()
+        live = live[still_alive]
+    return results
+
+
+# =============================================================================
+# 2. POOL DE PROCESSUS
+# =============================================================================
+_worker_runner = None
+
+
+def _init_worker(model_path: str, torch_threads: int):
+    """Chargé une fois par processus : le modèle reste en mémoire pour tous ses lots"""
+    global _worker_runner
+    import torch
+    from stable_baselines3 import PPO
+    from app.src.serving.inference import PolicyRunner
+
+    torch.set_num_threads(torch_threads)
+    agent = PPO.load(model_path, device="cpu")
+    _worker_runner = PolicyRunner(agent.policy)
+
+
+def _play_chunk(grid_size, seeds, game_mode, max_steps, record_dir=None, record_format="gif"):
+    return play_episodes(_worker_runner, grid_size, seeds, game_mode, max_steps, record_dir, record_format)
+
+
+def _distribution(values):
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        "mean": float(values.mean()), "std": float(values.std()), "min": float(values.min()),
+        "p10": float(np.percentile(values, 10)), "median": float(np.median(values)),
+        "p90": float(np.percentile(values, 90)), "max": float(values.max()),
+    }
+
+
+def summarize(results, elapsed: float):
+    """Agrège les épisodes : distributions score / longueur, causes de mort, débit"""
+    causes = Counter(r["death_cause"] for r in results)
+    return {
+        "episodes": len(results),
+        "score": _distribution([r["score"] for r in results]),
+        "length": _distribution([r["length"] for r in results]),
+        "reward": _distribution([r["reward"] for r in results]),
+        "death_causes": {cause: count / len(results) for cause, count in causes.most_common()},
+        "elapsed_seconds": round(elapsed, 3),
+        "episodes_per_second": round(len(results) / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+# =============================================================================
+# 3. ÉVALUATION D'UN MODÈLE
+# =============================================================================
+def evaluate_model(
+        uuid: str,
+        n_episodes: int = 1000,
+        game_mode: str = "classic",
+        n_workers: int = None,
+        seed: int = 0,
+        max_steps: int = None,
+        chunk_size: int = 64,
+        hf_repo_id: str = DEFAULT_REPO_ID,
+        save: bool = True,
+        record_dir: str = None,
+        record_format: str = "gif"
+):
+    """
+    Évalue un modèle du catalogue sur n_episodes parties seedées (seed, seed+1, ...).
+
+    Les seeds sont découpées en lots de chunk_size répartis sur n_workers processus
+    (1 thread torch chacun). Le rapport est écrit dans metadata.json sous
+    "evaluations"[game_mode] si save=True.
+    record_dir : chaque épisode est aussi filmé (GIF ou archive de frames, voir play_episodes).
+    """
+    catalog = get_catalog(hf_repo_id)
+    entry = catalog.get(uuid)
+    if not entry:
+        raise ValueError(f"Modèle {uuid} introuvable dans le catalogue")
+    grid_size = entry["grid_size"]
+    model_path = catalog.store.download(f"{entry['folder']}/model.zip")
+
+    seeds = list(range(seed, seed + n_episodes))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, n_episodes, chunk_size)]
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(chunks)))
+
+    print(f"🧪 Évaluation {uuid} : {n_episodes} épisodes ({game_mode}) sur {n_workers} worker(s)")
+    start = time.perf_counter()
+    if n_workers == 1:
+        _init_worker(model_path, torch_threads=1)
+        results = [r for chunk in chunks
+                   for r in _play_chunk(grid_size, chunk, game_mode, max_steps, record_dir, record_format)]
+    else:
+        with ProcessPoolExecutor(n_workers, mp_context=mp.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(model_path, 1)) as pool:
+            futures = [pool.submit(_play_chunk, grid_size, chunk, game_mode, max_steps, record_dir, record_format)
+                       for chunk in chunks]
+            results = [r for future in futures for r in future.result()]
+    elapsed = time.perf_counter() - start
+
+    report = {
+        **summarize(results, elapsed),
+        "game_mode": game_mode, "seed": seed, "max_steps": max_steps, "n_workers": n_workers,
+        "evaluated_at": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+    }
+    print(f"✅ Score moyen {report['score']['mean']:.2f} — {report['episodes_per_second']} épisodes/s")
+
+    if save:
+        save_evaluation(catalog, entry, report)
+    return report
+
+
+def save_evaluation(catalog, entry: dict, report: dict):
+    """Ajoute le rapport au metadata.json du modèle (store + catalogue local)"""
+    with open(catalog.store.download(f"{entry['folder']}/metadata.json"), "r") as f:
+        metadata = json.load(f)
+    metadata.setdefault("evaluations", {})[report["game_mode"]] = report
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with open(Path(temp_dir) / "metadata.json", "w") as f:
+            json.dump(metadata, f, indent=4)
+        catalog.store.upload_folder(temp_dir, entry["folder"])
+    catalog.add(metadata, folder=entry["folder"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Évaluation parallèle d'un modèle Snake")
+    parser.add_argument("uuid")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--game-mode", default="classic")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=None)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--record-dir", default=None, help="Filme chaque épisode dans ce dossier")
+    parser.add_argument("--record-format", choices=["gif", "snkf"], default="gif")
+    args = parser.parse_args()
+
+    evaluate_model(args.uuid, n_episodes=args.episodes, game_mode=args.game_mode, n_workers=args.workers,
+                   seed=args.seed, max_steps=args.max_steps, save=not args.no_save, record_dir=args.record_dir,
+                   record_format=args.record_format)
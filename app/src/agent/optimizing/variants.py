@@ -0,0 +1,191 @@
+import argparse
+import copy
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import torch
+from stable_baselines3 import PPO
+from torch import nn
+
+from app.src.env.observations import spec_from_space
+from app.src.env.snake_vec_env import SnakeVecEnv
+from app.src.agent.utils.catalog import get_catalog
+from app.src.agent.utils.model_store import DEFAULT_REPO_ID
+from app.src.serving.inference import PolicyRunner, VariantRunner
+
+# Variantes servables d'un modèle, rangées à côté de model.zip dans son dossier
+VARIANT_FILES = {"int8": "model_int8.pt", "distilled": "model_distilled.pt"}
+DEFAULT_DISTILL_HIDDEN = (32, 32)
+
+
+# =============================================================================
+# 1. VARIANTES
+# =============================================================================
+def actor_network(policy):
+    """Copie du chemin acteur d'une MlpPolicy (features → mlp acteur → logits), sans la value"""
+    return nn.Sequential(copy.deepcopy(policy.pi_features_extractor), copy.deepcopy(policy.mlp_extractor.policy_net),
+                         copy.deepcopy(policy.action_net)).cpu().eval()
+
+
+def quantize_int8(policy):
+    """Acteur quantifié dynamiquement (poids des Linear en int8), figé en TorchScript"""
+    model = torch.ao.quantization.quantize_dynamic(actor_network(policy), {nn.Linear}, dtype=torch.qint8)
+    example = torch.zeros((1, *policy.observation_space.shape), dtype=torch.float32)
+    return torch.jit.trace(model, example)
+
+
+def distill(states, teacher_probs, hidden=DEFAULT_DISTILL_HIDDEN, epochs: int = 20, batch_size: int = 256,
+            lr: float = 1e-3, seed: int = 0):
+    """
+    Petit MLP entraîné à reproduire la distribution d'actions du professeur
+    (entropie croisée sur ses probabilités), figé en TorchScript.
+    """
+    torch.manual_seed(seed)
+    layers, width = [nn.Flatten()], int(np.prod(states.shape[1:]))
+    for size in hidden:
+        layers += [nn.Linear(width, size), nn.Tanh()]
+        width = size
+    layers.append(nn.Linear(width, teacher_probs.shape[1]))
+    student = nn.Sequential(*layers)
+
+    x, y = torch.from_numpy(states), torch.from_numpy(teacher_probs.astype(np.float32))
+    optimizer = torch.optim.Adam(student.parameters(), lr=lr)
+    for _ in range(epochs):
+        for idx in torch.randperm(len(x)).split(batch_size):
+            loss = -(y[idx] * torch.log_softmax(student(x[idx]), dim=1)).sum(dim=1).mean()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+    return torch.jit.trace(student.eval(), x[:1])
+
+
+# =============================================================================
+# 2. ÉTATS ET MESURES
+# =============================================================================
+def collect_states(runner, grid_size: int, observation: dict, game_mode: str = "classic", n_states: int = 20_000,
+                   n_envs: int = 64, seed: int = 0):
+    """Observations visitées par la policy (actions tirées dans sa distribution, pas l'argmax)"""
+    env = SnakeVecEnv(n_envs=n_envs, grid_size=grid_size, game_mode=game_mode, seed=seed,
+                      obs_mode=observation["mode"], view_radius=observation.get("radius", 5))
+    rng = np.random.default_rng(seed)
+    obs = env.reset().astype(np.float32)
+    states = []
+    for _ in range(-(-n_states // n_envs)):
+        states.append(obs)
+        _, probs = runner.predict_batch(obs)
+        actions = (probs.cumsum(axis=1) > rng.random((n_envs, 1))).argmax(axis=1)
+        obs, _, _, _ = env.step(actions)
+        obs = obs.astype(np.float32)
+    return np.concatenate(states)[:n_states]
+
+
+def measure(runner, states, reference_actions, n_calls: int = 300, batch_size: int = 64):
+    """Accord avec les actions de référence, latence d'une requête (p50 / p99) et d'un batch"""
+    actions, _ = runner.predict_batch(states)
+    timings = []
+    for i in range(n_calls):
+        start = time.perf_counter()
+        runner.predict(states[i % len(states)])
+        timings.append(time.perf_counter() - start)
+    batch = states[:batch_size]
+    start = time.perf_counter()
+    for _ in range(20):
+        runner.predict_batch(batch)
+    return {
+        "agreement": round(float((actions == reference_actions).mean()), 4),
+        "latency_us_p50": round(float(np.percentile(timings, 50)) * 1e6, 1),
+        "latency_us_p99": round(float(np.percentile(timings, 99)) * 1e6, 1),
+        f"batch{len(batch)}_latency_us": round((time.perf_counter() - start) / 20 * 1e6, 1),
+    }
+
+
+# =============================================================================
+# 3. PIPELINE
+# =============================================================================
+def optimize_model(
+        uuid: str,
+        variants=tuple(VARIANT_FILES),
+        n_states: int = 20_000,
+        distill_hidden=DEFAULT_DISTILL_HIDDEN,
+        distill_epochs: int = 20,
+        seed: int = 0,
+        hf_repo_id: str = DEFAULT_REPO_ID,
+        save: bool = True
+):
+    """
+    Produit les variantes d'un modèle du catalogue ("int8", "distilled") et les mesure
+    contre le modèle complet sur des états joués par celui-ci (20 % gardés pour la mesure).
+
+    Les fichiers .pt sont uploadés dans le dossier du modèle et le rapport est écrit dans
+    metadata.json sous "variants" (clé "full" : le modèle d'origine) si save=True.
+    """
+    unknown = set(variants) - set(VARIANT_FILES)
+    if unknown:
+        raise ValueError(f"Variantes inconnues : {sorted(unknown)} (disponibles : {', '.join(VARIANT_FILES)})")
+    catalog = get_catalog(hf_repo_id)
+    entry = catalog.get(uuid)
+    if not entry:
+        raise ValueError(f"Modèle {uuid} introuvable dans le catalogue")
+    model_path = catalog.store.download(f"{entry['folder']}/model.zip")
+    agent = PPO.load(model_path, device="cpu")
+    teacher = PolicyRunner(agent.policy)
+    observation = spec_from_space(agent.observation_space)
+    obs_shape = list(agent.observation_space.shape)
+
+    print(f"🗜️ Variantes {', '.join(variants)} de {uuid} ({n_states} états)")
+    states = collect_states(teacher, entry["grid_size"], observation, entry.get("game_mode", "classic"), n_states,
+                            seed=seed)
+    split = int(len(states) * 0.8)
+    train_states, test_states = states[:split], states[split:]
+    reference, _ = teacher.predict_batch(test_states)
+
+    created_at = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    report = {"full": {"file": "model.zip", "bytes": os.path.getsize(model_path),
+                       **measure(teacher, test_states, reference)}}
+    with tempfile.TemporaryDirectory() as temp_dir_str:
+        temp_dir = Path(temp_dir_str)
+        for name in variants:
+            if name == "int8":
+                module, extra = quantize_int8(agent.policy), {}
+            else:
+                _, teacher_probs = teacher.predict_batch(train_states)
+                module = distill(train_states, teacher_probs, distill_hidden, distill_epochs, seed=seed)
+                extra = {"hidden": list(distill_hidden), "epochs": distill_epochs}
+            path = temp_dir / VARIANT_FILES[name]
+            torch.jit.save(module, str(path))
+            runner = VariantRunner.load(str(path), obs_shape, name)
+            report[name] = {"file": path.name, "bytes": path.stat().st_size, **measure(runner, test_states, reference),
+                            "obs_shape": obs_shape, "observation": observation, "created_at": created_at, **extra}
+            print(f"   {name:<9} accord {report[name]['agreement']:.1%} — "
+                  f"{report[name]['latency_us_p50']} µs (complet : {report['full']['latency_us_p50']} µs)")
+
+        if save:
+            with open(catalog.store.download(f"{entry['folder']}/metadata.json"), "r") as f:
+                metadata = json.load(f)
+            metadata["variants"] = {**metadata.get("variants", {}), **report}
+            with open(temp_dir / "metadata.json", "w") as f:
+                json.dump(metadata, f, indent=4)
+            catalog.store.upload_folder(str(temp_dir), entry["folder"])
+            catalog.add(metadata, folder=entry["folder"])
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Variantes int8 / distillée d'un modèle Snake pour le serving CPU")
+    parser.add_argument("uuid")
+    parser.add_argument("--variants", nargs="+", default=list(VARIANT_FILES), choices=list(VARIANT_FILES))
+    parser.add_argument("--states", type=int, default=20_000)
+    parser.add_argument("--hidden", type=int, nargs="+", default=list(DEFAULT_DISTILL_HIDDEN))
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repo", default=DEFAULT_REPO_ID)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    optimize_model(args.uuid, variants=args.variants, n_states=args.states, distill_hidden=tuple(args.hidden),
+                   distill_epochs=args.epochs, seed=args.seed, hf_repo_id=args.repo, save=not args.no_save)
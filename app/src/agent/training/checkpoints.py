@@ -0,0 +1,207 @@
+import io
+import json
+import os
+import posixpath
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+from app.src.agent.utils.model_store import DEFAULT_REPO_ID, get_model_store
+
+CHECKPOINT_PATTERN = re.compile(r"^ckpt_(\d{12})$")
+
+
+def checkpoint_name(num_timesteps: int):
+    return f"ckpt_{num_timesteps:012d}"
+
+
+class Checkpoint:
+    def __init__(self, path: Path, state: dict):
+        self.path = Path(path)
+        self.state = state
+
+    @property
+    def model_path(self):
+        return self.path / "model.zip"
+
+
+# =============================================================================
+# 1. GESTIONNAIRE DE CHECKPOINTS
+# =============================================================================
+class CheckpointManager:
+    """
+    Checkpoints périodiques d'un run : {root}/{run_id}/ckpt_<timesteps>/ (model.zip + state.json).
+
+    – model.zip (policy + état de l'optimiseur, format SB3) est sérialisé en mémoire sur le
+      thread d'entraînement ; l'écriture disque, l'upload vers le store et l'élagage se font
+      sur un thread dédié, dans l'ordre.
+    – Rétention : seuls les keep_last derniers checkpoints sont gardés (local et store).
+    – latest() retrouve le dernier checkpoint du run, en local ou à défaut dans le store.
+    """
+
+    def __init__(self, run_id: str, root: str = "checkpoints", store=None, keep_last: int = 2):
+        self.run_id = run_id
+        self.root = Path(root) / run_id
+        self.store = store
+        self.keep_last = max(1, keep_last)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"checkpoint-{run_id[:8]}")
+        self._pending = []
+
+    # --- ÉCRITURE ---
+    def save_async(self, agent, state: dict):
+        """Sérialise l'agent maintenant, écrit / uploade / élague en arrière-plan"""
+        buffer = io.BytesIO()
+        agent.save(buffer)
+        state = {**state, "run_id": self.run_id, "num_timesteps": int(agent.num_timesteps), "created_at": time.time()}
+        self._pending = [f for f in self._pending if not f.done()]
+        future = self._executor.submit(self._write, buffer.getvalue(), state)
+        self._pending.append(future)
+        return future
+
+    def wait(self):
+        for future in self._pending:
+            future.result()
+        self._pending = []
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def clear(self):
+        """Run terminé : les checkpoints ne servent plus (local et store)"""
+        self.wait()
+        shutil.rmtree(self.root, ignore_errors=True)
+        if self.store is not None:
+            try:
+                self.store.delete_folder(self._remote_prefix())
+            except Exception as e:
+                print(f"⚠️ Suppression des checkpoints distants de {self.run_id} impossible : {e}")
+
+    # --- LECTURE ---
+    def local_checkpoints(self):
+        """Noms des checkpoints locaux complets, du plus ancien au plus récent"""
+        if not self.root.exists():
+            return []
+        names = [p.name for p in self.root.iterdir()
+                 if CHECKPOINT_PATTERN.match(p.name) and (p / "state.json").is_file()]
+        return sorted(names)
+
+    def latest(self):
+        """Dernier checkpoint du run (Checkpoint) ou None"""
+        local = self.local_checkpoints()
+        if local:
+            path = self.root / local[-1]
+            with open(path / "state.json", "r") as f:
+                return Checkpoint(path, json.load(f))
+        if self.store is None:
+            return None
+        try:
+            remote = self._remote_checkpoints()
+            if not remote:
+                return None
+            prefix = f"{self._remote_prefix()}/{remote[-1]}"
+            path = self.root / remote[-1]
+            path.mkdir(parents=True, exist_ok=True)
+            for filename in ("model.zip", "state.json"):
+                shutil.copyfile(self.store.download(f"{prefix}/{filename}"), path / filename)
+            with open(path / "state.json", "r") as f:
+                return Checkpoint(path, json.load(f))
+        except Exception as e:
+            print(f"⚠️ Checkpoint distant illisible pour {self.run_id} : {e}")
+            return None
+
+    # --- INTERNE (thread des checkpoints) ---
+    def _write(self, model_bytes: bytes, state: dict):
+        name = checkpoint_name(state["num_timesteps"])
+        path = self.root / name
+        tmp_path = self.root / f".{name}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+        (tmp_path / "model.zip").write_bytes(model_bytes)
+        # state.json en dernier : un dossier sans lui est un checkpoint incomplet
+        with open(tmp_path / "state.json", "w") as f:
+            json.dump(state, f, indent=4)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+        if self.store is not None:
+            try:
+                self.store.upload_folder(str(path), f"{self._remote_prefix()}/{name}")
+            except Exception as e:
+                print(f"⚠️ Upload du checkpoint {name} impossible : {e}")
+        self._prune()
+        print(f"💾 Checkpoint {self.run_id[:8]} @ {state['num_timesteps']} steps")
+        return path
+
+    def _prune(self):
+        for name in self.local_checkpoints()[:-self.keep_last]:
+            shutil.rmtree(self.root / name, ignore_errors=True)
+        if self.store is not None:
+            try:
+                for name in self._remote_checkpoints()[:-self.keep_last]:
+                    self._delete_remote(name)
+            except Exception as e:
+                print(f"⚠️ Élagage des checkpoints distants impossible : {e}")
+
+    def _remote_prefix(self):
+        return f"checkpoints/{self.run_id}"
+
+    def _remote_checkpoints(self):
+        prefix = self._remote_prefix() + "/"
+        names = set()
+        for path in self.store.list_files():
+            if path.startswith(prefix) and posixpath.basename(path) == "state.json":
+                name = posixpath.basename(posixpath.dirname(path))
+                if CHECKPOINT_PATTERN.match(name):
+                    names.add(name)
+        return sorted(names)
+
+    def _delete_remote(self, name):
+        try:
+            self.store.delete_folder(f"{self._remote_prefix()}/{name}")
+        except Exception as e:
+            print(f"⚠️ Suppression du checkpoint distant {name} impossible : {e}")
+
+
+def get_checkpoint_manager(run_id: str, hf_repo_id: str = DEFAULT_REPO_ID):
+    """
+    Gestionnaire configuré par l'environnement :
+    SNAKE_CHECKPOINT_DIR (racine locale), SNAKE_CHECKPOINT_KEEP (rétention),
+    SNAKE_CHECKPOINT_UPLOAD=0 pour ne garder les checkpoints qu'en local.
+    """
+    upload = os.getenv("SNAKE_CHECKPOINT_UPLOAD", "1") not in ("0", "false", "False")
+    return CheckpointManager(
+        run_id,
+        root=os.getenv("SNAKE_CHECKPOINT_DIR", "checkpoints"),
+        store=get_model_store(hf_repo_id) if upload else None,
+        keep_last=int(os.getenv("SNAKE_CHECKPOINT_KEEP", "2")),
+    )
+
+
+# =============================================================================
+# 2. CALLBACK SB3
+# =============================================================================
+class AsyncCheckpointCallback(BaseCallback):
+    """Déclenche un checkpoint toutes les `every` timesteps (state_fn() fournit l'état du run)"""
+
+    def __init__(self, manager: CheckpointManager, every: int, state_fn, verbose=0):
+        super().__init__(verbose)
+        self.manager = manager
+        self.every = every
+        self.state_fn = state_fn
+        self._last = None
+
+    def _on_training_start(self) -> None:
+        self._last = self.num_timesteps
+
+    def _on_step(self) -> bool:
+        if self.num_timesteps - self._last >= self.every:
+            self._last = self.num_timesteps
+            self.manager.save_async(self.model, self.state_fn(self.num_timesteps))
+        return True
@@ -0,0 +1,243 @@
+import multiprocessing as mp
+import os
+import queue
+import threading
+from collections import deque
+
+
+# =============================================================================
+# 1. CÔTÉ WORKER (processus d'entraînement)
+# =============================================================================
+class _WorkerStateProxy:
+    """
+    Remplace training_manager dans le processus worker : les mises à jour partent
+    vers le processus API par une file (pipe), l'annulation arrive par un Event partagé.
+    """
+
+    def __init__(self, events, cancel_event):
+        self.events = events
+        self.cancel_event = cancel_event
+        self.active_trainings = {}
+        self.cancel_flags = set()
+
+    def update(self, run_id, progress, grids, stats=None, timesteps=0, total_timesteps=1, status="running"):
+        self.events.put(("update", run_id, {
+            "progress": progress, "grids": grids, "stats": stats, "timesteps": timesteps,
+            "total_timesteps": total_timesteps, "status": status
+        }))
+
+    def get_status(self, run_id):
+        return None
+
+    def cancel_job(self, run_id):
+        self.cancel_event.set()
+
+    def should_stop(self, run_id):
+        return self.cancel_event.is_set()
+
+    def stop_training(self, run_id):
+        pass
+
+
+def _worker_main(run_id, kwargs, events, cancel_event, torch_threads, nice, target):
+    """Point d'entrée du processus worker (spawn)"""
+    if nice:
+        try:
+            os.nice(nice)  # L'entraînement passe après le serving
+        except OSError:
+            pass
+
+    import torch
+    torch.set_num_threads(torch_threads)
+
+    from app.src.agent.training import train
+    train.training_manager = _WorkerStateProxy(events, cancel_event)
+
+    try:
+        (target or train.train_snake)(run_id=run_id, **kwargs)
+        events.put(("done", run_id, None))
+    except Exception as e:
+        events.put(("error", run_id, str(e)))
+
+
+# =============================================================================
+# 2. CÔTÉ API (ordonnanceur)
+# =============================================================================
+class TrainingScheduler:
+    """
+    Ordonnanceur des entraînements hors du processus de serving.
+
+    – Chaque job tourne dans un processus dédié (spawn), jamais plus de max_workers à la fois.
+    – Les jobs en trop attendent dans une file FIFO (statut "queued").
+    – Progression / stats remontent par une file multiprocessing et alimentent le
+      TrainingStateManager du processus API ; l'annulation descend par un Event partagé.
+    – Un worker mort sans signaler sa fin (crash, OOM...) est relancé jusqu'à max_restarts
+      fois avec le même run_id : train_snake repart alors du dernier checkpoint.
+    """
+
+    def __init__(self, state_manager, max_workers: int = 1, torch_threads: int = 1, nice: int = 10, target=None,
+                 max_restarts: int = 0):
+        self.state = state_manager
+        self.max_workers = max_workers
+        self.max_restarts = max_restarts
+        self.torch_threads = torch_threads
+        self.nice = nice
+        self.target = target
+
+        self._ctx = mp.get_context("spawn")
+        self._events = None
+        self._pending = deque()  # (run_id, kwargs)
+        self._positions = {}  # run_id -> dernière position publiée (jobs en file)
+        self._running = {}  # run_id -> (process, cancel_event)
+        self._finished = set()  # run_ids dont le worker a signalé la fin
+        self._restarts = {}  # run_id -> nombre de relances après crash
+        self._kwargs = {}  # run_id -> kwargs du job en cours (relance)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._closed = False
+
+    # --- API PUBLIQUE ---
+    def submit(self, run_id: str, **kwargs):
+        """Met un job en file. Retourne sa position (0 = démarre dès qu'un worker est libre)"""
+        self._ensure_started()
+        with self._lock:
+            self._pending.append((run_id, kwargs))
+            position = len(self._pending) - 1
+            self._publish_positions()
+        self._wakeup.set()
+        return position
+
+    def cancel(self, run_id: str):
+        with self._lock:
+            for item in list(self._pending):
+                if item[0] == run_id:
+                    self._pending.remove(item)
+                    self._positions.pop(run_id, None)
+                    self.state.cancel_job(run_id)
+                    self._publish_positions()
+                    return True
+            running = self._running.get(run_id)
+        if running is None:
+            return False
+        running[1].set()
+        self.state.cancel_job(run_id)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": list(self._running.keys()),
+                "queued": [run_id for run_id, _ in self._pending],
+            }
+
+    def worker_pids(self):
+        """{run_id: pid} des workers en cours (RSS exporté par metrics_server)"""
+        with self._lock:
+            return {run_id: process.pid for run_id, (process, _) in self._running.items()}
+
+    def shutdown(self, timeout: float = 5.0):
+        self._closed = True
+        self._wakeup.set()
+        with self._lock:
+            running = list(self._running.values())
+        for process, cancel_event in running:
+            cancel_event.set()
+        for process, _ in running:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # --- INTERNE ---
+    def _ensure_started(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._closed = False
+            self._events = self._events or self._ctx.Queue()
+            self._threads = [
+                threading.Thread(target=self._dispatch_loop, name="training-dispatcher", daemon=True),
+                threading.Thread(target=self._event_loop, name="training-events", daemon=True),
+            ]
+        for thread in self._threads:
+            thread.start()
+
+    def _dispatch_loop(self):
+        while not self._closed:
+            self._reap()
+            with self._lock:
+                while self._pending and len(self._running) < self.max_workers:
+                    run_id, kwargs = self._pending.popleft()
+                    self._start(run_id, kwargs)
+                self._publish_positions()
+            self._wakeup.wait(0.5)
+            self._wakeup.clear()
+
+    def _publish_positions(self):
+        """Statut "queued" des jobs en file, publié seulement quand leur position change (sous self._lock)"""
+        for position, (run_id, kwargs) in enumerate(self._pending):
+            if self._positions.get(run_id) != position:
+                self._positions[run_id] = position
+                self.state.update(run_id, 0, [], {"status": "queued", "position": position}, 0,
+                                  kwargs.get("timesteps", 1), status="queued")
+
+    def _start(self, run_id, kwargs):
+        self._positions.pop(run_id, None)
+        self._kwargs[run_id] = kwargs
+        cancel_event = self._ctx.Event()
+        process = self._ctx.Process(
+            target=_worker_main, name=f"train-{run_id[:8]}",
+            args=(run_id, kwargs, self._events, cancel_event, self.torch_threads, self.nice, self.target),
+        )
+        process.start()
+        self._running[run_id] = (process, cancel_event)
+        print(f"🏭 Job {run_id} démarré (pid {process.pid})")
+
+    def _reap(self):
+        with self._lock:
+            dead = [(run_id, p) for run_id, (p, _) in self._running.items() if not p.is_alive()]
+            for run_id, process in dead:
+                del self._running[run_id]
+        for run_id, process in dead:
+            process.join()
+            kwargs = self._kwargs.pop(run_id, {})
+            if process.exitcode != 0 and run_id not in self._finished:
+                restarts = self._restarts.get(run_id, 0)
+                if restarts < self.max_restarts and not self.state.should_stop(run_id):
+                    self._restarts[run_id] = restarts + 1
+                    print(f"♻️ Worker {run_id} mort (code {process.exitcode}), relance {restarts + 1}/{self.max_restarts}")
+                    with self._lock:
+                        self._pending.appendleft((run_id, kwargs))
+                else:
+                    self.state.update(run_id, 0, [], {"status": "error",
+                                                      "message": f"worker exited with code {process.exitcode}"},
+                                      status="error")
+            else:
+                self._restarts.pop(run_id, None)
+            self._finished.discard(run_id)
+
+    def _event_loop(self):
+        while not self._closed:
+            try:
+                kind, run_id, payload = self._events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+
+            if kind == "update":
+                self.state.update(run_id, **payload)
+            elif kind == "error":
+                self._finished.add(run_id)
+                self.state.update(run_id, 0, [], {"status": "error", "message": payload}, status="error")
+            elif kind == "done":
+                self._finished.add(run_id)
+                current = self.state.get_status(run_id) or {}
+                if current.get("status") not in ("error", "cancelled"):
+                    # Terminé normalement : le WebSocket répondra "finished"
+                    self.state.stop_training(run_id)
+            self._wakeup.set()
@@ -0,0 +1,301 @@
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from app.src.agent.utils.catalog import get_catalog
+from app.src.agent.utils.model_store import DEFAULT_REPO_ID
+from app.src.env.observations import DEFAULT_VIEW_RADIUS, observation_spec
+
+# Espace de recherche par défaut : liste = choix, ("log", a, b) = log-uniforme, ("uniform", a, b) = uniforme
+DEFAULT_SEARCH_SPACE = {
+    "learning_rate": ("log", 1e-4, 3e-3),
+    "n_steps": [128, 256, 512, 1024],
+    "batch_size": [32, 64, 128, 256],
+    "gamma": ("uniform", 0.9, 0.999),
+    "n_envs": [4, 8],
+    "net_arch": [[64, 64], [128, 128], [256, 256]],
+}
+
+
+def sample_config(space: dict, rng: np.random.Generator):
+    config = {}
+    for name, spec in space.items():
+        if isinstance(spec, tuple):
+            kind, low, high = spec
+            if kind == "log":
+                value = math.exp(rng.uniform(math.log(low), math.log(high)))
+            elif kind == "uniform":
+                value = rng.uniform(low, high)
+            else:
+                raise ValueError(f"Distribution inconnue pour {name} : {kind}")
+            config[name] = float(value)
+        else:
+            config[name] = spec[int(rng.integers(len(spec)))]
+    return config
+
+
+def rung_budgets(min_timesteps: int, max_timesteps: int, eta: int):
+    """Budgets croissants (×eta) jusqu'à max_timesteps inclus"""
+    budgets = []
+    budget = min_timesteps
+    while budget < max_timesteps:
+        budgets.append(int(budget))
+        budget *= eta
+    budgets.append(int(max_timesteps))
+    return budgets
+
+
+# =============================================================================
+# 1. ORDONNANCEMENT (SUCCESSIVE HALVING / ASHA)
+# =============================================================================
+class SuccessiveHalving:
+    """
+    Promotion des essais de rung en rung (budget ×eta à chaque rung).
+
+    – "asha" (asynchrone) : un essai est promu dès qu'il est dans le top 1/eta des
+      essais ayant terminé son rung ; aucun worker n'attend les retardataires.
+    – "sha" (synchrone) : un rung n'est départagé qu'une fois tous ses essais évalués.
+    Un essai jamais promu est arrêté : c'est l'élagage précoce.
+    """
+
+    def __init__(self, n_trials: int, budgets, eta: int = 3, mode: str = "asha"):
+        if mode not in ("asha", "sha"):
+            raise ValueError(f"Mode inconnu : {mode} (attendu : asha, sha)")
+        self.n_trials = n_trials
+        self.budgets = list(budgets)
+        self.eta = eta
+        self.mode = mode
+        self.started = 0
+        self.results = [dict() for _ in self.budgets]  # rung -> {trial_id: score}
+        self.promoted = [set() for _ in self.budgets]  # rung -> trial_ids déjà promus depuis ce rung
+        # Effectif attendu par rung en mode synchrone
+        self.sizes = [n_trials]
+        for _ in self.budgets[1:]:
+            self.sizes.append(max(1, self.sizes[-1] // eta))
+
+    def next_job(self):
+        """(trial_id, rung) à lancer, ou None s'il faut attendre un résultat"""
+        for rung in reversed(range(len(self.budgets) - 1)):
+            for trial_id in self._promotable(rung):
+                self.promoted[rung].add(trial_id)
+                return trial_id, rung + 1
+        if self.started < self.n_trials:
+            self.started += 1
+            return self.started - 1, 0
+        return None
+
+    def report(self, trial_id: int, rung: int, score: float):
+        self.results[rung][trial_id] = score
+
+    def best(self):
+        """(trial_id, rung, score) du meilleur essai au rung le plus haut atteint"""
+        for rung in reversed(range(len(self.budgets))):
+            if self.results[rung]:
+                trial_id, score = max(self.results[rung].items(), key=lambda item: item[1])
+                return trial_id, rung, score
+        return None
+
+    def _promotable(self, rung):
+        results = self.results[rung]
+        if self.mode == "sha":
+            if len(results) < self.sizes[rung]:
+                return []
+            quota = self.sizes[rung + 1]
+        else:
+            quota = len(results) // self.eta
+        ranked = sorted(results, key=results.get, reverse=True)[:quota]
+        return [trial_id for trial_id in ranked if trial_id not in self.promoted[rung]]
+
+
+# =============================================================================
+# 2. ESSAI (processus worker)
+# =============================================================================
+def _init_worker(torch_threads: int):
+    import torch
+    torch.set_num_threads(torch_threads)
+
+
+def _run_trial(trial_id, config, budget, trial_dir, grid_size, game_mode, eval_episodes, seed, observation):
+    """Entraîne l'essai jusqu'à budget timesteps (reprend son model.zip s'il existe), puis l'évalue"""
+    from stable_baselines3 import PPO
+    from app.src.agent.evaluating.evaluate import play_episodes
+    from app.src.agent.training.train import build_agent, make_training_env
+    from app.src.serving.inference import PolicyRunner
+
+    start = time.perf_counter()
+    model_path = Path(trial_dir) / "model.zip"
+    env = make_training_env("dummy", grid_size, game_mode, config.get("n_envs", 4), observation)
+    if model_path.exists():
+        agent = PPO.load(model_path, env=env, device="cpu")
+    else:
+        agent = build_agent(env, config, seed=seed + trial_id)
+    agent.learn(total_timesteps=max(budget - agent.num_timesteps, 0), reset_num_timesteps=False)
+    agent.save(model_path)
+    env.close()
+
+    # Mêmes seeds pour tous les essais : les scores sont comparables
+    episodes = play_episodes(PolicyRunner(agent.policy), grid_size, list(range(seed, seed + eval_episodes)), game_mode)
+    return {
+        "trial_id": trial_id, "timesteps": int(agent.num_timesteps),
+        "mean_reward": float(np.mean([e["reward"] for e in episodes])),
+        "mean_score": float(np.mean([e["score"] for e in episodes])),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+# =============================================================================
+# 3. SWEEP
+# =============================================================================
+def run_sweep(
+        grid_size: int,
+        n_trials: int = 16,
+        cores: int = None,
+        space: dict = None,
+        min_timesteps: int = 10_000,
+        max_timesteps: int = 90_000,
+        eta: int = 3,
+        mode: str = "asha",
+        eval_episodes: int = 64,
+        game_mode: str = "classic",
+        seed: int = 0,
+        hf_repo_id: str = DEFAULT_REPO_ID,
+        register: bool = True,
+        work_dir: str = None,
+        observation: dict = None
+):
+    """
+    Recherche d'hyperparamètres PPO : n_trials configurations tirées dans `space`,
+    entraînées en parallèle sur `cores` processus (1 thread torch chacun) et départagées
+    par successive halving / ASHA sur la reward moyenne d'évaluation.
+    Le meilleur essai est enregistré comme un modèle normal (type "sweep") si register=True.
+    observation : {"mode": "grid"} (défaut) ou {"mode": "egocentric", "radius": r}, commun à tous les essais.
+    """
+    space = space or DEFAULT_SEARCH_SPACE
+    observation = observation_spec({"observation": observation})
+    cores = max(1, min(cores or os.cpu_count() or 1, n_trials))
+    rng = np.random.default_rng(seed)
+    configs = [sample_config(space, rng) for _ in range(n_trials)]
+    scheduler = SuccessiveHalving(n_trials, rung_budgets(min_timesteps, max_timesteps, eta), eta, mode)
+    sweep_id = str(uuid.uuid4())
+    root = Path(work_dir or tempfile.mkdtemp(prefix="snake_sweep_")) / sweep_id
+    trials = {i: {"config": configs[i], "evaluations": []} for i in range(n_trials)}
+
+    print(f"🔬 Sweep {sweep_id[:8]} : {n_trials} essais, rungs {scheduler.budgets}, {cores} cœur(s), {mode}")
+    start = time.perf_counter()
+    running = {}  # future -> (trial_id, rung)
+    with ProcessPoolExecutor(max_workers=cores, mp_context=mp.get_context("spawn"),
+                             initializer=_init_worker, initargs=(1,)) as pool:
+        while True:
+            while len(running) < cores:
+                job = scheduler.next_job()
+                if job is None:
+                    break
+                trial_id, rung = job
+                trial_dir = root / f"trial_{trial_id:03d}"
+                trial_dir.mkdir(parents=True, exist_ok=True)
+                future = pool.submit(_run_trial, trial_id, configs[trial_id], scheduler.budgets[rung], str(trial_dir),
+                                     grid_size, game_mode, eval_episodes, seed, observation)
+                running[future] = job
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                trial_id, rung = running.pop(future)
+                result = future.result()
+                scheduler.report(trial_id, rung, result["mean_reward"])
+                trials[trial_id]["evaluations"].append({"rung": rung, **result})
+                print(f"   essai {trial_id:3d} rung {rung} ({result['timesteps']} steps) : "
+                      f"reward {result['mean_reward']:.3f}, score {result['mean_score']:.2f}")
+
+    best_id, best_rung, best_reward = scheduler.best()
+    summary = {
+        "sweep_id": sweep_id, "mode": mode, "observation": observation, "eta": eta, "budgets": scheduler.budgets, "cores": cores,
+        "elapsed_seconds": round(time.perf_counter() - start, 2),
+        # Un essai reprend son modèle de rung en rung : son dernier rung donne ses timesteps
+        "timesteps_total": sum(t["evaluations"][-1]["timesteps"] for t in trials.values() if t["evaluations"]),
+        "best": {"trial_id": best_id, "rung": best_rung, "mean_reward": best_reward,
+                 "config": configs[best_id]},
+        "trials": [{"trial_id": i, "config": t["config"], "evaluations": t["evaluations"],
+                    "max_rung": max((e["rung"] for e in t["evaluations"]), default=-1)}
+                   for i, t in trials.items()],
+    }
+    print(f"🏆 Meilleur essai {best_id} (rung {best_rung}) : reward {best_reward:.3f} {configs[best_id]}")
+
+    try:
+        if register:
+            summary["uuid"] = register_best(summary, root / f"trial_{best_id:03d}", grid_size, game_mode, hf_repo_id)
+    finally:
+        if work_dir is None:
+            shutil.rmtree(root.parent, ignore_errors=True)
+    return summary
+
+
+def register_best(summary: dict, trial_dir: Path, grid_size: int, game_mode: str, hf_repo_id: str = DEFAULT_REPO_ID):
+    """Publie le modèle du meilleur essai dans le store + catalogue, comme un entraînement normal"""
+    best = summary["best"]
+    new_agent_uuid = str(uuid.uuid4())
+    metadata = {
+        "uuid": new_agent_uuid, "type": "sweep", "parent_uuid": None, "grid_size": grid_size,
+        "n_envs": best["config"].get("n_envs", 4), "game_mode": game_mode, "algorithm": "PPO", "vec_env": "dummy",
+        "date": datetime.now().strftime("%d/%m/%Y %H:%M:%S"), "final_mean_reward": best["mean_reward"],
+        "hf_folder": f"{grid_size}x{grid_size}/{new_agent_uuid}", "hyperparams": best["config"],
+        "observation": summary["observation"],
+        "sweep": {k: summary[k] for k in ("sweep_id", "mode", "eta", "budgets", "elapsed_seconds", "trials")},
+    }
+    with tempfile.TemporaryDirectory() as temp_dir_str:
+        temp_dir = Path(temp_dir_str)
+        shutil.copyfile(trial_dir / "model.zip", temp_dir / "model.zip")
+        with open(temp_dir / "metadata.json", "w") as f:
+            json.dump(metadata, f, indent=4)
+        catalog = get_catalog(hf_repo_id)
+        catalog.store.upload_folder(str(temp_dir), f"{grid_size}x{grid_size}/{new_agent_uuid}")
+        catalog.add(metadata)
+    print(f"📦 Modèle {new_agent_uuid} enregistré ({grid_size}x{grid_size})")
+    return new_agent_uuid
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep d'hyperparamètres PPO (successive halving / ASHA)")
+    parser.add_argument("--grid-size", type=int, required=True)
+    parser.add_argument("--trials", type=int, default=16)
+    parser.add_argument("--cores", type=int, default=None, help="Processus en parallèle (défaut : tous les cœurs)")
+    parser.add_argument("--min-timesteps", type=int, default=10_000)
+    parser.add_argument("--max-timesteps", type=int, default=90_000)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--mode", default="asha", choices=("asha", "sha"))
+    parser.add_argument("--eval-episodes", type=int, default=64)
+    parser.add_argument("--game-mode", default="classic")
+    parser.add_argument("--observation", default="grid", choices=("grid", "egocentric"))
+    parser.add_argument("--view-radius", type=int, default=DEFAULT_VIEW_RADIUS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--space", default=None, help="Espace de recherche JSON (listes = choix, "
+                                                       "[\"log\"|\"uniform\", a, b] = continu)")
+    parser.add_argument("--repo", default=DEFAULT_REPO_ID)
+    parser.add_argument("--no-register", action="store_true")
+    parser.add_argument("--output", default=None, help="Fichier JSON du résumé")
+    args = parser.parse_args()
+
+    space = None
+    if args.space:
+        with open(args.space, "r") as f:
+            space = {k: tuple(v) if isinstance(v, list) and v and v[0] in ("log", "uniform") else v
+                     for k, v in json.load(f).items()}
+    result = run_sweep(args.grid_size, n_trials=args.trials, cores=args.cores, space=space,
+                       min_timesteps=args.min_timesteps, max_timesteps=args.max_timesteps, eta=args.eta,
+                       mode=args.mode, eval_episodes=args.eval_episodes, game_mode=args.game_mode, seed=args.seed,
+                       hf_repo_id=args.repo, register=not args.no_register,
+                       observation={"mode": args.observation, "radius": args.view_radius})
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
@@ -8,7 +8,6 @@ from datetime import datetime
 from pathlib import Path
 
 from dotenv import load_dotenv
-from huggingface_hub import HfApi, hf_hub_download
 from stable_baselines3 import PPO
 from stable_baselines3.common.env_util import make_vec_env
 from stable_baselines3.common.monitor import Monitor
@@ -17,9 +16,16 @@ from stable_baselines3.common.callbacks import BaseCallback
 
 # Imports locaux
 from app.src.env.snake_env import SnakeEnv
+from app.src.env.snake_vec_env import SnakeVecEnv
+from app.src.env.shm_vec_env import ShmSubprocVecEnv
+from app.src.env.observations import DEFAULT_VIEW_RADIUS, observation_spec, spec_from_space
 from app.src.agent.utils.mlflow_wrapper import SnakeHFModel
 from app.src.agent.utils.callbacks import MLflowLoggingCallback
+from app.src.agent.utils.mlflow_logger import AsyncMetricLogger
 from app.src.agent.utils.loading import load_snake_model_data
+from app.src.agent.utils.catalog import get_catalog
+from app.src.agent.utils.profiling import PROFILE_MODES, PhaseProfilingCallback, PhaseTimer, SamplingProfiler
+from app.src.agent.training.checkpoints import AsyncCheckpointCallback, get_checkpoint_manager
 
 os.environ["HF_HUB_DISABLE_PROGRESS_BARS"] = "1"
 
@@ -34,6 +40,17 @@ class TrainingStateManager:
     def __init__(self):
         self.active_trainings = {}
         self.cancel_flags = set()
+        self.listeners = []  # listener(run_id, état ou None si le run est terminé)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def _notify(self, run_id, data):
+        for listener in self.listeners:
+            try:
+                listener(run_id, data)
+            except Exception as e:
+                print(f"⚠️ Listener d'entraînement en erreur : {e}")
 
     def update(self, run_id, progress, grids, stats=None, timesteps=0, total_timesteps=1, status="running"):
         self.active_trainings[run_id] = {
@@ -45,6 +62,7 @@ class TrainingStateManager:
             "timestamp": time.time(),
             "status": status
         }
+        self._notify(run_id, self.get_status(run_id))
 
     def get_status(self, run_id):
         if run_id in self.cancel_flags:
@@ -56,6 +74,7 @@ class TrainingStateManager:
     def cancel_job(self, run_id):
         print(f"🛑 Demande d'arrêt reçue pour {run_id}")
         self.cancel_flags.add(run_id)
+        self._notify(run_id, self.get_status(run_id))
 
     def should_stop(self, run_id):
         return run_id in self.cancel_flags
@@ -65,6 +84,7 @@ class TrainingStateManager:
             del self.active_trainings[run_id]
         if run_id in self.cancel_flags:
             self.cancel_flags.remove(run_id)
+        self._notify(run_id, None)
 
 
 training_manager = TrainingStateManager()
@@ -74,10 +94,11 @@ training_manager = TrainingStateManager()
 # 2. CALLBACK 5 SECONDES (Compromis Performance / Feedback)
 # =============================================================================
 class StreamCallback(BaseCallback):
-    def __init__(self, run_id, target_session_timesteps, verbose=0):
+    def __init__(self, run_id, target_session_timesteps, phase_callback=None, verbose=0):
         super().__init__(verbose)
         self.run_id = run_id
         self.target_session_timesteps = target_session_timesteps
+        self.phase_callback = phase_callback  # PhaseProfilingCallback : temps par phase dans le statut live
         self.initial_steps = None
         self.last_time_trigger = time.time()
 
@@ -110,6 +131,10 @@ class StreamCallback(BaseCallback):
             stats = {}
             if len(self.model.ep_info_buffer) > 0:
                 stats['mean_reward'] = safe_mean([ep['r'] for ep in self.model.ep_info_buffer])
+            if self.phase_callback is not None and self.phase_callback.timer.enabled:
+                stats['phases'] = self.phase_callback.timer.summary()
+                stats['env_steps_per_sec'] = self.phase_callback.env_steps_per_sec
+                stats['updates_per_sec'] = self.phase_callback.updates_per_sec
 
             training_manager.update(
                 run_id=self.run_id,
@@ -124,7 +149,78 @@ class StreamCallback(BaseCallback):
 
 
 # =============================================================================
-# 3. FONCTION PRINCIPALE
+# 3. CONSTRUCTION DES ENVIRONNEMENTS
+# =============================================================================
+VEC_ENV_BACKENDS = ("dummy", "batched", "subproc_shm")
+
+
+def make_training_env(vec_env: str, grid_size: int, game_mode: str, n_envs: int, observation: dict = None):
+    """
+    Construit le VecEnv d'entraînement selon le backend choisi :
+    – "dummy" : N SnakeEnv (Monitor) pas à pas via make_vec_env.
+    – "batched" : SnakeVecEnv, toutes les parties avancées en un appel NumPy.
+    – "subproc_shm" : N SnakeEnv (Monitor) répartis sur des processus épinglés aux cœurs,
+      échanges par mémoire partagée (SNAKE_VEC_WORKERS pour limiter le nombre de workers).
+    observation : {"mode": "grid"} (défaut) ou {"mode": "egocentric", "radius": r}.
+    """
+    observation = observation_spec({"observation": observation})
+    obs_kwargs = {"obs_mode": observation["mode"], "view_radius": observation.get("radius", DEFAULT_VIEW_RADIUS)}
+    env_fn = lambda: Monitor(SnakeEnv(grid_size=grid_size, render_mode=None, game_mode=game_mode, **obs_kwargs))
+    if vec_env == "batched":
+        return SnakeVecEnv(n_envs=n_envs, grid_size=grid_size, game_mode=game_mode, **obs_kwargs)
+    if vec_env == "dummy":
+        return make_vec_env(env_fn, n_envs=n_envs)
+    if vec_env == "subproc_shm":
+        n_workers = int(os.getenv("SNAKE_VEC_WORKERS", "0")) or None
+        return ShmSubprocVecEnv([env_fn] * n_envs, n_workers=n_workers)
+    raise ValueError(f"Backend VecEnv inconnu : {vec_env} (attendu : {', '.join(VEC_ENV_BACKENDS)})")
+
+
+PPO_HYPERPARAMS = ("learning_rate", "n_steps", "batch_size", "n_epochs", "gamma", "gae_lambda", "clip_range",
+                   "ent_coef", "vf_coef", "max_grad_norm")
+
+
+def build_agent(env, hyperparams: dict = None, seed: int = None):
+    """
+    PPO MlpPolicy avec hyperparamètres optionnels (défauts SB3 sinon).
+    net_arch (ex. [128, 128]) passe par policy_kwargs ; n_envs concerne l'environnement et est ignoré ici.
+    """
+    hyperparams = {k: v for k, v in (hyperparams or {}).items() if k != "n_envs"}
+    net_arch = hyperparams.pop("net_arch", None)
+    unknown = set(hyperparams) - set(PPO_HYPERPARAMS)
+    if unknown:
+        raise ValueError(f"Hyperparamètres inconnus : {', '.join(sorted(unknown))}")
+    policy_kwargs = {"net_arch": list(net_arch)} if net_arch else None
+    return PPO("MlpPolicy", env, verbose=0, seed=seed, policy_kwargs=policy_kwargs, **hyperparams)
+
+
+def _log_profile(run_id, timer, sampler, metric_logger):
+    """Durées par phase (et profil échantillonné éventuel) vers le run MLflow actif"""
+    try:
+        if timer.enabled:
+            metric_logger.log_metrics(timer.as_metrics())
+            print(f"⏱️ Phases {run_id} : {timer.summary()}")
+        if sampler is not None:
+            sampler.stop()
+            path = sampler.dump(Path(os.getenv("SNAKE_PROFILE_DIR", "profiles")) / f"{run_id}.folded")
+            mlflow.log_artifact(str(path), artifact_path="profiles")
+            print(f"🔥 Profil échantillonné : {path}")
+    except Exception as e:
+        print(f"⚠️ Profil non enregistré : {e}")
+
+
+def _start_mlflow_run(run_name, resume_run_id=None):
+    """Reprise : on rouvre le run MLflow du checkpoint s'il existe encore, sinon nouveau run"""
+    if resume_run_id:
+        try:
+            return mlflow.start_run(run_id=resume_run_id)
+        except Exception as e:
+            print(f"⚠️ Run MLflow {resume_run_id} introuvable, nouveau run : {e}")
+    return mlflow.start_run(run_name=run_name)
+
+
+# =============================================================================
+# 4. FONCTION PRINCIPALE
 # =============================================================================
 def train_snake(
         run_id: str,
@@ -135,9 +231,21 @@ def train_snake(
         algorithm: str = "PPO",
         hf_repo_id: str = "snakeRL/snake-rl-models",
         base_uuid: str = None,
-        show_logs: bool = False
+        show_logs: bool = False,
+        vec_env: str = "dummy",
+        profile: str = "phases",
+        checkpoint_every: int = None,
+        hyperparams: dict = None,
+        observation: str = "grid",
+        view_radius: int = DEFAULT_VIEW_RADIUS
 ):
     if not hf_token: return
+    if profile not in PROFILE_MODES:
+        raise ValueError(f"Mode de profilage inconnu : {profile} (attendu : {', '.join(PROFILE_MODES)})")
+
+    # Checkpoint toutes les N timesteps (0 : désactivé)
+    if checkpoint_every is None:
+        checkpoint_every = int(os.getenv("SNAKE_CHECKPOINT_EVERY", "50000"))
 
     # Init
     training_manager.update(run_id, 0, [], {"status": "initializing"}, 0, timesteps)
@@ -151,19 +259,39 @@ def train_snake(
 
     agent = None
     is_finetuning = False
+    # "phases" : timers par phase ; "sample" : + profil échantillonné (flamegraph) ; "off" : rien
+    timer = PhaseTimer(enabled=profile != "off")
+    sampler = SamplingProfiler().start() if profile == "sample" else None
+    checkpoints = get_checkpoint_manager(run_id, hf_repo_id)
+    timesteps_done = 0  # Steps déjà faits par les sessions précédentes de ce run (reprise)
+    obs_spec = observation_spec({"observation": {"mode": observation, "radius": view_radius}})
 
     try:
-        if base_uuid:
-            agent, loaded_grid_size = load_snake_model_data(base_uuid, hf_repo_id, show_logs)
+        # Reprise automatique : même run_id → on repart du dernier checkpoint
+        resume = checkpoints.latest()
+        if resume is not None:
+            config = resume.state["config"]
+            with timer.phase("model_download"):
+                agent = PPO.load(resume.model_path, verbose=1 if show_logs else 0)
+            timesteps, grid_size, n_envs = config["timesteps"], config["grid_size"], config["n_envs"]
+            game_mode, vec_env, algorithm = config["game_mode"], config["vec_env"], config["algorithm"]
+            base_uuid, new_agent_uuid = config["base_uuid"], config["uuid"]
+            hyperparams = config.get("hyperparams")
+            obs_spec = spec_from_space(agent.observation_space)
+            is_finetuning = base_uuid is not None
+            timesteps_done = resume.state["timesteps_done"]
+            print(f"♻️ Reprise de {run_id} : {timesteps_done}/{timesteps} steps déjà faits")
+        elif base_uuid:
+            with timer.phase("model_download"):
+                agent, loaded_grid_size = load_snake_model_data(base_uuid, hf_repo_id, show_logs)
             if agent is None: raise ValueError("Modèle introuvable")
             grid_size = loaded_grid_size
             is_finetuning = True
+            # Le fine-tuning garde l'observation du modèle de base
+            obs_spec = spec_from_space(agent.observation_space)
 
             try:
-                meta_path = hf_hub_download(repo_id=hf_repo_id,
-                                            filename=f"{grid_size}x{grid_size}/{base_uuid}/metadata.json")
-                with open(meta_path, 'r') as f:
-                    old_meta = json.load(f)
+                old_meta = get_catalog(hf_repo_id).get(base_uuid) or {}
                 n_envs = old_meta.get("n_envs", n_envs)
                 game_mode = old_meta.get("game_mode", game_mode)
             except:
@@ -174,47 +302,86 @@ def train_snake(
         mlflow.set_experiment(f"Snake_{grid_size}x{grid_size}")
         run_name = f"{'FINE-TUNING' if is_finetuning else 'NEW'}_{date_str}_{new_agent_uuid[:8]}"
 
-        with mlflow.start_run(run_name=run_name) as run:
-            env = make_vec_env(
-                lambda: Monitor(SnakeEnv(grid_size=grid_size, render_mode=None, game_mode=game_mode)),
-                n_envs=n_envs
-            )
-
-            if is_finetuning:
-                agent.set_env(env)
-            else:
-                agent = PPO("MlpPolicy", env, verbose=0)
-
-            callbacks = [MLflowLoggingCallback(), StreamCallback(run_id, timesteps)]
-
-            # Apprentissage
-            agent.learn(total_timesteps=timesteps, callback=callbacks, reset_num_timesteps=not is_finetuning)
-
-            # Check Stop
-            if training_manager.should_stop(run_id):
-                training_manager.update(run_id, 0, [], {"status": "cancelled"}, 0, timesteps, status="cancelled")
-                return
-
-            # Sauvegarde
-            with tempfile.TemporaryDirectory() as temp_dir_str:
-                temp_dir = Path(temp_dir_str)
-                agent.save(temp_dir / "model.zip")
-
-                final_reward = safe_mean([ep["r"] for ep in agent.ep_info_buffer]) if agent.ep_info_buffer else 0.0
-
-                metadata = {
-                    "uuid": new_agent_uuid, "type": "finetuned" if is_finetuning else "fresh",
-                    "parent_uuid": base_uuid, "grid_size": grid_size, "n_envs": n_envs,
-                    "game_mode": game_mode, "algorithm": algorithm, "date": readable_date,
-                    "final_mean_reward": final_reward, "hf_folder": f"{grid_size}x{grid_size}/{new_agent_uuid}",
-                    "mlflow_run_id": run.info.run_id
-                }
-
-                with open(temp_dir / "metadata.json", "w") as f: json.dump(metadata, f, indent=4)
-
-                api = HfApi(token=hf_token)
-                api.upload_folder(folder_path=str(temp_dir), path_in_repo=f"{grid_size}x{grid_size}/{new_agent_uuid}",
-                                  repo_id=hf_repo_id)
+        with _start_mlflow_run(run_name, resume.state.get("mlflow_run_id") if resume else None) as run:
+            # Métriques envoyées par lots depuis un thread : learn() n'attend jamais le serveur MLflow
+            metric_logger = AsyncMetricLogger(run.info.run_id)
+            env = None
+            try:
+                with timer.phase("env_setup"):
+                    env = make_training_env(vec_env, grid_size, game_mode, n_envs, obs_spec)
+
+                    if agent is not None:
+                        agent.set_env(env)
+                    else:
+                        agent = build_agent(env, hyperparams)
+
+                phase_callback = PhaseProfilingCallback(
+                    timer, log_fn=metric_logger.log_metrics if timer.enabled else None
+                )
+                remaining = max(timesteps - timesteps_done, 0)
+                callbacks = [MLflowLoggingCallback(timer=timer, log_fn=metric_logger.log_metrics),
+                             StreamCallback(run_id, remaining, phase_callback), phase_callback]
+
+                # État du run enregistré avec chaque checkpoint (de quoi reprendre sans la requête d'origine)
+                config = {"timesteps": timesteps, "grid_size": grid_size, "n_envs": n_envs, "game_mode": game_mode,
+                          "vec_env": vec_env, "algorithm": algorithm, "base_uuid": base_uuid, "uuid": new_agent_uuid,
+                          "hyperparams": hyperparams, "observation": obs_spec, "profile": profile,
+                          "checkpoint_every": checkpoint_every}
+                start_steps = agent.num_timesteps if resume is not None or is_finetuning else 0
+
+                def checkpoint_state(num_timesteps):
+                    return {"config": config, "timesteps_done": timesteps_done + num_timesteps - start_steps,
+                            "mlflow_run_id": run.info.run_id}
+
+                if checkpoint_every > 0:
+                    callbacks.append(AsyncCheckpointCallback(checkpoints, checkpoint_every, checkpoint_state))
+
+                # Apprentissage
+                with timer.phase("learn"):
+                    agent.learn(total_timesteps=remaining, callback=callbacks,
+                                reset_num_timesteps=not (is_finetuning or resume is not None))
+
+                # Check Stop
+                if training_manager.should_stop(run_id):
+                    # Dernier checkpoint : le run annulé pourra être repris là où il s'est arrêté
+                    if checkpoint_every > 0:
+                        checkpoints.save_async(agent, checkpoint_state(agent.num_timesteps))
+                    training_manager.update(run_id, 0, [], {"status": "cancelled"}, 0, timesteps, status="cancelled")
+                    return
+
+                # Sauvegarde
+                with tempfile.TemporaryDirectory() as temp_dir_str:
+                    temp_dir = Path(temp_dir_str)
+                    with timer.phase("save"):
+                        agent.save(temp_dir / "model.zip")
+
+                    final_reward = safe_mean([ep["r"] for ep in agent.ep_info_buffer]) if agent.ep_info_buffer else 0.0
+
+                    metadata = {
+                        "uuid": new_agent_uuid, "type": "finetuned" if is_finetuning else "fresh",
+                        "parent_uuid": base_uuid, "grid_size": grid_size, "n_envs": n_envs,
+                        "game_mode": game_mode, "algorithm": algorithm, "vec_env": vec_env, "date": readable_date,
+                        "final_mean_reward": final_reward, "hf_folder": f"{grid_size}x{grid_size}/{new_agent_uuid}",
+                        "mlflow_run_id": run.info.run_id, "hyperparams": hyperparams, "observation": obs_spec
+                    }
+
+                    with open(temp_dir / "metadata.json", "w") as f: json.dump(metadata, f, indent=4)
+
+                    with timer.phase("upload"):
+                        catalog = get_catalog(hf_repo_id)
+                        catalog.store.upload_folder(str(temp_dir), f"{grid_size}x{grid_size}/{new_agent_uuid}")
+                        catalog.add(metadata)
+
+                # Modèle final publié : les checkpoints du run ne servent plus
+                checkpoints.clear()
+            finally:
+                _log_profile(run_id, timer, sampler, metric_logger)
+                sampler = None
+                # Fin de run ou annulation : on vide le buffer avant de fermer le run MLflow
+                metric_logger.close()
+                # Workers et mémoire partagée du VecEnv (subproc_shm) libérés quelle que soit l'issue
+                if env is not None:
+                    env.close()
 
     except Exception as e:
         print(f"❌ Erreur: {e}")
@@ -222,4 +389,10 @@ def train_snake(
         time.sleep(2)
 
     finally:
-        pass
\ No newline at end of file
+        if sampler is not None:
+            sampler.stop()
+        # Attend les écritures / uploads de checkpoints en cours avant de rendre la main
+        try:
+            checkpoints.close()
+        except Exception as e:
+            print(f"⚠️ Checkpoint non enregistré : {e}")
\ No newline at end of file
@@ -4,11 +4,19 @@ from stable_baselines3.common.utils import safe_mean
 
 
 class MLflowLoggingCallback(BaseCallback):
-    def __init__(self, verbose=0):
+    def __init__(self, verbose=0, timer=None, log_fn=None):
         super().__init__(verbose)
+        self.timer = timer  # PhaseTimer optionnel : temps passé à logger
+        # log_fn(metrics, step) : AsyncMetricLogger.log_metrics pour ne pas bloquer sur le réseau
+        self.log_fn = log_fn or mlflow.log_metrics
     def _on_step(self) -> bool:
         return True
     def _on_rollout_end(self) -> None:
+        if self.timer is None:
+            return self._log_rollout()
+        with self.timer.phase("mlflow_logging"):
+            self._log_rollout()
+    def _log_rollout(self) -> None:
         try:
             logger_values = getattr(self.logger, "name_to_value", {})
             metrics = {k: float(v) for k, v in logger_values.items()}
@@ -16,6 +24,6 @@ class MLflowLoggingCallback(BaseCallback):
                 metrics["rollout/ep_rew_mean"] = float(safe_mean([ep["r"] for ep in self.model.ep_info_buffer]))
                 metrics["rollout/ep_len_mean"] = float(safe_mean([ep["l"] for ep in self.model.ep_info_buffer]))
             if metrics:
-                mlflow.log_metrics(metrics, step=self.num_timesteps)
+                self.log_fn(metrics, step=self.num_timesteps)
         except Exception:
             pass
\ No newline at end of file
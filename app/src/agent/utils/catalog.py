@@ -0,0 +1,159 @@
+import json
+import os
+import posixpath
+import threading
+import time
+from pathlib import Path
+
+from app.src.agent.utils.model_store import DEFAULT_REPO_ID, get_model_store
+
+
+class ModelCatalog:
+    """
+    Index local des modèles du store : uuid → dossier + métadonnées.
+
+    – Persisté en JSON (index_path) : un redémarrage repart de l'index existant.
+    – Rafraîchi de façon incrémentale : si la révision du dépôt n'a pas changé on ne
+      fait rien, sinon seuls les metadata.json dont l'etag a changé sont re-téléchargés.
+    – Les lectures (list_models / get) sont de simples accès mémoire. Un uuid inconnu déclenche
+      au plus un rafraîchissement toutes les miss_interval secondes : des uuids aléatoires
+      ne sollicitent pas le hub à chaque requête.
+    """
+
+    def __init__(self, store, index_path: str, ttl: float = 60.0, miss_interval: float = 10.0):
+        self.store = store
+        self.index_path = Path(index_path)
+        self.ttl = ttl
+        self.miss_interval = miss_interval
+        self._last_miss_refresh = float("-inf")
+        self._entries = {}  # uuid -> dict (métadonnées + "folder" + "etag")
+        self._revision = None
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._load()
+
+    # --- LECTURES (mémoire) ---
+    def list_models(self):
+        return list(self._entries.values())
+
+    def get(self, uuid: str, refresh_on_miss: bool = True):
+        entry = self._entries.get(uuid)
+        if entry is None and refresh_on_miss and self._claim_miss_refresh():
+            self._refresh_quietly()
+            entry = self._entries.get(uuid)
+        return entry
+
+    def model_path(self, uuid: str):
+        """Chemin de model.zip dans le store, ou None si l'uuid est inconnu"""
+        entry = self.get(uuid)
+        return f"{entry['folder']}/model.zip" if entry else None
+
+    # --- MISES À JOUR ---
+    def maybe_refresh(self):
+        """Rafraîchit si l'index a expiré : synchrone s'il est vide, sinon en arrière-plan"""
+        if time.time() - self._last_refresh < self.ttl:
+            return
+        if not self._entries:
+            self.refresh()
+        elif not self._refreshing.locked():
+            threading.Thread(target=self._refresh_quietly, daemon=True).start()
+
+    def refresh(self, force: bool = False):
+        with self._refreshing:
+            revision = self.store.revision()
+            if not force and revision is not None and revision == self._revision:
+                self._last_refresh = time.time()
+                return
+
+            files = self.store.list_files(revision)
+            known = {entry["folder"]: entry for entry in self._entries.values()}
+            entries = {}
+            for path, etag in files.items():
+                if posixpath.basename(path) != "metadata.json":
+                    continue
+                folder = posixpath.dirname(path)
+                entry = known.get(folder)
+                if entry is None or entry.get("etag") != etag or force:
+                    try:
+                        entry = self._read_metadata(path, folder, etag, revision)
+                    except Exception as e:
+                        print(f"⚠️ Erreur lecture {path}: {e}")
+                        continue
+                entries[entry["uuid"]] = entry
+
+            with self._lock:
+                self._entries = entries
+                self._revision = revision
+                self._last_refresh = time.time()
+            self._save()
+
+    def add(self, metadata: dict, folder: str = None):
+        """Enregistre un modèle qui vient d'être uploadé (appelé par train_snake)"""
+        folder = folder or metadata.get("hf_folder") or f"{metadata['grid_size']}x{metadata['grid_size']}/{metadata['uuid']}"
+        with self._lock:
+            # Etag inconnu : le prochain refresh relira ce metadata.json une fois
+            self._entries[metadata["uuid"]] = {**metadata, "folder": folder, "etag": None}
+            self._revision = None
+        self._save()
+
+    # --- INTERNE ---
+    def _claim_miss_refresh(self):
+        """Vrai si un uuid inconnu peut rafraîchir maintenant (intervalle écoulé, aucun refresh en cours)"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_miss_refresh < self.miss_interval or self._refreshing.locked():
+                return False
+            self._last_miss_refresh = now
+            return True
+
+    def _read_metadata(self, path, folder, etag, revision):
+        with open(self.store.download(path, revision=revision), "r") as f:
+            data = json.load(f)
+        data.setdefault("uuid", posixpath.basename(folder))
+        return {**data, "folder": folder, "etag": etag}
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"⚠️ Rafraîchissement du catalogue impossible : {e}")
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            if data.get("repo_id") == self.store.repo_id:
+                self._entries = data.get("models", {})
+                self._revision = data.get("revision")
+        except (OSError, ValueError):
+            pass
+
+    def _save(self):
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"repo_id": self.store.repo_id, "revision": self._revision, "models": self._entries}, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"⚠️ Sauvegarde du catalogue impossible : {e}")
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(repo_id: str = DEFAULT_REPO_ID):
+    """Catalogue partagé du processus pour un dépôt (créé à la première utilisation)"""
+    store = get_model_store(repo_id)
+    with _catalogs_lock:
+        catalog = _catalogs.get(store.repo_id)
+        if catalog is None:
+            index_dir = os.getenv("SNAKE_CATALOG_DIR", "models")
+            index_name = store.repo_id.strip("/").replace("/", "__") + ".catalog.json"
+            catalog = _catalogs[store.repo_id] = ModelCatalog(
+                store, Path(index_dir) / index_name, ttl=float(os.getenv("SNAKE_CATALOG_TTL", "60")),
+                miss_interval=float(os.getenv("SNAKE_CATALOG_MISS_INTERVAL", "10")),
+            )
+        return catalog
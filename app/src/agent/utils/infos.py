@@ -1,9 +1,8 @@
 import os
-import json
 from datetime import datetime
-from huggingface_hub import HfApi
 from dotenv import load_dotenv
-from huggingface_hub import hf_hub_download
+
+from app.src.agent.utils.catalog import get_catalog
 
 os.environ["HF_HUB_DISABLE_PROGRESS_BARS"] = "1"
 
@@ -20,36 +19,26 @@ def list_snake_models(
     hf_repo_id: str = "snakeRL/snake-rl-models"
 ):
     print(f"🔍 Recherche des modèles dans {hf_repo_id}...")
-    api = HfApi(token=hf_token)
-
-    all_files = api.list_repo_files(repo_id=hf_repo_id, repo_type="model")
-
-    meta_files = [f for f in all_files if f.endswith("metadata.json")]
+    catalog = get_catalog(hf_repo_id)
+    catalog.refresh()
 
     models_data = []
 
-    for meta_file in meta_files:
-        try:
-            local_path = hf_hub_download(repo_id=hf_repo_id, filename=meta_file, repo_type="model", token=hf_token)
+    for entry in catalog.list_models():
+        data = dict(entry)
 
-            with open(local_path, "r") as f:
-                data = json.load(f)
+        model_grid = data.get("grid_size")
+        if grid_size_filter is not None and model_grid != grid_size_filter:
+            continue
 
-            model_grid = data.get("grid_size")
-            if grid_size_filter is not None and model_grid != grid_size_filter:
-                continue
-
-            date_str = data.get("date", "")
-            try:
-                dt_object = datetime.strptime(date_str, "%d/%m/%Y %H:%M:%S")
-            except ValueError:
-                dt_object = datetime.min
-
-            data["_dt_object"] = dt_object # Stocké pour le tri interne
-            models_data.append(data)
+        date_str = data.get("date", "")
+        try:
+            dt_object = datetime.strptime(date_str, "%d/%m/%Y %H:%M:%S")
+        except ValueError:
+            dt_object = datetime.min
 
-        except Exception as e:
-            print(f"⚠️ Erreur lecture {meta_file}: {e}")
+        data["_dt_object"] = dt_object # Stocké pour le tri interne
+        models_data.append(data)
 
     if sort_by == "date":
         models_data.sort(key=lambda x: x["_dt_object"], reverse=True) # Plus récent en premier
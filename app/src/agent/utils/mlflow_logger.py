@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import deque
+
+from mlflow.entities import Metric
+from mlflow.tracking import MlflowClient
+
+MLFLOW_BATCH_LIMIT = 1000  # Nombre max de métriques par appel log_batch côté serveur
+
+
+class AsyncMetricLogger:
+    """
+    Logger MLflow en arrière-plan pour la boucle d'apprentissage.
+
+    – log_metrics() ne fait qu'ajouter au buffer (aucune I/O réseau sur le thread d'entraînement).
+    – Un thread dédié envoie des lots via log_batch dès que max_batch métriques
+      sont en attente ou toutes les flush_interval secondes.
+    – Un lot en échec est réessayé avec backoff exponentiel (sur le thread du logger),
+      puis abandonné après max_retries tentatives.
+    – close() vide le buffer avant de rendre la main (fin de run ou annulation).
+    """
+
+    def __init__(self, run_id: str, client=None, max_batch: int = MLFLOW_BATCH_LIMIT, flush_interval: float = 2.0,
+                 max_buffer: int = 100_000, max_retries: int = 5, backoff: float = 0.5):
+        self.run_id = run_id
+        self.client = client or MlflowClient()
+        self.max_batch = min(max_batch, MLFLOW_BATCH_LIMIT)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.dropped = 0
+        self.sent = 0
+
+        self._buffer = deque(maxlen=max_buffer)  # Plein : les métriques les plus anciennes sautent
+        self._wakeup = threading.Event()
+        self._closing = threading.Event()
+        self._idle = threading.Condition()
+        self._in_flight = 0
+        self._thread = threading.Thread(target=self._run, name="mlflow-logger", daemon=True)
+        self._thread.start()
+
+    # --- API (thread d'entraînement) ---
+    def log_metrics(self, metrics: dict, step: int = 0):
+        timestamp = int(time.time() * 1000)
+        for key, value in metrics.items():
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(Metric(key, float(value), timestamp, int(step or 0)))
+        if len(self._buffer) >= self.max_batch:
+            self._wakeup.set()
+
+    def flush(self, timeout: float = None):
+        """Attend que tout ce qui est en buffer ait été envoyé (ou abandonné)"""
+        self._wakeup.set()
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._buffer and not self._in_flight, timeout)
+
+    def close(self, timeout: float = 30.0):
+        self._closing.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"⚠️ Logger MLflow : {len(self._buffer)} métriques non envoyées à la fermeture")
+        elif self.dropped:
+            print(f"⚠️ Logger MLflow : {self.dropped} métriques perdues")
+
+    # --- INTERNE (thread du logger) ---
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            while self._buffer:
+                self._send(self._take_batch())
+            with self._idle:
+                self._idle.notify_all()
+            if self._closing.is_set() and not self._buffer:
+                return
+
+    def _take_batch(self):
+        batch = []
+        with self._idle:
+            while self._buffer and len(batch) < self.max_batch:
+                batch.append(self._buffer.popleft())
+            self._in_flight = len(batch)
+        return batch
+
+    def _send(self, batch):
+        delay = self.backoff
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self.client.log_batch(self.run_id, metrics=batch)
+                    self.sent += len(batch)
+                    return
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        self.dropped += len(batch)
+                        print(f"⚠️ Logger MLflow : lot de {len(batch)} métriques abandonné ({e})")
+                        return
+                    time.sleep(delay)
+                    delay *= 2
+        finally:
+            with self._idle:
+                self._in_flight = 0
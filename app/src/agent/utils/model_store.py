@@ -0,0 +1,84 @@
+import os
+import shutil
+from pathlib import Path
+
+from huggingface_hub import HfApi, hf_hub_download
+from huggingface_hub.hf_api import RepoFile
+
+os.environ["HF_HUB_DISABLE_PROGRESS_BARS"] = "1"
+
+DEFAULT_REPO_ID = "snakeRL/snake-rl-models"
+
+
+class HfModelStore:
+    """Stockage des modèles sur un dépôt Hugging Face (un dossier {grid}x{grid}/{uuid} par modèle)"""
+
+    def __init__(self, repo_id: str = DEFAULT_REPO_ID, token: str = None):
+        self.repo_id = repo_id
+        self.token = token
+
+    def revision(self):
+        """Commit courant du dépôt : s'il n'a pas bougé, rien n'a changé"""
+        return HfApi(token=self.token).repo_info(repo_id=self.repo_id, repo_type="model").sha
+
+    def list_files(self, revision: str = None):
+        """Retourne {chemin: etag} (blob id git) pour tous les fichiers du dépôt"""
+        tree = HfApi(token=self.token).list_repo_tree(repo_id=self.repo_id, recursive=True, revision=revision,
+                                                      repo_type="model")
+        return {item.path: item.blob_id for item in tree if isinstance(item, RepoFile)}
+
+    def download(self, path: str, revision: str = None):
+        return hf_hub_download(repo_id=self.repo_id, filename=path, revision=revision, repo_type="model",
+                               token=self.token)
+
+    def upload_folder(self, folder_path: str, path_in_repo: str):
+        HfApi(token=self.token).upload_folder(folder_path=str(folder_path), path_in_repo=path_in_repo,
+                                              repo_id=self.repo_id)
+
+    def delete_folder(self, path_in_repo: str):
+        HfApi(token=self.token).delete_folder(path_in_repo=path_in_repo, repo_id=self.repo_id)
+
+
+class LocalModelStore:
+    """
+    Remplaçant local du dépôt HF (même arborescence sur disque).
+    Utile hors-ligne et pour les tests : SNAKE_MODEL_STORE_DIR=/chemin/vers/modeles
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.repo_id = str(self.root)
+
+    def revision(self):
+        # Pas de notion de commit : la liste des fichiers (avec leurs etags) est toujours relue
+        return None
+
+    def list_files(self, revision: str = None):
+        files = {}
+        if not self.root.exists():
+            return files
+        for path in self.root.rglob("*"):
+            if path.is_file():
+                stat = path.stat()
+                files[path.relative_to(self.root).as_posix()] = f"{stat.st_mtime_ns}-{stat.st_size}"
+        return files
+
+    def download(self, path: str, revision: str = None):
+        local_path = self.root / path
+        if not local_path.is_file():
+            raise FileNotFoundError(f"{path} introuvable dans {self.root}")
+        return str(local_path)
+
+    def upload_folder(self, folder_path: str, path_in_repo: str):
+        shutil.copytree(folder_path, self.root / path_in_repo, dirs_exist_ok=True)
+
+    def delete_folder(self, path_in_repo: str):
+        shutil.rmtree(self.root / path_in_repo, ignore_errors=True)
+
+
+def get_model_store(repo_id: str = DEFAULT_REPO_ID):
+    """Store local si SNAKE_MODEL_STORE_DIR est défini, sinon le dépôt Hugging Face"""
+    local_dir = os.getenv("SNAKE_MODEL_STORE_DIR")
+    if local_dir:
+        return LocalModelStore(local_dir)
+    return HfModelStore(repo_id, token=os.getenv("HF_HUB_TOKEN"))
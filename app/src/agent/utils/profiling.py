@@ -0,0 +1,170 @@
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+PROFILE_MODES = ("off", "phases", "sample")
+
+
+# =============================================================================
+# 1. TIMERS PAR PHASE
+# =============================================================================
+class PhaseTimer:
+    """
+    Cumul du temps mural par phase (download, env_setup, rollout, train, upload...).
+    Deux appels à perf_counter par phase : négligeable devant un step d'environnement.
+    Désactivé (enabled=False), phase() ne mesure rien.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.totals = defaultdict(float)
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def phase(self, name: str):
+        return self._measure(name) if self.enabled else nullcontext()
+
+    @contextmanager
+    def _measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.totals[name] += seconds
+            self.counts[name] += 1
+
+    def summary(self):
+        """{phase: secondes cumulées} arrondi, pour le statut live"""
+        with self._lock:
+            return {name: round(seconds, 3) for name, seconds in self.totals.items()}
+
+    def as_metrics(self, prefix: str = "perf/"):
+        return {f"{prefix}{name}_seconds": seconds for name, seconds in self.summary().items()}
+
+
+# =============================================================================
+# 2. ROLLOUT VS TRAIN DANS LA BOUCLE SB3
+# =============================================================================
+class PhaseProfilingCallback(BaseCallback):
+    """
+    Découpe chaque itération de learn() en collecte (rollout) et mise à jour PPO (train) :
+    – rollout : de _on_rollout_start à _on_rollout_end ;
+    – train : de _on_rollout_end au _on_rollout_start suivant (ou à la fin de learn).
+    """
+
+    def __init__(self, timer: PhaseTimer, log_fn=None, verbose=0):
+        super().__init__(verbose)
+        self.timer = timer
+        self.log_fn = log_fn  # log_fn(metrics, step), ex. mlflow.log_metrics
+        self.env_steps_per_sec = None
+        self.updates_per_sec = None
+        self._n_updates = 0
+        self._rollout_start = None
+        self._train_start = None
+        self._rollout_steps = 0
+
+    def _on_training_start(self) -> None:
+        self._train_start = None
+        self._n_updates = getattr(self.model, "_n_updates", 0)
+
+    def _on_rollout_start(self) -> None:
+        now = time.perf_counter()
+        if self._train_start is not None:
+            train_seconds = now - self._train_start
+            self.timer.add("train", train_seconds)
+            # Compteur _n_updates de SB3 (une unité par epoch PPO) avancé pendant cette phase
+            n_updates = getattr(self.model, "_n_updates", 0)
+            if train_seconds > 0:
+                self.updates_per_sec = (n_updates - self._n_updates) / train_seconds
+            self._n_updates = n_updates
+            self._log({"perf/iteration_train_seconds": train_seconds,
+                       "perf/updates_per_sec": self.updates_per_sec or 0.0})
+        self._rollout_start = now
+        self._rollout_steps = self.num_timesteps
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_rollout_end(self) -> None:
+        now = time.perf_counter()
+        rollout_seconds = now - self._rollout_start
+        self.timer.add("rollout", rollout_seconds)
+        steps = self.num_timesteps - self._rollout_steps
+        if rollout_seconds > 0:
+            self.env_steps_per_sec = steps / rollout_seconds
+        self._log({"perf/iteration_rollout_seconds": rollout_seconds,
+                   "perf/env_steps_per_sec": self.env_steps_per_sec or 0.0})
+        self._train_start = now
+
+    def _on_training_end(self) -> None:
+        # learn() peut s'arrêter juste après une mise à jour : elle compte aussi
+        if self._train_start is not None:
+            self.timer.add("train", time.perf_counter() - self._train_start)
+            self._train_start = None
+
+    def _log(self, metrics):
+        if self.log_fn is None:
+            return
+        try:
+            self.log_fn(metrics, step=self.num_timesteps)
+        except Exception:
+            pass
+
+
+# =============================================================================
+# 3. PROFILEUR PAR ÉCHANTILLONNAGE (opt-in)
+# =============================================================================
+class SamplingProfiler:
+    """
+    Échantillonne la pile d'un thread à intervalle fixe (sys._current_frames) et
+    agrège les piles au format "folded" (une ligne "f1;f2;f3 N" par pile), lisible
+    par flamegraph.pl, speedscope ou inferno.
+    """
+
+    def __init__(self, thread_id: int = None, interval: float = 0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
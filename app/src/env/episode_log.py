@@ -0,0 +1,183 @@
+import argparse
+import struct
+import zlib
+
+import numpy as np
+
+# Format binaire d'un épisode (little-endian) :
+#   en-tête   : magic "SNKR", version, grid_size, game_mode, max_steps (0 = illimité), seed,
+#               nb d'actions, nb d'événements, CRC32 de la grille finale
+#   actions   : 2 bits par action, 4 actions par octet
+#   événements: (step, type, x, y) pour chaque interaction injectée avant ce step
+HEADER = struct.Struct("<4sBHBIQIII")
+EVENT = struct.Struct("<IBHH")
+MAGIC = b"SNKR"
+VERSION = 1
+
+GAME_MODES = ("classic", "walls")
+EVENT_KINDS = ("place_food", "place_wall", "set_game_mode")
+
+
+class EpisodeLog:
+    """
+    Journal compact d'un épisode : seed + actions + interactions (pomme / mur posés, changement de mode).
+    Tout le reste (positions des pommes et des murs aléatoires) se rejoue depuis la seed.
+    """
+
+    def __init__(self, seed: int, grid_size: int, game_mode: str = "classic", max_steps=150):
+        self.seed = int(seed)
+        self.grid_size = grid_size
+        self.game_mode = game_mode
+        self.max_steps = max_steps
+        self.actions = []
+        self.events = []  # (step, type, x, y) ; set_game_mode : x = index dans GAME_MODES
+        self.final_crc = 0
+
+    def __len__(self):
+        return len(self.actions)
+
+    def add_event(self, kind: str, x: int = 0, y: int = 0):
+        """ValueError dès l'enregistrement si (x, y) sort de la grille (sinon l'export échouerait en fin d'épisode)"""
+        x, y = int(x), int(y)
+        if kind == "set_game_mode":
+            valid = 0 <= x < len(GAME_MODES) and y == 0
+        else:
+            valid = 0 <= x < self.grid_size and 0 <= y < self.grid_size
+        if not valid:
+            raise ValueError(f"Interaction {kind} hors grille : ({x}, {y})")
+        self.events.append((len(self.actions), EVENT_KINDS.index(kind), x, y))
+
+    def to_bytes(self):
+        actions = np.asarray(self.actions, dtype=np.uint8)
+        padded = np.zeros(-(-len(actions) // 4) * 4, dtype=np.uint8)
+        padded[:len(actions)] = actions
+        packed = padded[0::4] | (padded[1::4] << 2) | (padded[2::4] << 4) | (padded[3::4] << 6)
+
+        max_steps = 0 if self.max_steps == float("inf") else int(self.max_steps)
+        header = HEADER.pack(MAGIC, VERSION, self.grid_size, GAME_MODES.index(self.game_mode), max_steps, self.seed,
+                             len(actions), len(self.events), self.final_crc)
+        return header + packed.tobytes() + b"".join(EVENT.pack(*event) for event in self.events)
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        magic, version, grid_size, mode, max_steps, seed, n_actions, n_events, crc = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Journal d'épisode invalide (magic ou version inconnus)")
+        log = cls(seed, grid_size, GAME_MODES[mode], max_steps or float("inf"))
+        log.final_crc = crc
+
+        offset = HEADER.size
+        n_packed = -(-n_actions // 4)
+        packed = np.frombuffer(data, dtype=np.uint8, count=n_packed, offset=offset)
+        actions = np.stack([(packed >> shift) & 3 for shift in (0, 2, 4, 6)], axis=1).reshape(-1)
+        log.actions = actions[:n_actions].tolist()
+
+        offset += n_packed
+        log.events = [EVENT.unpack_from(data, offset + i * EVENT.size) for i in range(n_events)]
+        return log
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def grid_crc(grid) -> int:
+    return zlib.crc32(np.ascontiguousarray(grid, dtype=np.int8).tobytes())
+
+
+class EpisodeReplayer:
+    """
+    Reconstruit n'importe quelle frame d'un épisode enregistré.
+
+    Rejoue l'épisode une fois en gardant un instantané de l'env toutes les
+    snapshot_every frames ; frame(t) repart de l'instantané précédent
+    (au plus snapshot_every - 1 steps rejoués).
+    """
+
+    def __init__(self, log: EpisodeLog, snapshot_every: int = 64):
+        from app.src.env.snake_env import SnakeEnv
+
+        self.log = log
+        self.snapshot_every = snapshot_every
+        self.env = SnakeEnv(grid_size=log.grid_size, max_steps=log.max_steps, game_mode=log.game_mode)
+        self._events = {}
+        for step, kind, x, y in log.events:
+            self._events.setdefault(step, []).append((kind, x, y))
+
+        self.env.reset(seed=log.seed)
+        self._t = 0
+        self._snapshots = [self.env.get_snapshot()]
+        while self._t < len(log):
+            self._advance()
+            if self._t % snapshot_every == 0:
+                self._snapshots.append(self.env.get_snapshot())
+        self.final_crc = grid_crc(self.env._grid)
+
+    def __len__(self):
+        """Nombre de frames (état initial + une par action)"""
+        return len(self.log) + 1
+
+    def verify(self):
+        """True si le rejeu retombe sur la grille finale enregistrée"""
+        return self.final_crc == self.log.final_crc
+
+    def frame(self, t: int):
+        """État après t actions : {step, grid, snake, food, walls, score}"""
+        if not 0 <= t < len(self):
+            raise IndexError(f"Frame {t} hors de l'épisode (0..{len(self) - 1})")
+        k = t // self.snapshot_every
+        self.env.set_snapshot(self._snapshots[k])
+        self._t = k * self.snapshot_every
+        while self._t < t:
+            self._advance()
+        return self._frame()
+
+    def frames(self):
+        """Toutes les frames dans l'ordre (un seul passage, sans retour aux instantanés)"""
+        self.env.set_snapshot(self._snapshots[0])
+        self._t = 0
+        yield self._frame()
+        while self._t < len(self.log):
+            self._advance()
+            yield self._frame()
+
+    def _advance(self):
+        for kind, x, y in self._events.get(self._t, ()):
+            if EVENT_KINDS[kind] == "set_game_mode":
+                self.env.set_game_mode(GAME_MODES[x])
+            else:
+                self.env.queue_interaction(EVENT_KINDS[kind], x, y)
+        self.env.step(self.log.actions[self._t])
+        self._t += 1
+
+    def _frame(self):
+        env = self.env
+        return {"step": self._t, "grid": env._grid.copy(), "snake": list(env.snake), "food": env.food,
+                "walls": list(env.walls), "score": len(env.snake) - 1}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rejoue un épisode Snake enregistré (.snkr)")
+    parser.add_argument("path")
+    parser.add_argument("--frame", type=int, default=None, help="Affiche cette frame dans la console")
+    parser.add_argument("--export", default=None, help="Filme l'épisode dans ce fichier (.gif ou archive .snkf)")
+    parser.add_argument("--cell-size", type=int, default=8)
+    args = parser.parse_args()
+
+    replayer = EpisodeReplayer(EpisodeLog.load(args.path))
+    log = replayer.log
+    print(f"🎞️ {len(log)} actions, {len(log.events)} interactions, grille {log.grid_size}x{log.grid_size} "
+          f"({log.game_mode}), seed {log.seed} — rejeu {'conforme' if replayer.verify() else 'DIVERGENT'}")
+    if args.frame is not None:
+        state = replayer.frame(args.frame)
+        print(f"Frame {state['step']} — score {state['score']}")
+        replayer.env._render_console()
+    if args.export:
+        from app.src.env.rendering import write_episode
+        n_frames = write_episode(replayer, args.export, cell_size=args.cell_size)
+        print(f"🎬 {n_frames} frames → {args.export}")
@@ -0,0 +1,94 @@
+import numpy as np
+from gymnasium import spaces
+
+# Modes d'observation :
+# – "grid" : grille complète (G, G) int8, la taille d'entrée du réseau suit l'aire de la grille.
+# – "egocentric" : fenêtre (2r+1)² centrée sur la tête + quelques features globales,
+#   taille fixe quelle que soit la grille (un même modèle peut jouer sur toutes les tailles).
+OBS_MODES = ("grid", "egocentric")
+DEFAULT_VIEW_RADIUS = 5
+
+# Codes de cases (identiques à SnakeEnv) ; hors grille = mur
+EMPTY, BODY, FOOD, WALL = 0, 1, 2, 3
+
+# Features globales : direction de la pomme (Δligne, Δcolonne) / G, longueur / G², timer du mur, recharge
+N_FEATURES = 5
+
+
+def observation_spec(metadata: dict = None):
+    """Mode d'observation d'un modèle d'après ses métadonnées (les anciens modèles sont en "grid")"""
+    spec = dict((metadata or {}).get("observation") or {})
+    mode = spec.get("mode", "grid")
+    if mode not in OBS_MODES:
+        raise ValueError(f"Mode d'observation inconnu : {mode} (attendu : {', '.join(OBS_MODES)})")
+    if mode == "egocentric":
+        return {"mode": mode, "radius": int(spec.get("radius", DEFAULT_VIEW_RADIUS))}
+    return {"mode": mode}
+
+
+def spec_from_space(observation_space):
+    """Mode d'observation déduit de l'espace d'un modèle chargé (grille 2D ou vecteur égocentrique)"""
+    shape = tuple(observation_space.shape)
+    if len(shape) == 2:
+        return {"mode": "grid"}
+    side = int(round((shape[0] - N_FEATURES) ** 0.5))
+    return {"mode": "egocentric", "radius": (side - 1) // 2}
+
+
+def make_observation_space(obs_mode: str, grid_size: int, view_radius: int = DEFAULT_VIEW_RADIUS):
+    if obs_mode == "grid":
+        return spaces.Box(low=0, high=3, shape=(grid_size, grid_size), dtype=np.int8)
+    if obs_mode == "egocentric":
+        side = 2 * view_radius + 1
+        return spaces.Box(low=-1, high=3, shape=(side * side + N_FEATURES,), dtype=np.float32)
+    raise ValueError(f"Mode d'observation inconnu : {obs_mode} (attendu : {', '.join(OBS_MODES)})")
+
+
+def egocentric_batch(grids, heads, foods, lengths, wall_timer, wall_cooldown, radius: int,
+                     wall_duration: int = 3, cooldown_time: int = 6):
+    """
+    Observations égocentriques de N parties en un appel NumPy.
+    grids (N, G, G), heads / foods (N, 2) en (ligne, colonne), lengths / wall_timer / wall_cooldown (N,).
+    Coût en O(N·(2r+1)²) : la grille n'est jamais copiée ni paddée.
+    """
+    n, g = grids.shape[0], grids.shape[1]
+    cells = (2 * radius + 1) ** 2
+    offsets = np.arange(-radius, radius + 1)
+    rows = heads[:, 0, None] + offsets
+    cols = heads[:, 1, None] + offsets
+    inside = ((rows >= 0) & (rows < g))[:, :, None] & ((cols >= 0) & (cols < g))[:, None, :]
+    # Index plats dans le batch de grilles : un seul take pour toutes les fenêtres
+    flat = (np.arange(n)[:, None, None] * g + np.clip(rows, 0, g - 1)[:, :, None]) * g + np.clip(cols, 0, g - 1)[:, None, :]
+
+    obs = np.empty((n, cells + N_FEATURES), dtype=np.float32)
+    obs[:, :cells] = np.where(inside, grids.reshape(-1).take(flat), WALL).reshape(n, cells)
+    obs[:, cells] = (foods[:, 0] - heads[:, 0]) / g
+    obs[:, cells + 1] = (foods[:, 1] - heads[:, 1]) / g
+    obs[:, cells + 2] = lengths / (g * g)
+    obs[:, cells + 3] = wall_timer / wall_duration
+    obs[:, cells + 4] = wall_cooldown / cooldown_time
+    return obs
+
+
+def egocentric_observation(grid, head, food, length: int, wall_timer: int = 0, wall_cooldown: int = 0,
+                           radius: int = DEFAULT_VIEW_RADIUS, wall_duration: int = 3, cooldown_time: int = 6):
+    """Version une partie de egocentric_batch (food=None : pas de pomme, direction nulle)"""
+    food = head if food is None else food
+    return egocentric_batch(np.asarray(grid)[None], np.asarray([head]), np.asarray([food]), np.asarray([length]),
+                            np.asarray([wall_timer]), np.asarray([wall_cooldown]), radius,
+                            wall_duration, cooldown_time)[0]
+
+
+def observation_from_grid(grid, spec: dict, head=None, wall_timer: int = 0, wall_cooldown: int = 0):
+    """
+    Observation attendue par un modèle à partir d'une grille reçue par l'API.
+    En mode égocentrique, la tête (ligne, colonne) est nécessaire : la grille ne la distingue pas du corps.
+    """
+    grid = np.asarray(grid)
+    if spec["mode"] == "grid":
+        return grid.astype(np.float32)
+    if head is None:
+        raise ValueError("Position de la tête requise pour un modèle à observation égocentrique")
+    food = np.argwhere(grid == FOOD)
+    return egocentric_observation(grid, tuple(head), tuple(food[0]) if len(food) else None,
+                                  int((grid == BODY).sum()), wall_timer, wall_cooldown, spec["radius"])
@@ -0,0 +1,294 @@
+import struct
+import zlib
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+# Rendu sans pygame : chaque case est une tuile précalculée (cell_size x cell_size)
+# d'index de palette, une grille entière se peint en une indexation NumPy.
+# Les couleurs sont celles du rendu pygame de SnakeEnv.
+EMPTY, BODY, FOOD, WALL = 0, 1, 2, 3
+HEAD = 4  # Code de rendu uniquement : la grille ne distingue pas la tête du corps
+
+PALETTE = np.array([
+    (20, 20, 20),  # 0 : fond
+    (241, 196, 15),  # 1 : corps (jaune)
+    (231, 76, 60),  # 2 : pomme (rouge)
+    (52, 152, 219),  # 3 : mur (bleu)
+    (41, 128, 185),  # 4 : bordure intérieure du mur
+    (46, 204, 113),  # 5 : tête (vert)
+], dtype=np.uint8)
+
+WALL_INSET = 4
+DEFAULT_CELL_SIZE = 8
+
+
+@lru_cache(maxsize=None)
+def cell_tiles(cell_size: int, rgb: bool = False):
+    """
+    Tuiles (5, cs, cs) d'index de palette, une par code de case (EMPTY, BODY, FOOD, WALL, HEAD).
+    rgb=True : mêmes tuiles en couleurs (5, cs, cs, 3).
+    """
+    tiles = np.zeros((5, cell_size, cell_size), dtype=np.uint8)
+    tiles[BODY] = 1
+    tiles[FOOD] = 2
+    tiles[WALL] = 3
+    tiles[WALL, WALL_INSET:cell_size - WALL_INSET, WALL_INSET:cell_size - WALL_INSET] = 4
+    tiles[HEAD] = 5
+    if rgb:
+        tiles = PALETTE[tiles]
+    tiles.setflags(write=False)
+    return tiles
+
+
+# =============================================================================
+# 1. RASTERISATION
+# =============================================================================
+def _paint(grids, heads, cell_size: int, size: int, rgb: bool):
+    grids = np.asarray(grids)
+    n, g = grids.shape[0], grids.shape[1]
+    codes = grids.astype(np.uint8)
+    if heads is not None:
+        heads = np.asarray(heads)
+        codes[np.arange(n), heads[:, 0], heads[:, 1]] = HEAD
+
+    tiles = cell_tiles(cell_size, rgb)
+    side = g * cell_size
+    size = size or side
+    frames = np.empty((n, size, size) + tiles.shape[3:], dtype=np.uint8)
+    background = PALETTE[EMPTY] if rgb else EMPTY
+    frames[:, side:] = background  # Marge autour de la grille (fenêtre plus grande que G * cs)
+    frames[:, :side, side:] = background
+
+    # Vue (N, G, cs, G, cs) sur la zone de la grille : une copie de tuile par case, sans reshape intermédiaire
+    board = frames[:, :side, :side]
+    board.shape = (n, g, cell_size, g, cell_size) + tiles.shape[3:]
+    board[...] = tiles[codes].swapaxes(2, 3)
+    return frames
+
+
+def render_indexed(grids, heads=None, cell_size: int = DEFAULT_CELL_SIZE, size: int = None):
+    """
+    Frames en index de palette (N, H, W) uint8 pour un batch de grilles (N, G, G).
+    heads (N, 2) en (ligne, colonne), optionnel : la tête est peinte en vert.
+    size : côté de l'image (fond autour de la grille, comme la fenêtre pygame), G * cell_size par défaut.
+    """
+    return _paint(grids, heads, cell_size, size, rgb=False)
+
+
+def to_rgb(indexed):
+    """Index de palette (…, H, W) → RGB (…, H, W, 3) uint8"""
+    return PALETTE[indexed]
+
+
+def render_batch(grids, heads=None, cell_size: int = DEFAULT_CELL_SIZE, size: int = None):
+    """Frames RGB (N, H, W, 3) uint8 d'un batch de grilles (voir render_indexed)"""
+    return _paint(grids, heads, cell_size, size, rgb=True)
+
+
+def render_grid(grid, head=None, cell_size: int = DEFAULT_CELL_SIZE, size: int = None):
+    """Frame RGB (H, W, 3) d'une seule grille"""
+    return render_batch(np.asarray(grid)[None], None if head is None else [head], cell_size, size)[0]
+
+
+# =============================================================================
+# 2. GIF ANIMÉ (ENCODEUR LZW INTÉGRÉ)
+# =============================================================================
+def _lzw_encode(pixels: bytes, min_code_size: int):
+    """Compression LZW au format GIF (codes de largeur variable, LSB en premier)"""
+    clear, eoi = 1 << min_code_size, (1 << min_code_size) + 1
+    out = bytearray()
+    acc = n_acc = 0
+
+    code_size = min_code_size + 1
+    next_code = eoi + 1
+    table = {}
+    acc |= clear << n_acc
+    n_acc += code_size
+
+    prefix = pixels[0]
+    for px in pixels[1:]:
+        key = (prefix << 8) | px
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        acc |= prefix << n_acc
+        n_acc += code_size
+        while n_acc >= 8:
+            out.append(acc & 0xFF)
+            acc >>= 8
+            n_acc -= 8
+        if next_code == 4096:
+            # Table pleine : on repart d'une table vide
+            acc |= clear << n_acc
+            n_acc += code_size
+            table.clear()
+            code_size = min_code_size + 1
+            next_code = eoi + 1
+        else:
+            table[key] = next_code
+            next_code += 1
+            if next_code > (1 << code_size) and code_size < 12:
+                code_size += 1
+        prefix = px
+
+    for code in (prefix, eoi):
+        acc |= code << n_acc
+        n_acc += code_size
+    while n_acc > 0:
+        out.append(acc & 0xFF)
+        acc >>= 8
+        n_acc -= 8
+    return bytes(out)
+
+
+def _sub_blocks(data: bytes):
+    return b"".join(bytes((len(data[i:i + 255]),)) + data[i:i + 255] for i in range(0, len(data), 255)) + b"\x00"
+
+
+class GifWriter:
+    """
+    GIF animé écrit au fil de l'eau, frame par frame (index de palette, pas de quantification).
+
+    Seul le rectangle qui a changé depuis la frame précédente est encodé (la tête,
+    la queue et la pomme en général) ; une frame identique allonge la durée de la précédente.
+    Une frame est gardée en attente pour pouvoir allonger sa durée : close() l'écrit.
+    """
+
+    def __init__(self, path, fps: int = 10, loop: int = 0):
+        self.path = Path(path)
+        self.delay = max(1, round(100 / fps))  # Centièmes de seconde
+        self.loop = loop
+        self.n_frames = 0
+        self._file = open(self.path, "wb")
+        self._previous = None
+        self._pending = None  # (x, y, patch, delay)
+
+    def write(self, frame):
+        """Ajoute une frame (H, W) d'index de palette ; un batch (N, H, W) ajoute N frames"""
+        frame = np.asarray(frame, dtype=np.uint8)
+        if frame.ndim == 3:
+            for f in frame:
+                self.write(f)
+            return
+        self.n_frames += 1
+        if self._previous is None:
+            self._write_header(frame.shape)
+            self._queue(0, 0, frame)
+        else:
+            changed = frame != self._previous
+            rows, cols = np.flatnonzero(changed.any(axis=1)), np.flatnonzero(changed.any(axis=0))
+            if rows.size == 0:
+                self._pending[3] += self.delay
+                return
+            y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+            self._queue(x0, y0, frame[y0:y1, x0:x1])
+        self._previous = frame.copy()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._flush()
+        self._file.write(b";")
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_header(self, shape):
+        height, width = shape
+        colors = np.zeros((8, 3), dtype=np.uint8)  # Table globale de 8 couleurs (3 bits)
+        colors[:len(PALETTE)] = PALETTE
+        self._file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0xF2, 0, 0) + colors.tobytes())
+        # Extension NETSCAPE : nombre de boucles (0 = infini)
+        self._file.write(b"\x21\xFF\x0BNETSCAPE2.0\x03\x01" + struct.pack("<H", self.loop) + b"\x00")
+
+    def _queue(self, x, y, patch):
+        self._flush()
+        self._pending = [int(x), int(y), patch, self.delay]
+
+    def _flush(self):
+        if self._pending is None:
+            return
+        x, y, patch, delay = self._pending
+        height, width = patch.shape
+        self._file.write(b"\x21\xF9\x04" + struct.pack("<BHBB", 0x04, delay, 0, 0) + b"\x00")  # Délai, pas de disposal
+        self._file.write(b"\x2C" + struct.pack("<HHHHB", x, y, width, height, 0))
+        self._file.write(b"\x03" + _sub_blocks(_lzw_encode(patch.tobytes(), 3)))
+        self._pending = None
+
+
+# =============================================================================
+# 3. ARCHIVE DE FRAMES BRUTES
+# =============================================================================
+# Format (little-endian) : en-tête "SNKF", version, hauteur, largeur, palette (6 x RGB),
+# puis pour chaque frame : taille compressée (uint32) + index de palette compressés (zlib).
+ARCHIVE_HEADER = struct.Struct("<4sBHH")
+ARCHIVE_MAGIC = b"SNKF"
+ARCHIVE_VERSION = 1
+
+
+class FrameArchiveWriter:
+    """Frames en index de palette (1 octet par pixel, zlib), relues à l'identique par read_frame_archive"""
+
+    def __init__(self, path, compress_level: int = 1):
+        self.path = Path(path)
+        self.compress_level = compress_level
+        self.n_frames = 0
+        self._file = open(self.path, "wb")
+        self._shape = None
+
+    def write(self, frame):
+        frame = np.asarray(frame, dtype=np.uint8)
+        if frame.ndim == 3:
+            for f in frame:
+                self.write(f)
+            return
+        if self._shape is None:
+            self._shape = frame.shape
+            self._file.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, *frame.shape) + PALETTE.tobytes())
+        elif frame.shape != self._shape:
+            raise ValueError(f"Frame {frame.shape} incompatible avec l'archive {self._shape}")
+        data = zlib.compress(np.ascontiguousarray(frame).tobytes(), self.compress_level)
+        self._file.write(struct.pack("<I", len(data)) + data)
+        self.n_frames += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_frame_archive(path):
+    """Itère sur les frames (H, W) d'index de palette d'une archive (to_rgb pour les couleurs)"""
+    with open(path, "rb") as f:
+        magic, version, height, width = ARCHIVE_HEADER.unpack(f.read(ARCHIVE_HEADER.size))
+        if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+            raise ValueError("Archive de frames invalide (magic ou version inconnus)")
+        f.read(PALETTE.nbytes)
+        while size := f.read(4):
+            data = zlib.decompress(f.read(struct.unpack("<I", size)[0]))
+            yield np.frombuffer(data, dtype=np.uint8).reshape(height, width)
+
+
+def open_frame_writer(path, fps: int = 10):
+    """GifWriter pour un .gif, FrameArchiveWriter sinon"""
+    return GifWriter(path, fps=fps) if Path(path).suffix.lower() == ".gif" else FrameArchiveWriter(path)
+
+
+def write_episode(replayer, path, cell_size: int = DEFAULT_CELL_SIZE, fps: int = 10):
+    """Rend toutes les frames d'un EpisodeReplayer dans un .gif ou une archive de frames"""
+    with open_frame_writer(path, fps) as writer:
+        for state in replayer.frames():
+            head = [state["snake"][0]] if state["snake"] else None
+            writer.write(render_indexed(state["grid"][None], head, cell_size))
+    return writer.n_frames
@@ -0,0 +1,206 @@
+import ctypes
+import multiprocessing as mp
+import os
+
+import numpy as np
+from stable_baselines3.common.env_util import is_wrapped
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnv
+
+
+def _shared_array(ctx, shape, dtype):
+    """Tableau NumPy adossé à une RawArray partagée (aucune copie entre processus)"""
+    dtype = np.dtype(dtype)
+    raw = ctx.RawArray(ctypes.c_byte, max(1, int(np.prod(shape)) * dtype.itemsize))
+    return raw, np.frombuffer(raw, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+
+def _as_array(raw, shape, dtype):
+    dtype = np.dtype(dtype)
+    return np.frombuffer(raw, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+
+def _call_env(env, cmd, args):
+    """get_attr / set_attr / env_method / is_wrapped sur un environnement du worker"""
+    if cmd == "get_attr":
+        return env.get_wrapper_attr(args)
+    if cmd == "set_attr":
+        setattr(env.unwrapped, *args)
+        return None
+    if cmd == "env_method":
+        name, method_args, method_kwargs = args
+        return env.get_wrapper_attr(name)(*method_args, **method_kwargs)
+    return is_wrapped(env, args)
+
+
+def _worker(remote, parent_remote, env_fns, start, buffers, specs, core):
+    """Boucle d'un worker : fait avancer sa tranche d'environnements, écrit dans la mémoire partagée"""
+    parent_remote.close()
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {core})
+        except OSError:
+            pass
+
+    envs = [fn() for fn in env_fns.var]
+    obs, terminal_obs, rewards, dones, actions = (_as_array(raw, *spec) for raw, spec in zip(buffers, specs))
+    stop = start + len(envs)
+
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                infos = []
+                for i, env in zip(range(start, stop), envs):
+                    ob, reward, terminated, truncated, info = env.step(actions[i])
+                    done = terminated or truncated
+                    info["TimeLimit.truncated"] = truncated and not terminated
+                    if done:
+                        # L'observation terminale passe par la mémoire partagée, pas par le pipe
+                        terminal_obs[i] = ob
+                        ob, _ = env.reset()
+                    obs[i] = ob
+                    rewards[i] = reward
+                    dones[i] = done
+                    infos.append(info)
+                remote.send(infos)
+            elif cmd == "reset":
+                seeds, options = data
+                reset_infos = []
+                for j, (i, env) in enumerate(zip(range(start, stop), envs)):
+                    ob, info = env.reset(seed=seeds[j], options=options[j])
+                    obs[i] = ob
+                    reset_infos.append(info)
+                remote.send(reset_infos)
+            elif cmd in ("get_attr", "set_attr", "env_method", "is_wrapped"):
+                # Appels ciblés : data = (indices locaux, arguments)
+                local, args = data
+                remote.send([_call_env(envs[j], cmd, args) for j in local])
+            elif cmd == "close":
+                for env in envs:
+                    env.close()
+                remote.close()
+                break
+    except KeyboardInterrupt:
+        pass
+
+
+class ShmSubprocVecEnv(VecEnv):
+    """
+    VecEnv multi-processus dont les échanges passent par de la mémoire partagée.
+
+    – Les N environnements sont répartis en tranches contiguës sur n_workers processus.
+    – Actions, observations (y compris terminales), rewards et dones vivent dans des
+      RawArray préallouées : seul un message de commande (et les infos) transite par le pipe.
+    – Chaque worker peut être épinglé sur un cœur (pin_cores) pour éviter les migrations.
+    """
+
+    def __init__(self, env_fns, n_workers: int = None, pin_cores: bool = True, start_method: str = None):
+        n_envs = len(env_fns)
+        n_workers = max(1, min(n_workers or os.cpu_count() or 1, n_envs))
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+
+        # Espaces lus sur un environnement sonde (puis fermé)
+        probe = env_fns[0]()
+        observation_space, action_space = probe.observation_space, probe.action_space
+        probe.close()
+
+        obs_shape, obs_dtype = (n_envs, *observation_space.shape), observation_space.dtype
+        act_shape = (n_envs, *action_space.shape)
+        self._specs = [
+            (obs_shape, obs_dtype), (obs_shape, obs_dtype),
+            ((n_envs,), np.float32), ((n_envs,), np.bool_), (act_shape, action_space.dtype),
+        ]
+        raws, arrays = zip(*(_shared_array(ctx, *spec) for spec in self._specs))
+        self._obs, self._terminal_obs, self._rewards, self._dones, self._actions = arrays
+
+        cores = sorted(os.sched_getaffinity(0)) if pin_cores and hasattr(os, "sched_getaffinity") else None
+        bounds = np.linspace(0, n_envs, n_workers + 1).astype(int)
+        self._slices = list(zip(bounds[:-1], bounds[1:]))
+
+        self.remotes, self.processes = [], []
+        for w, (start, stop) in enumerate(self._slices):
+            remote, work_remote = ctx.Pipe()
+            core = cores[w % len(cores)] if cores else None
+            process = ctx.Process(
+                target=_worker, daemon=True,
+                args=(work_remote, remote, CloudpickleWrapper(env_fns[start:stop]), int(start), raws, self._specs, core),
+            )
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+        self.waiting = False
+        self.closed = False
+        super().__init__(n_envs, observation_space, action_space)
+
+    # =========================================================================
+    # API VecEnv
+    # =========================================================================
+    def step_async(self, actions):
+        self._actions[:] = np.asarray(actions).reshape(self._actions.shape)
+        for remote in self.remotes:
+            remote.send(("step", None))
+        self.waiting = True
+
+    def step_wait(self):
+        infos = [info for remote in self.remotes for info in remote.recv()]
+        self.waiting = False
+        for i in np.flatnonzero(self._dones):
+            infos[i]["terminal_observation"] = self._terminal_obs[i].copy()
+        return self._obs.copy(), self._rewards.copy(), self._dones.copy(), infos
+
+    def reset(self):
+        for remote, (start, stop) in zip(self.remotes, self._slices):
+            remote.send(("reset", (self._seeds[start:stop], self._options[start:stop])))
+        self.reset_infos = [info for remote in self.remotes for info in remote.recv()]
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs.copy()
+
+    def close(self):
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv()
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        self.closed = True
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call("get_attr", attr_name, indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call("set_attr", (attr_name, value), indices)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._call("env_method", (method_name, method_args, method_kwargs), indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return self._call("is_wrapped", wrapper_class, indices)
+
+    def _call(self, cmd, data, indices):
+        """Envoie la commande aux workers concernés et renvoie les résultats des indices demandés"""
+        indices = list(self._get_indices(indices))
+        by_worker = {}
+        for i in indices:
+            w = self._worker_of(i)
+            by_worker.setdefault(w, []).append(i)
+        for w, targets in by_worker.items():
+            start = self._slices[w][0]
+            self.remotes[w].send((cmd, ([i - start for i in targets], data)))
+        results = {}
+        for w, targets in by_worker.items():
+            results.update(zip(targets, self.remotes[w].recv()))
+        return [results[i] for i in indices]
+
+    def _worker_of(self, env_idx):
+        for w, (start, stop) in enumerate(self._slices):
+            if start <= env_idx < stop:
+                return w
+        raise IndexError(env_idx)
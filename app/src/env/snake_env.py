@@ -1,8 +1,11 @@
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
-import random
-import pygame
+from collections import deque
+
+from app.src.env.observations import DEFAULT_VIEW_RADIUS, egocentric_observation, make_observation_space
+from app.src.env.episode_log import EpisodeLog, grid_crc
+from app.src.env.rendering import render_grid
 
 # Codes ANSI pour le rendu Console (utile pour le debug)
 RESET = "\033[0m"
@@ -21,14 +24,30 @@ class SnakeEnv(gym.Env):
     – "classic" : Mode standard (juste des pommes).
     – "walls" : Mode avancé (pommes + murs dynamiques).
 
+    Observation (obs_mode) :
+    – "grid" : grille complète (grid_size, grid_size).
+    – "egocentric" : fenêtre de rayon view_radius centrée sur la tête + features globales
+      (voir observations.py), de taille fixe quelle que soit la grille.
+
     Dynamique des murs :
     – Apparaissent via interaction utilisateur ou aléatoirement.
     – Restent affichés pendant WALL_DURATION steps.
     – Disparaissent ensuite durant WALL_COOLDOWN_TIME steps.
+
+    État incrémental (tout est mis à jour sur place, en O(1) par step) :
+    – snake : deque du corps (tête en 0) + _body_set pour les collisions.
+    – _grid : grille d'occupation persistante (c'est l'observation).
+    – _free / _free_pos : index des cases vides (suppression par swap) pour tirer
+      une case vide aléatoire sans parcourir la grille.
+
+    Aléatoire : pommes et murs sont tirés dans self.np_random (propre à chaque env),
+    reset(seed=...) rend donc l'épisode reproductible. Avec record=True, chaque épisode
+    est journalisé (seed, actions, interactions) dans episode_log (voir episode_log.py).
     """
     metadata = {"render_modes": ["human", "pygame", "rgb_array"], "render_fps": 10}
 
-    def __init__(self, grid_size=10, render_mode=None, max_steps=150, game_mode="classic"):
+    def __init__(self, grid_size=10, render_mode=None, max_steps=150, game_mode="classic", obs_mode="grid",
+                 view_radius=DEFAULT_VIEW_RADIUS, record=False):
         super().__init__()
 
         self.step_count = None
@@ -38,8 +57,12 @@ class SnakeEnv(gym.Env):
         self.render_mode = render_mode
         self.max_steps = max_steps
         self.game_mode = game_mode  # "classic" ou "walls"
+        self.obs_mode = obs_mode  # "grid" ou "egocentric"
+        self.view_radius = view_radius
+        self.record = record
+        self.episode_log = None
 
-        # Paramètres Pygame
+        # Paramètres de rendu (fenêtre pygame et frames rgb_array)
         self.window_size = 500
         self.cell_size = self.window_size // self.grid_size
         self.window = None
@@ -62,31 +85,50 @@ class SnakeEnv(gym.Env):
         # Actions : 0=Haut, 1=Bas, 2=Gauche, 3=Droite
         self.action_space = spaces.Discrete(4)
 
-        # Observation : Grille 2D
+        # Observation : Grille 2D (ou fenêtre égocentrique)
         # 0 : Vide, 1 : Serpent, 2 : Nourriture, 3 : Mur temporaire
-        self.observation_space = spaces.Box(
-            low=0, high=3, shape=(grid_size, grid_size), dtype=np.int8
-        )
+        self.observation_space = make_observation_space(obs_mode, grid_size, view_radius)
+
+        # --- ÉTAT INCRÉMENTAL ---
+        self._grid = np.zeros((grid_size, grid_size), dtype=np.int8)
+        self._body_set = set()
+        self._free = []  # Cases vides (index plat r * grid_size + c)
+        self._free_pos = []  # Position de chaque case dans _free
+        self._n_free = 0  # Les _n_free premières entrées de _free sont vides
 
         self.reset()
 
     def set_game_mode(self, mode):
         """Change le mode de jeu à la volée (appelé par l'API)"""
         if mode in ["classic", "walls"]:
+            if self.episode_log is not None:
+                self.episode_log.add_event("set_game_mode", ["classic", "walls"].index(mode))
             self.game_mode = mode
             # Nettoyage immédiat si on repasse en classique
             if mode == "classic":
-                self.walls = []
+                self._clear_walls()
                 self.wall_timer = 0
                 self.wall_cooldown = 0
             print(f"Mode de jeu changé : {mode}")
 
     def reset(self, seed=None, options=None):
+        if self.record and seed is None:
+            # Enregistrement : chaque épisode a sa propre seed explicite (tirée dans le flux de l'env)
+            seed = int(self.np_random.integers(2 ** 63))
         super().reset(seed=seed)
 
+        # Reset de l'état incrémental (grille vide, toutes les cases libres)
+        n_cells = self.grid_size * self.grid_size
+        self._grid.fill(0)
+        self._free = list(range(n_cells))
+        self._free_pos = list(range(n_cells))
+        self._n_free = n_cells
+        self._body_set = set()
+
         # Reset du Serpent (au centre)
         start_pos = (self.grid_size // 2, self.grid_size // 2)
-        self.snake = [start_pos]
+        self.snake = deque()
+        self._push_head(start_pos)
 
         #  Reset des mécanismes de jeu
         self.walls = []
@@ -100,6 +142,8 @@ class SnakeEnv(gym.Env):
         self._place_food()
 
         self.step_count = 0
+        if self.record:
+            self.episode_log = EpisodeLog(seed, self.grid_size, self.game_mode, self.max_steps)
 
         if self.render_mode == "pygame":
             self._render_frame()
@@ -108,6 +152,8 @@ class SnakeEnv(gym.Env):
 
     def step(self, action):
         self.step_count += 1
+        if self.episode_log is not None:
+            self.episode_log.actions.append(int(action))
 
         # --- PHASE 1 : GESTION DES MURS DYNAMIQUES ---
 
@@ -115,7 +161,7 @@ class SnakeEnv(gym.Env):
         if self.walls:
             self.wall_timer -= 1
             if self.wall_timer <= 0:
-                self.walls = []  # Ils disparaissent
+                self._clear_walls()  # Ils disparaissent
                 self.wall_cooldown = self.WALL_COOLDOWN_TIME  # Début du temps de recharge
 
         # Cas B : Pas de murs, mais on est en recharge → On décrémente le cooldown
@@ -132,16 +178,15 @@ class SnakeEnv(gym.Env):
                 self.pending_wall_position = None  # Action consommée
 
             # Priorité 2 : Aléatoire (Entraînement ou Idle)
-            elif random.random() < self.WALL_RANDOM_PROB:
-                empty_cells = self._get_empty_cells()
-                if empty_cells:
-                    target_wall = random.choice(empty_cells)
+            elif self.np_random.random() < self.WALL_RANDOM_PROB:
+                target_wall = self._sample_empty_cell()
 
             # Application du mur (si valide)
             if target_wall:
                 # Sécurité critique : Ne pas faire apparaître SUR le serpent ou la pomme
-                if target_wall not in self.snake and target_wall != self.food:
+                if self._is_empty(target_wall):
                     self.walls = [target_wall]
+                    self._set_cell(target_wall, 3)
                     self.wall_timer = self.WALL_DURATION
 
         # --- PHASE 2 : MOUVEMENT ---
@@ -160,6 +205,7 @@ class SnakeEnv(gym.Env):
 
         # --- PHASE 3 : COLLISIONS & RÉCOMPENSES ---
         terminated = False
+        death_cause = None
 
         # Vérification des collisions (Murs Bordure OU Corps OU Murs Dynamiques)
         tail = self.snake[-1]
@@ -170,24 +216,28 @@ class SnakeEnv(gym.Env):
                 new_head in self.walls):
 
             terminated = True
+            death_cause = "wall" if new_head in self.walls else "border"
             reward = -1
 
         # Collision avec le corps (sauf la queue si elle bouge)
-        elif new_head in self.snake and not (new_head == tail and not is_eating):
+        elif new_head in self._body_set and not (new_head == tail and not is_eating):
             terminated = True
+            death_cause = "self"
             reward = -1
 
         else:
-            # Avancer toujours ici
-            self.snake.insert(0, new_head)
-
             if is_eating:
+                # Avancer toujours ici
+                self._push_head(new_head)
                 reward = 1
                 placed = self._place_food()
                 if not placed:
                     terminated = True
+                    death_cause = "board_full"  # Grille remplie : partie gagnée
             else:
-                self.snake.pop()
+                # La queue libère sa case avant que la tête n'avance (elle peut la reprendre)
+                self._pop_tail()
+                self._push_head(new_head)
                 reward = -0.01
 
         # Troncature (Max steps atteint)
@@ -197,7 +247,8 @@ class SnakeEnv(gym.Env):
         if self.render_mode == "pygame":
             self._render_frame()
 
-        return self._get_obs(), reward, terminated, truncated, {}
+        info = {"death_cause": death_cause} if terminated else {}
+        return self._get_obs(), reward, terminated, truncated, info
 
     def queue_interaction(self, action_type, x, y):
         """
@@ -207,6 +258,10 @@ class SnakeEnv(gym.Env):
         # Conversion Frontend (x,y) -> Backend (row, col) si nécessaire
         # Ici on suppose que le front envoie x=col, y=row.
         target = (y, x)
+        if not (0 <= x < self.grid_size and 0 <= y < self.grid_size):
+            return  # Clic hors grille : ignoré (ni appliqué ni journalisé)
+        if self.episode_log is not None and action_type in ("place_food", "place_wall"):
+            self.episode_log.add_event(action_type, x, y)
 
         if action_type == "place_food":
             self.pending_food_position = target
@@ -222,50 +277,113 @@ class SnakeEnv(gym.Env):
         if self.pending_food_position:
             pos = self.pending_food_position
             # Vérif qu'on ne pose pas sur un obstacle
-            if pos not in self.snake and pos not in self.walls:
+            if self._is_empty(pos):
                 self.food = pos
+                self._set_cell(pos, 2)
                 self.pending_food_position = None
                 return True
 
         # 2. Auto
-        empty_cells = self._get_empty_cells()
-        if empty_cells:
-            self.food = random.choice(empty_cells)
+        cell = self._sample_empty_cell()
+        if cell is not None:
+            self.food = cell
+            self._set_cell(cell, 2)
             return True
         return False
 
-    def _get_empty_cells(self):
-        return [
-            (r, c) for r in range(self.grid_size) for c in range(self.grid_size)
-            if (r, c) not in self.snake and (r, c) not in self.walls and (r, c) != self.food
-        ]
+    # --- ÉTAT INCRÉMENTAL (O(1)) ---
+    def _is_empty(self, pos):
+        r, c = pos
+        return 0 <= r < self.grid_size and 0 <= c < self.grid_size and self._grid[r, c] == 0
+
+    def _set_cell(self, pos, value):
+        """Écrit une case de la grille et tient l'index des cases vides à jour"""
+        r, c = pos
+        was_empty = self._grid[r, c] == 0
+        self._grid[r, c] = value
+        k = r * self.grid_size + c
+        if was_empty and value != 0:
+            # Swap-remove : la case k prend la place de la dernière case libre
+            self._n_free -= 1
+            i, last = self._free_pos[k], self._free[self._n_free]
+            self._free[i], self._free_pos[last] = last, i
+            self._free[self._n_free], self._free_pos[k] = k, self._n_free
+        elif not was_empty and value == 0:
+            i, first_used = self._free_pos[k], self._free[self._n_free]
+            self._free[i], self._free_pos[first_used] = first_used, i
+            self._free[self._n_free], self._free_pos[k] = k, self._n_free
+            self._n_free += 1
+
+    def _sample_empty_cell(self):
+        if self._n_free == 0:
+            return None
+        return divmod(self._free[int(self.np_random.integers(self._n_free))], self.grid_size)
+
+    def _push_head(self, pos):
+        self.snake.appendleft(pos)
+        self._body_set.add(pos)
+        self._set_cell(pos, 1)
+
+    def _pop_tail(self):
+        tail = self.snake.pop()
+        self._body_set.discard(tail)
+        self._set_cell(tail, 0)
+
+    def _clear_walls(self):
+        for pos in self.walls:
+            self._set_cell(pos, 0)
+        self.walls = []
 
     def _get_obs(self):
-        """Génère la matrice d'observation pour l'IA"""
-        grid = np.zeros((self.grid_size, self.grid_size), dtype=np.int8)
-
-        # 1 = Corps
-        for r, c in self.snake:
-            grid[r, c] = 1
-
-        # 2 = Nourriture
-        if self.food:
-            grid[self.food[0], self.food[1]] = 2
-
-        # 3 = Murs Dynamiques
-        for r, c in self.walls:
-            grid[r, c] = 3
-
-        # [NOUVEAU] Sauvegarde pour l'API externe (Streaming)
-        self.current_grid_state = grid.tolist()
+        """Retourne la matrice d'observation pour l'IA (copie de la grille persistante)"""
+        # 0 : Vide, 1 : Corps, 2 : Nourriture, 3 : Murs Dynamiques
+        if self.obs_mode == "grid":
+            return self._grid.copy()
+        return egocentric_observation(self._grid, self.snake[0], self.food, len(self.snake),
+                                      self.wall_timer if self.walls else 0, self.wall_cooldown, self.view_radius,
+                                      self.WALL_DURATION, self.WALL_COOLDOWN_TIME)
+
+    # --- ENREGISTREMENT / REJEU ---
+    def export_episode(self):
+        """Journal binaire de l'épisode en cours (record=True), avec l'empreinte de la grille actuelle"""
+        if self.episode_log is None:
+            raise RuntimeError("Enregistrement désactivé (SnakeEnv(record=True))")
+        self.episode_log.final_crc = grid_crc(self._grid)
+        return self.episode_log.to_bytes()
+
+    def get_snapshot(self):
+        """Copie de tout l'état de jeu (y compris le générateur aléatoire)"""
+        return {
+            "grid": self._grid.copy(), "snake": list(self.snake), "free": list(self._free),
+            "free_pos": list(self._free_pos), "n_free": self._n_free, "food": self.food, "walls": list(self.walls),
+            "wall_timer": self.wall_timer, "wall_cooldown": self.wall_cooldown, "step_count": self.step_count,
+            "game_mode": self.game_mode, "pending_food": self.pending_food_position,
+            "pending_wall": self.pending_wall_position, "rng": self.np_random.bit_generator.state,
+        }
 
-        return grid
+    def set_snapshot(self, snapshot):
+        self._grid[...] = snapshot["grid"]
+        self.snake = deque(snapshot["snake"])
+        self._body_set = set(self.snake)
+        self._free, self._free_pos = list(snapshot["free"]), list(snapshot["free_pos"])
+        self._n_free = snapshot["n_free"]
+        self.food, self.walls = snapshot["food"], list(snapshot["walls"])
+        self.wall_timer, self.wall_cooldown = snapshot["wall_timer"], snapshot["wall_cooldown"]
+        self.step_count, self.game_mode = snapshot["step_count"], snapshot["game_mode"]
+        self.pending_food_position = snapshot["pending_food"]
+        self.pending_wall_position = snapshot["pending_wall"]
+        self.np_random.bit_generator.state = snapshot["rng"]
+
+    @property
+    def current_grid_state(self):
+        """Grille en listes Python pour l'API externe (Streaming), construite à la demande"""
+        return self._grid.tolist()
 
 
     def get_state(self):
         """Retourne l'état brut pour la visualisation web"""
         return {
-            "grid": getattr(self, "current_grid_state", []),
+            "grid": self.current_grid_state,
             "score": self.step_count,
             "head": self.snake[0] if self.snake else None,
             "is_dead": False  # Pourra être amélioré plus tard
@@ -288,7 +406,7 @@ class SnakeEnv(gym.Env):
             for c in range(self.grid_size):
                 if (r, c) == self.snake[0]:
                     line += GREEN + "■ " + RESET
-                elif (r, c) in self.snake:
+                elif (r, c) in self._body_set:
                     line += YELLOW + "■ " + RESET
                 elif (r, c) == self.food:
                     line += RED + "● " + RESET
@@ -301,43 +419,20 @@ class SnakeEnv(gym.Env):
         print(WHITE + "└" + "─" * (self.grid_size * 2) + "┘" + RESET)
 
     def _render_frame(self, return_rgb=False):
-        if self.window is None and self.render_mode == "pygame":
-            pygame.init()
-            pygame.display.init()
-            self.window = pygame.display.set_mode((self.window_size, self.window_size))
-            pygame.display.set_caption("Snake AI")
-
-        if self.clock is None:
-            self.clock = pygame.time.Clock()
-
-        canvas = pygame.Surface((self.window_size, self.window_size))
-        canvas.fill((20, 20, 20))  # Fond sombre
-
-        # Dessin Nourriture (Rouge)
-        if self.food:
-            pygame.draw.rect(canvas, (231, 76, 60),
-                             pygame.Rect(self.food[1] * self.cell_size, self.food[0] * self.cell_size, self.cell_size,
-                                         self.cell_size))
-
-        # Dessin Murs (Bleu/Gris avec style)
-        for (r, c) in self.walls:
-            pygame.draw.rect(canvas, (52, 152, 219),
-                             pygame.Rect(c * self.cell_size, r * self.cell_size, self.cell_size, self.cell_size))
-            pygame.draw.rect(canvas, (41, 128, 185),  # Bordure intérieure
-                             pygame.Rect(c * self.cell_size + 4, r * self.cell_size + 4, self.cell_size - 8,
-                                         self.cell_size - 8))
-
-        # Dessin Serpent
-        for i, (r, c) in enumerate(self.snake):
-            color = (46, 204, 113) if i == 0 else (241, 196, 15)
-            pygame.draw.rect(canvas, color,
-                             pygame.Rect(c * self.cell_size, r * self.cell_size, self.cell_size, self.cell_size))
-
+        # Rasterisation NumPy (rendering.py) : pygame ne sert qu'à l'affichage en fenêtre
+        frame = render_grid(self._grid, self.snake[0] if self.snake else None, self.cell_size, self.window_size)
         if return_rgb:
-            return np.transpose(np.array(pygame.surfarray.pixels3d(canvas)), (1, 0, 2))
+            return frame
 
         if self.render_mode == "pygame":
-            self.window.blit(canvas, canvas.get_rect())
+            import pygame
+            if self.window is None:
+                pygame.init()
+                pygame.display.init()
+                self.window = pygame.display.set_mode((self.window_size, self.window_size))
+                pygame.display.set_caption("Snake AI")
+                self.clock = pygame.time.Clock()
+            self.window.blit(pygame.surfarray.make_surface(frame.transpose(1, 0, 2)), (0, 0))
             pygame.event.pump()
             pygame.display.flip()
             self.clock.tick(self.metadata["render_fps"])
@@ -345,5 +440,6 @@ class SnakeEnv(gym.Env):
 
     def close(self):
         if self.window is not None:
+            import pygame
             pygame.display.quit()
             pygame.quit()
\ No newline at end of file
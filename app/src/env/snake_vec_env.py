@@ -0,0 +1,288 @@
+import time
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from app.src.env.observations import DEFAULT_VIEW_RADIUS, egocentric_batch, make_observation_space
+from app.src.env.rendering import render_batch
+
+# Codes d'observation (identiques à SnakeEnv)
+EMPTY, BODY, FOOD, WALL = 0, 1, 2, 3
+
+# Déplacements par action : 0=Haut, 1=Bas, 2=Gauche, 3=Droite
+ACTION_DR = np.array([-1, 1, 0, 0], dtype=np.int64)
+ACTION_DC = np.array([0, 0, -1, 1], dtype=np.int64)
+
+
+class SnakeVecEnv(VecEnv):
+    """
+    VecEnv SB3 natif qui fait avancer N parties de Snake en un seul appel vectorisé.
+
+    Toutes les parties sont stockées en "struct-of-arrays" :
+    – grids : (N, G, G) int8, grille d'occupation qui sert directement d'observation.
+    – body : (N, G*G, 2) ring buffer des positions du corps (head_ptr, length).
+    – food / walls : (N, 2) positions, wall_timer / wall_cooldown : compteurs.
+
+    L'observation est la grille (obs_mode="grid") ou une fenêtre égocentrique
+    calculée pour tout le batch en un appel (obs_mode="egocentric").
+
+    Les règles sont celles de SnakeEnv.step (modes "classic" et "walls").
+    render() / get_images() rasterisent tout le batch en NumPy (rgb_array, sans pygame).
+    L'auto-reset et les statistiques d'épisode façon Monitor ("episode" dans infos)
+    sont gérés en interne : inutile d'envelopper avec Monitor.
+    """
+
+    def __init__(self, n_envs=4, grid_size=10, max_steps=150, game_mode="classic", seed=None, obs_mode="grid",
+                 view_radius=DEFAULT_VIEW_RADIUS):
+        self.grid_size = grid_size
+        self.max_steps = max_steps
+        self.game_mode = game_mode
+        self.obs_mode = obs_mode
+        self.view_radius = view_radius
+        self.render_mode = "rgb_array"
+        self.window_size = 500  # Même cadrage que SnakeEnv en rgb_array
+
+        # Réglages de gameplay (mêmes valeurs que SnakeEnv)
+        self.WALL_DURATION = 3
+        self.WALL_COOLDOWN_TIME = 6
+        self.WALL_RANDOM_PROB = 0.05
+
+        observation_space = make_observation_space(obs_mode, grid_size, view_radius)
+        action_space = spaces.Discrete(4)
+        super().__init__(n_envs, observation_space, action_space)
+
+        n_cells = grid_size * grid_size
+        self._rng = np.random.default_rng(seed)
+        self._arange = np.arange(n_envs)
+
+        # --- ÉTAT DES PARTIES ---
+        self.grids = np.zeros((n_envs, grid_size, grid_size), dtype=np.int8)
+        self.body = np.zeros((n_envs, n_cells, 2), dtype=np.int64)
+        self.head_ptr = np.zeros(n_envs, dtype=np.int64)
+        self.length = np.ones(n_envs, dtype=np.int64)
+        self.food = np.zeros((n_envs, 2), dtype=np.int64)
+        self.walls = np.zeros((n_envs, 2), dtype=np.int64)
+        self.has_wall = np.zeros(n_envs, dtype=bool)
+        self.wall_timer = np.zeros(n_envs, dtype=np.int64)
+        self.wall_cooldown = np.zeros(n_envs, dtype=np.int64)
+        self.step_count = np.zeros(n_envs, dtype=np.int64)
+
+        # --- STATS MONITOR ---
+        self.episode_returns = np.zeros(n_envs, dtype=np.float64)
+        self.episode_lengths = np.zeros(n_envs, dtype=np.int64)
+        self.t_start = time.time()
+
+        self._actions = None
+
+    # =========================================================================
+    # API VecEnv
+    # =========================================================================
+    def reset(self):
+        if any(seed is not None for seed in self._seeds):
+            # Une seule graine pilote tout le batch (la première fournie)
+            self._rng = np.random.default_rng(next(s for s in self._seeds if s is not None))
+        self._reset_envs(self._arange)
+        self._reset_seeds()
+        self._reset_options()
+        return self._observe(self._arange)
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        actions = self._actions
+        idx = self._arange
+        self.step_count += 1
+
+        # --- PHASE 1 : GESTION DES MURS DYNAMIQUES ---
+        self._update_walls()
+
+        # --- PHASE 2 : MOUVEMENT ---
+        head = self.body[idx, self.head_ptr]
+        new_r = head[:, 0] + ACTION_DR[actions]
+        new_c = head[:, 1] + ACTION_DC[actions]
+
+        out = (new_r < 0) | (new_r >= self.grid_size) | (new_c < 0) | (new_c >= self.grid_size)
+        cell = self.grids[idx, np.clip(new_r, 0, self.grid_size - 1), np.clip(new_c, 0, self.grid_size - 1)]
+        cell = np.where(out, WALL, cell)
+
+        # --- PHASE 3 : COLLISIONS & RÉCOMPENSES ---
+        tail_ptr = (self.head_ptr - self.length + 1) % self.body.shape[1]
+        tail = self.body[idx, tail_ptr]
+        is_eating = cell == FOOD
+        on_tail = (new_r == tail[:, 0]) & (new_c == tail[:, 1])
+
+        dead = (cell == WALL) | ((cell == BODY) & ~on_tail)
+        alive = ~dead
+
+        # La queue bouge d'abord (libère sa case), puis la tête avance
+        moving = np.flatnonzero(alive & ~is_eating)
+        self.grids[moving, tail[moving, 0], tail[moving, 1]] = EMPTY
+
+        advancing = np.flatnonzero(alive)
+        self.head_ptr[advancing] = (self.head_ptr[advancing] + 1) % self.body.shape[1]
+        self.body[advancing, self.head_ptr[advancing], 0] = new_r[advancing]
+        self.body[advancing, self.head_ptr[advancing], 1] = new_c[advancing]
+        self.grids[advancing, new_r[advancing], new_c[advancing]] = BODY
+
+        eating = np.flatnonzero(alive & is_eating)
+        self.length[eating] += 1
+        placed = self._place_food(eating)
+
+        rewards = np.full(self.num_envs, -0.01, dtype=np.float32)
+        rewards[eating] = 1.0
+        rewards[dead] = -1.0
+
+        terminated = dead.copy()
+        terminated[eating[~placed]] = True
+        truncated = self.step_count >= self.max_steps
+        dones = terminated | truncated
+
+        # --- STATS & AUTO-RESET ---
+        self.episode_returns += rewards
+        self.episode_lengths += 1
+
+        obs = self._observe(self._arange)
+        infos = [{} for _ in range(self.num_envs)]
+        done_idx = np.flatnonzero(dones)
+        if done_idx.size:
+            elapsed = round(time.time() - self.t_start, 6)
+            for i in done_idx:
+                infos[i]["terminal_observation"] = obs[i].copy()
+                infos[i]["TimeLimit.truncated"] = bool(truncated[i] and not terminated[i])
+                infos[i]["episode"] = {
+                    "r": round(float(self.episode_returns[i]), 6),
+                    "l": int(self.episode_lengths[i]),
+                    "t": elapsed,
+                }
+            self._reset_envs(done_idx)
+            obs[done_idx] = self._observe(done_idx)
+
+        return obs, rewards, dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def get_images(self):
+        """Frames RGB de toutes les parties, rasterisées en un seul appel NumPy (voir rendering.py)"""
+        heads = self.body[self._arange, self.head_ptr]
+        return list(render_batch(self.grids, heads, self.window_size // self.grid_size, self.window_size))
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+    def set_game_mode(self, mode):
+        """Change le mode de jeu de toutes les parties (même contrat que SnakeEnv)"""
+        if mode in ["classic", "walls"]:
+            self.game_mode = mode
+            if mode == "classic":
+                cleared = np.flatnonzero(self.has_wall)
+                self.grids[cleared, self.walls[cleared, 0], self.walls[cleared, 1]] = EMPTY
+                self.has_wall[:] = False
+                self.wall_timer[:] = 0
+                self.wall_cooldown[:] = 0
+
+    # =========================================================================
+    # LOGIQUE INTERNE
+    # =========================================================================
+    def _observe(self, idx):
+        """Observations des parties d'indices idx (copie : le buffer de rollout peut les garder)"""
+        if self.obs_mode == "grid":
+            return self.grids[idx]
+        heads = self.body[idx, self.head_ptr[idx]]
+        return egocentric_batch(self.grids[idx], heads, self.food[idx], self.length[idx],
+                                np.where(self.has_wall[idx], self.wall_timer[idx], 0), self.wall_cooldown[idx],
+                                self.view_radius, self.WALL_DURATION, self.WALL_COOLDOWN_TIME)
+
+    def _reset_envs(self, idx):
+        """Remet à zéro les parties d'indices idx (serpent au centre + une pomme)"""
+        center = self.grid_size // 2
+        self.grids[idx] = EMPTY
+        self.head_ptr[idx] = 0
+        self.length[idx] = 1
+        self.body[idx, 0] = center
+        self.grids[idx, center, center] = BODY
+        self.has_wall[idx] = False
+        self.wall_timer[idx] = 0
+        self.wall_cooldown[idx] = 0
+        self.step_count[idx] = 0
+        self.episode_returns[idx] = 0.0
+        self.episode_lengths[idx] = 0
+        self._place_food(np.asarray(idx))
+
+    def _update_walls(self):
+        # Cas A : Des murs sont présents → On décrémente leur vie
+        active = self.has_wall.copy()  # Copie : les murs expirés ce tick ne décomptent pas de cooldown
+        self.wall_timer[active] -= 1
+        expired = np.flatnonzero(active & (self.wall_timer <= 0))
+        self.grids[expired, self.walls[expired, 0], self.walls[expired, 1]] = EMPTY
+        self.has_wall[expired] = False
+        self.wall_cooldown[expired] = self.WALL_COOLDOWN_TIME
+
+        # Cas B : Pas de murs, mais en recharge → On décrémente le cooldown
+        cooling = ~active & (self.wall_cooldown > 0)
+        self.wall_cooldown[cooling] -= 1
+
+        # Cas C : Apparition aléatoire (Mode Walls + Pas de murs + Cooldown fini)
+        if self.game_mode != "walls":
+            return
+        ready = ~self.has_wall & (self.wall_cooldown == 0)
+        spawn = np.flatnonzero(ready & (self._rng.random(self.num_envs) < self.WALL_RANDOM_PROB))
+        if spawn.size == 0:
+            return
+        cells, found = self._sample_empty_cells(spawn)
+        spawn, cells = spawn[found], cells[found]
+        self.walls[spawn] = cells
+        self.grids[spawn, cells[:, 0], cells[:, 1]] = WALL
+        self.has_wall[spawn] = True
+        self.wall_timer[spawn] = self.WALL_DURATION
+
+    def _place_food(self, idx):
+        """Place une pomme pour chaque partie de idx. Retourne un masque 'placée' aligné sur idx"""
+        if idx.size == 0:
+            return np.zeros(0, dtype=bool)
+        cells, found = self._sample_empty_cells(idx)
+        placed_idx, cells = idx[found], cells[found]
+        self.food[placed_idx] = cells
+        self.grids[placed_idx, cells[:, 0], cells[:, 1]] = FOOD
+        return found
+
+    def _sample_empty_cells(self, idx, attempts=4):
+        """
+        Tire une case vide uniformément pour chaque partie de idx.
+        Échantillonnage par rejet (quasi toujours suffisant), puis repli exact
+        sur les grilles presque pleines.
+        """
+        n_cells = self.grid_size * self.grid_size
+        flat = self.grids[idx].reshape(len(idx), n_cells)
+        cells = np.zeros(len(idx), dtype=np.int64)
+        found = np.zeros(len(idx), dtype=bool)
+
+        pending = np.arange(len(idx))
+        for _ in range(attempts):
+            candidates = self._rng.integers(0, n_cells, size=pending.size)
+            ok = flat[pending, candidates] == EMPTY
+            cells[pending[ok]] = candidates[ok]
+            found[pending[ok]] = True
+            pending = pending[~ok]
+            if pending.size == 0:
+                break
+
+        if pending.size:
+            empty = flat[pending] == EMPTY
+            keys = np.where(empty, self._rng.random(empty.shape), -1.0)
+            cells[pending] = keys.argmax(axis=1)
+            found[pending] = empty.any(axis=1)
+
+        return np.stack([cells // self.grid_size, cells % self.grid_size], axis=1), found
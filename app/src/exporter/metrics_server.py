@@ -0,0 +1,240 @@
+import os
+import sys
+
+import numpy as np
+from prometheus_client import CollectorRegistry, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+# =============================================================================
+# 1. AGRÉGATS SANS VERROU
+# =============================================================================
+class AggregatedHistogram:
+    """
+    Histogramme par label alimenté par lots, sans verrou.
+
+    Un seul écrivain (la boucle asyncio du serving) ajoute un lot de valeurs en un
+    appel NumPy ; le scrape lit les compteurs tels quels. Une lecture pendant une
+    écriture peut décaler une observation d'un scrape à l'autre, jamais la perdre.
+    """
+
+    def __init__(self, buckets):
+        self.bounds = np.asarray(buckets, dtype=np.float64)
+        self._series = {}  # label -> [compteurs par bucket (+Inf en dernier), somme]
+
+    def observe_many(self, label: str, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        series = self._series.get(label)
+        if series is None:
+            series = self._series[label] = [np.zeros(self.bounds.size + 1, dtype=np.int64), 0.0]
+        # Bucket "le" : premier seuil >= valeur
+        np.add.at(series[0], np.searchsorted(self.bounds, values, side="left"), 1)
+        series[1] += float(values.sum())
+
+    def snapshot(self):
+        """{label: ([(le, cumul)], somme)} au format attendu par HistogramMetricFamily"""
+        result = {}
+        for label, (counts, total) in list(self._series.items()):
+            cumulative = np.cumsum(counts)
+            buckets = [(repr(float(b)), float(c)) for b, c in zip(self.bounds, cumulative[:-1])]
+            buckets.append(("+Inf", float(cumulative[-1])))
+            result[label] = (buckets, total)
+        return result
+
+    def clear(self):
+        self._series = {}
+
+
+INFERENCE_LATENCY = AggregatedHistogram(
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+INFERENCE_BATCH_SIZE = AggregatedHistogram((1, 2, 4, 8, 16, 32, 64, 128, 256))
+
+
+def process_rss_bytes(pid: int = None):
+    """RSS d'un processus (Linux : /proc/<pid>/statm), None si indisponible"""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "r") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        if pid is None:
+            import resource
+            scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss : octets (macOS) / Ko (Linux)
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        return None
+
+
+# =============================================================================
+# 2. COLLECTOR (lu au moment du scrape)
+# =============================================================================
+class SnakeCollector:
+    """
+    Construit toutes les métriques à la demande de Prometheus.
+    Les sources (état des entraînements, caches de modèles et de réponses, ordonnanceur) sont lues
+    telles quelles : aucun coût sur les chemins chauds entre deux scrapes.
+    """
+
+    def __init__(self):
+        self.training_state = None
+        self.scheduler = None
+        self.model_cache = None
+        self.prediction_cache = None
+        self.inference_pool = None
+
+    def collect(self):
+        yield from self._collect_inference()
+        yield from self._collect_cache()
+        yield from self._collect_prediction_cache()
+        yield from self._collect_inference_pool()
+        yield from self._collect_training()
+        yield from self._collect_processes()
+
+    def _collect_inference(self):
+        latency = HistogramMetricFamily('snake_inference_latency_seconds',
+                                        'Latence d\'inférence (file + forward) par modèle', labels=['model'])
+        for model, (buckets, total) in INFERENCE_LATENCY.snapshot().items():
+            latency.add_metric([model], buckets, total)
+        yield latency
+
+        batch = HistogramMetricFamily('snake_inference_forward_batch_size',
+                                      'Requêtes regroupées par forward, par modèle', labels=['model'])
+        for model, (buckets, total) in INFERENCE_BATCH_SIZE.snapshot().items():
+            batch.add_metric([model], buckets, total)
+        yield batch
+
+    def _collect_cache(self):
+        cache = self.model_cache
+        if cache is None:
+            return
+        yield GaugeMetricFamily('snake_model_cache_used_bytes', 'Mémoire estimée des modèles en cache',
+                                value=cache.total_bytes)
+        yield GaugeMetricFamily('snake_model_cache_capacity_bytes', 'Budget mémoire du cache de modèles',
+                                value=cache.max_bytes)
+        yield GaugeMetricFamily('snake_model_cache_occupancy_ratio', 'Occupation du cache de modèles',
+                                value=cache.total_bytes / cache.max_bytes if cache.max_bytes else 0.0)
+        yield GaugeMetricFamily('snake_model_cache_entries', 'Modèles en cache', value=len(cache))
+
+    def _collect_prediction_cache(self):
+        cache = self.prediction_cache
+        if cache is None:
+            return
+        stats = cache.stats()
+        yield CounterMetricFamily('snake_predict_cache_hits', 'Réponses de /predict servies depuis le cache',
+                                  value=stats["hits"])
+        yield CounterMetricFamily('snake_predict_cache_misses', 'Réponses de /predict absentes du cache',
+                                  value=stats["misses"])
+        yield CounterMetricFamily('snake_predict_cache_evictions', 'Réponses évincées (LRU)',
+                                  value=stats["evictions"])
+        yield GaugeMetricFamily('snake_predict_cache_hit_ratio', 'Taux de hit du cache de /predict',
+                                value=stats["hit_ratio"])
+        yield GaugeMetricFamily('snake_predict_cache_used_bytes', 'Mémoire estimée du cache de /predict',
+                                value=stats["bytes"])
+        yield GaugeMetricFamily('snake_predict_cache_entries', 'Positions en cache', value=stats["entries"])
+
+    def _collect_inference_pool(self):
+        pool = self.inference_pool
+        if pool is None or pool.closed:
+            return
+        stats = pool.stats()
+        yield GaugeMetricFamily('snake_inference_workers_alive', "Workers d'inférence vivants", value=stats["alive"])
+        inflight = GaugeMetricFamily('snake_inference_worker_inflight', 'Batchs en vol par worker', labels=['worker'])
+        batches = CounterMetricFamily('snake_inference_worker_batches', 'Batchs traités par worker',
+                                      labels=['worker'])
+        for w, (pending, done) in enumerate(zip(stats["inflight"], stats["completed"])):
+            inflight.add_metric([str(w)], pending)
+            batches.add_metric([str(w)], done)
+        yield inflight
+        yield batches
+        yield GaugeMetricFamily('snake_inference_pool_shared_bytes', 'Poids des modèles en mémoire partagée',
+                                value=stats["shared_bytes"])
+
+    def _collect_training(self):
+        state = self.training_state
+        if state is None:
+            return
+        families = {
+            "progress": GaugeMetricFamily('snake_training_progress_ratio', 'Progression du run', labels=['run_id']),
+            "timesteps": GaugeMetricFamily('snake_training_timesteps', 'Timesteps faits dans le run',
+                                           labels=['run_id']),
+            "env_steps_per_sec": GaugeMetricFamily('snake_training_env_steps_per_second',
+                                                   'Débit de collecte (dernière itération)', labels=['run_id']),
+            "updates_per_sec": GaugeMetricFamily('snake_training_updates_per_second',
+                                                 'Mises à jour PPO par seconde (dernière itération)',
+                                                 labels=['run_id']),
+            "mean_reward": GaugeMetricFamily('snake_training_mean_reward', 'Reward moyenne récente',
+                                             labels=['run_id']),
+        }
+        runs_by_status = {}
+        for run_id, data in list(state.active_trainings.items()):
+            status = data.get("status", "running")
+            runs_by_status[status] = runs_by_status.get(status, 0) + 1
+            if status != "running":
+                continue
+            stats = data.get("stats") or {}
+            families["progress"].add_metric([run_id], data.get("progress", 0))
+            families["timesteps"].add_metric([run_id], data.get("timesteps", 0))
+            for key in ("env_steps_per_sec", "updates_per_sec", "mean_reward"):
+                if stats.get(key) is not None:
+                    families[key].add_metric([run_id], stats[key])
+        yield from families.values()
+
+        runs = GaugeMetricFamily('snake_training_runs', 'Runs connus par statut', labels=['status'])
+        for status, count in runs_by_status.items():
+            runs.add_metric([status], count)
+        yield runs
+
+    def _collect_processes(self):
+        rss = GaugeMetricFamily('snake_process_rss_bytes', 'Mémoire résidente', labels=['role', 'run_id'])
+        value = process_rss_bytes()
+        if value is not None:
+            rss.add_metric(["api", ""], value)
+        if self.scheduler is not None:
+            for run_id, pid in self.scheduler.worker_pids().items():
+                value = process_rss_bytes(pid)
+                if value is not None:
+                    rss.add_metric(["training", run_id], value)
+        yield rss
+
+
+EXPORTER_REGISTRY = CollectorRegistry()
+collector = SnakeCollector()
+EXPORTER_REGISTRY.register(collector)
+
+
+# =============================================================================
+# 3. SERVEUR HTTP (cible de scrape séparée)
+# =============================================================================
+def watch(training_state=None, scheduler=None, model_cache=None, prediction_cache=None, inference_pool=None):
+    """Branche les sources du processus API sur le collector"""
+    if training_state is not None:
+        collector.training_state = training_state
+    if scheduler is not None:
+        collector.scheduler = scheduler
+    if model_cache is not None:
+        collector.model_cache = model_cache
+    if prediction_cache is not None:
+        collector.prediction_cache = prediction_cache
+    if inference_pool is not None:
+        collector.inference_pool = inference_pool
+
+
+_server_started = False
+
+
+def start_metrics_server(port: int = None, addr: str = "0.0.0.0"):
+    """
+    Démarre l'exporteur sur son propre port (thread HTTP de prometheus_client).
+    Port : argument ou SNAKE_EXPORTER_PORT ; rien n'est démarré si aucun n'est fourni.
+    """
+    global _server_started
+    port = port or int(os.getenv("SNAKE_EXPORTER_PORT", "0"))
+    if not port or _server_started:
+        return False
+    start_http_server(port, addr=addr, registry=EXPORTER_REGISTRY)
+    _server_started = True
+    print(f"📈 Exporteur Prometheus sur :{port}/metrics")
+    return True
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from prometheus_client import Gauge, Histogram, REGISTRY
+
+from app.src.exporter.metrics_server import INFERENCE_BATCH_SIZE, INFERENCE_LATENCY
+
+BATCH_SIZE_HISTOGRAM = Histogram(
+    'snake_inference_batch_size', 'Taille des batchs d\'inférence', ['model'],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256), registry=REGISTRY
+)
+BATCH_WAIT_HISTOGRAM = Histogram(
+    'snake_inference_queue_wait_seconds', 'Attente en file avant le forward', ['model'],
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1), registry=REGISTRY
+)
+QUEUE_DEPTH_GAUGE = Gauge('snake_inference_queue_depth', 'Requêtes en attente de batch', registry=REGISTRY)
+
+
+class _PendingBatch:
+    def __init__(self, runner):
+        self.runner = runner
+        self.items = []  # (obs, future, enqueue_time)
+        self.timer = None
+
+
+class InferenceBatcher:
+    """
+    Micro-batching dynamique devant le PolicyRunner du modèle.
+
+    Les requêtes concurrentes sont regroupées par (modèle, forme d'observation).
+    Un groupe part en un seul forward torch dès qu'il atteint max_batch_size
+    ou que la plus ancienne requête a attendu max_wait_ms.
+    Les forwards tournent sur un thread dédié pour ne pas bloquer la boucle asyncio,
+    ou dans le pool de workers d'inférence quand le runner en vient (PooledRunner.submit).
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snake-inference")
+
+    async def predict(self, model_key: str, runner, obs: np.ndarray):
+        """Met obs en file et attend (action, probabilités) calculés dans un batch"""
+        loop = asyncio.get_running_loop()
+        key = (model_key, obs.shape)
+        batch = self._pending.get(key)
+        if batch is None or batch.runner is not runner:
+            if batch is not None:
+                self._flush(key)
+            batch = self._pending[key] = _PendingBatch(runner)
+            batch.timer = loop.call_later(self.max_wait, self._flush, key)
+
+        future = loop.create_future()
+        batch.items.append((obs, future, time.perf_counter()))
+        QUEUE_DEPTH_GAUGE.inc()
+
+        if len(batch.items) >= self.max_batch_size:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key):
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        model_label = str(key[0])
+        now = time.perf_counter()
+        QUEUE_DEPTH_GAUGE.dec(len(batch.items))
+        BATCH_SIZE_HISTOGRAM.labels(model=model_label).observe(len(batch.items))
+        for _, _, enqueued in batch.items:
+            BATCH_WAIT_HISTOGRAM.labels(model=model_label).observe(now - enqueued)
+
+        loop = asyncio.get_running_loop()
+        observations = [obs for obs, _, _ in batch.items]
+        if hasattr(batch.runner, "submit"):
+            # Runner du pool de workers : le forward part dans un autre processus, sans bloquer le thread dédié
+            try:
+                task = asyncio.wrap_future(batch.runner.submit(np.stack(observations)), loop=loop)
+            except Exception as e:
+                task = loop.create_future()
+                task.set_exception(e)
+        else:
+            task = loop.run_in_executor(self._executor, _forward, batch.runner, observations)
+        task.add_done_callback(lambda t: _resolve(batch.items, t, model_label))
+
+
+def _forward(runner, observations):
+    """Un seul forward pour tout le batch : action argmax + softmax"""
+    return runner.predict_batch(np.stack(observations))
+
+
+def _resolve(items, task, model_label):
+    error = task.exception()
+    if error is not None:
+        for _, future, _ in items:
+            if not future.done():
+                future.set_exception(error)
+        return
+    actions, probs = task.result()
+    for i, (_, future, _) in enumerate(items):
+        if not future.done():
+            future.set_result((int(actions[i]), probs[i].tolist()))
+
+    # Exporteur : un seul ajout par batch (callback exécuté sur la boucle asyncio, sans verrou)
+    now = time.perf_counter()
+    INFERENCE_LATENCY.observe_many(model_label, [now - enqueued for _, _, enqueued in items])
+    INFERENCE_BATCH_SIZE.observe_many(model_label, [len(items)])
+
+
+batcher = InferenceBatcher(
+    max_batch_size=int(os.getenv("SNAKE_BATCH_MAX_SIZE", "32")),
+    max_wait_ms=float(os.getenv("SNAKE_BATCH_MAX_WAIT_MS", "2")),
+)
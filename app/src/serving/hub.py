@@ -0,0 +1,85 @@
+import asyncio
+import threading
+from collections import OrderedDict
+
+
+class BroadcastHub:
+    """
+    Diffusion asyncio par topic (ex. "run:<id>", "runs") vers les WebSockets abonnés.
+
+    – publish() peut être appelé depuis n'importe quel thread : la livraison est
+      reprogrammée sur la boucle asyncio des abonnés (call_soon_threadsafe).
+    – Chaque topic garde sa dernière valeur : un nouvel abonné la reçoit d'abord
+      (rattrapage), puis uniquement les nouveaux messages.
+    – File bornée par abonné : un client lent perd les messages les plus anciens,
+      jamais le plus récent (ce sont des valeurs "dernier état connu").
+    """
+
+    def __init__(self, queue_size: int = 16, max_topics: int = 1000):
+        self.queue_size = queue_size
+        self.max_topics = max_topics
+        self._latest = OrderedDict()  # topic -> dernier message
+        self._subscribers = {}  # topic -> set(asyncio.Queue)
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def publish(self, topic: str, message):
+        loop = self._loop
+        if loop is not None:
+            try:
+                if _running_loop() is loop:
+                    self._deliver(topic, message)
+                else:
+                    loop.call_soon_threadsafe(self._deliver, topic, message)
+                return
+            except RuntimeError:
+                pass  # Boucle fermée : on garde seulement la dernière valeur
+        self._remember(topic, message)
+
+    def latest(self, topic: str):
+        return self._latest.get(topic)
+
+    async def subscribe(self, topic: str, initial=None):
+        """Générateur asynchrone : dernière valeur (ou initial), puis chaque nouveau message"""
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            latest = self._latest.get(topic, initial)
+            self._subscribers.setdefault(topic, set()).add(queue)
+        if latest is not None:
+            queue.put_nowait(latest)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(queue)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def subscriber_count(self, topic: str):
+        return len(self._subscribers.get(topic, ()))
+
+    # --- INTERNE ---
+    def _deliver(self, topic, message):
+        self._remember(topic, message)
+        for queue in list(self._subscribers.get(topic, ())):
+            if queue.full():
+                queue.get_nowait()  # On coalesce : le plus ancien saute
+            queue.put_nowait(message)
+
+    def _remember(self, topic, message):
+        with self._lock:
+            self._latest[topic] = message
+            self._latest.move_to_end(topic)
+            while len(self._latest) > self.max_topics:
+                self._latest.popitem(last=False)
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
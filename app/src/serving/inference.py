@@ -0,0 +1,84 @@
+import threading
+
+import numpy as np
+import torch
+
+
+class BaseRunner:
+    """Interface commune des runners : predict_batch() (à fournir), vérification de forme et predict()"""
+
+    obs_shape = ()
+
+    def check_shape(self, observations: np.ndarray):
+        if tuple(observations.shape[1:]) != self.obs_shape:
+            raise ValueError(f"Observation de forme {observations.shape[1:]} (attendu : {self.obs_shape})")
+
+    def predict_batch(self, observations: np.ndarray):
+        raise NotImplementedError
+
+    def predict(self, obs: np.ndarray):
+        """Une seule grille → (action, probabilités en liste) : même payload que /api/predict"""
+        actions, probs = self.predict_batch(obs[np.newaxis])
+        return int(actions[0]), probs[0].tolist()
+
+
+class PolicyRunner(BaseRunner):
+    """
+    Chemin d'inférence dédié pour une policy PPO (MlpPolicy) chargée.
+
+    Un seul forward acteur (features → mlp_extractor → action_net) donne à la fois
+    l'action argmax et les probabilités softmax, sans passer par le prétraitement
+    générique de SB3 ni par l'autograd. Le tenseur d'entrée est préalloué et
+    réutilisé d'un appel à l'autre (il grandit seulement si le batch dépasse sa taille).
+    """
+
+    def __init__(self, policy, initial_batch_size: int = 32):
+        policy.set_training_mode(False)
+        self.policy = policy
+        self.obs_shape = tuple(policy.observation_space.shape)
+        self._features = policy.pi_features_extractor
+        self._actor = policy.mlp_extractor.forward_actor
+        self._action_net = policy.action_net
+        self._input = torch.zeros((initial_batch_size, *self.obs_shape), dtype=torch.float32, device=policy.device)
+        self._lock = threading.Lock()
+
+    def predict_batch(self, observations: np.ndarray):
+        """observations : (B, *obs_shape). Retourne (actions (B,), probabilités (B, n_actions)) en NumPy"""
+        n = observations.shape[0]
+        self.check_shape(observations)
+
+        with self._lock, torch.inference_mode():
+            if n > self._input.shape[0]:
+                self._input = torch.zeros((n, *self.obs_shape), dtype=torch.float32, device=self.policy.device)
+            batch = self._input[:n]
+            batch.copy_(torch.from_numpy(observations))
+
+            logits = self._action_net(self._actor(self._features(batch)))
+            probs = torch.softmax(logits, dim=1).cpu().numpy()
+        return probs.argmax(axis=1), probs
+
+
+class VariantRunner(BaseRunner):
+    """
+    Même interface que PolicyRunner pour une variante optimisée (TorchScript) d'une policy :
+    int8 (quantification dynamique) ou réseau distillé, produits par agent/optimizing/variants.py.
+    Le module prend le batch d'observations brut et renvoie les logits des actions.
+    """
+
+    def __init__(self, module, obs_shape, variant: str):
+        self.module = module.eval()
+        self.obs_shape = tuple(obs_shape)
+        self.variant = variant
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, obs_shape, variant: str):
+        return cls(torch.jit.load(path, map_location="cpu"), obs_shape, variant)
+
+    def predict_batch(self, observations: np.ndarray):
+        self.check_shape(observations)
+
+        with self._lock, torch.inference_mode():
+            logits = self.module(torch.from_numpy(np.ascontiguousarray(observations, dtype=np.float32)))
+            probs = torch.softmax(logits, dim=1).numpy()
+        return probs.argmax(axis=1), probs
@@ -0,0 +1,167 @@
+import time
+
+# Origine du budget de démarrage : tout ce qui suit (imports compris) est compté
+STARTUP_T0 = time.perf_counter()
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from prometheus_client import Gauge, REGISTRY, make_asgi_app
+from starlette.middleware.cors import CORSMiddleware
+
+from app.routers import serving
+from app.src.agent.utils.catalog import get_catalog
+from app.src.exporter import metrics_server
+from app.src.serving.batching import batcher
+
+# App d'inférence seule (uvicorn app.src.serving.main:app) : pas d'entraînement, ni mlflow,
+# ni pages HTML. torch / SB3 sont importés pendant le préchargement, avant que /ready passe à 200.
+IMPORTS_SECONDS = time.perf_counter() - STARTUP_T0
+
+STARTUP_GAUGE = Gauge('snake_serving_startup_seconds', "Durée du démarrage jusqu'à /ready", registry=REGISTRY)
+
+
+# =============================================================================
+# 1. PRÉCHARGEMENT
+# =============================================================================
+class StartupState:
+    """
+    Avancement du démarrage, lu par /ready.
+    pinned : uuids préchargés, réchauffés et épinglés dans le cache avant de se déclarer prêt.
+    """
+
+    def __init__(self, pinned, budget_seconds: float):
+        self.pinned = list(pinned)
+        self.budget_seconds = budget_seconds
+        self.phases = {"imports": round(IMPORTS_SECONDS, 3), "preload": {}, "warmup": {}}
+        self.failed = []
+        self.error = None  # Échec global du préchargement (catalogue injoignable...)
+        self.ready = False
+        self.startup_seconds = None
+
+    def report(self):
+        elapsed = self.startup_seconds if self.ready else time.perf_counter() - STARTUP_T0
+        return {
+            "ready": self.ready, "startup_seconds": round(elapsed, 3), "budget_seconds": self.budget_seconds,
+            "within_budget": elapsed <= self.budget_seconds, "phases": self.phases,
+            "pinned": self.pinned, "failed": self.failed, "error": self.error,
+        }
+
+
+def warm_up(runner, batch_sizes):
+    """
+    Premiers forwards à vide (allocations torch, buffer d'entrée du runner) hors requêtes réelles.
+    Runner du pool : un batch par worker en même temps (la répartition au moins chargé les sert tous).
+    """
+    pool = getattr(runner, "pool", None)
+    for size in batch_sizes:
+        batch = np.zeros((size, *runner.obs_shape), dtype=np.float32)
+        if pool is None:
+            runner.predict_batch(batch)
+        else:
+            for future in [runner.submit(batch) for _ in range(pool.n_workers)]:
+                future.result()
+
+
+def _preload_model(state: StartupState, manager, catalog, uuid: str):
+    start = time.perf_counter()
+    metadata = catalog.get(uuid) or {}
+    entry = manager.ensure_loaded(uuid, metadata["grid_size"]) if metadata.get("grid_size") else None
+    state.phases["preload"][uuid] = round(time.perf_counter() - start, 3)
+    if entry is None:
+        raise LookupError("introuvable ou illisible")
+
+    start = time.perf_counter()
+    warm_up(entry.runner, sorted({1, batcher.max_batch_size}))
+    state.phases["warmup"][uuid] = round(time.perf_counter() - start, 3)
+    manager.cache.pin(uuid)
+    if manager.current_uuid is None:
+        manager.current_uuid = uuid
+
+
+def preload(state: StartupState, manager=None):
+    """
+    Charge, réchauffe et épingle les modèles de state.pinned ; le premier devient le modèle par défaut.
+    Un modèle en échec (ou le catalogue injoignable) est consigné dans state.failed : le serving
+    se déclare prêt quoi qu'il arrive et charge ces modèles à la demande.
+    """
+    manager = manager or serving.manager
+    try:
+        catalog = get_catalog()
+        for uuid in state.pinned:
+            try:
+                _preload_model(state, manager, catalog, uuid)
+            except Exception as e:
+                print(f"❌ Modèle épinglé {uuid} : {e}")
+                state.failed.append(uuid)
+    except Exception as e:
+        print(f"❌ Préchargement interrompu : {e}")
+        state.error = str(e)
+        state.failed += [u for u in state.pinned if u not in state.failed and u not in manager.cache.pinned]
+    finally:
+        state.startup_seconds = time.perf_counter() - STARTUP_T0
+        state.ready = True
+        STARTUP_GAUGE.set(state.startup_seconds)
+
+    loaded = len(state.pinned) - len(state.failed)
+    print(f"🚀 Serving prêt en {state.startup_seconds:.2f} s ({loaded}/{len(state.pinned)} modèles épinglés)")
+    if state.startup_seconds > state.budget_seconds:
+        print(f"⚠️ Démarrage hors budget : {state.startup_seconds:.2f} s > {state.budget_seconds:.2f} s")
+
+
+startup = StartupState(
+    pinned=[u.strip() for u in os.getenv("SNAKE_PINNED_MODELS", "").split(",") if u.strip()],
+    budget_seconds=float(os.getenv("SNAKE_STARTUP_BUDGET_S", "15")),
+)
+
+
+# =============================================================================
+# 2. APP
+# =============================================================================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    metrics_server.start_metrics_server()
+    pool = serving.manager.start_pool(serving.INFERENCE_WORKERS, serving.INFERENCE_TORCH_THREADS)
+    metrics_server.watch(inference_pool=pool)
+    # /health répond pendant le préchargement ; /ready attend sa fin
+    task = asyncio.create_task(asyncio.to_thread(preload, startup))
+    yield
+    task.cancel()
+    serving.manager.stop_pool()
+
+
+app = FastAPI(title="Snake AI Serving", lifespan=lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+app.include_router(serving.router, prefix="/api")
+app.mount("/metrics", make_asgi_app(registry=REGISTRY))
+metrics_server.watch(model_cache=serving.manager.cache, prediction_cache=serving.prediction_cache)
+
+
+@app.get("/health")
+def health():
+    """Processus vivant (liveness), même pendant le préchargement"""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready():
+    """200 une fois les modèles épinglés chargés et réchauffés, 503 avant (readiness)"""
+    report = startup.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", "10000")))
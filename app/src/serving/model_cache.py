@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict
+
+from prometheus_client import Counter, Gauge, REGISTRY
+
+CACHE_HITS_COUNTER = Counter('snake_model_cache_hits_total', 'Modèles servis depuis le cache', registry=REGISTRY)
+CACHE_MISSES_COUNTER = Counter('snake_model_cache_misses_total', 'Modèles absents du cache', registry=REGISTRY)
+CACHE_EVICTIONS_COUNTER = Counter('snake_model_cache_evictions_total', 'Modèles évincés (LRU)', registry=REGISTRY)
+CACHE_BYTES_GAUGE = Gauge('snake_model_cache_bytes', 'Mémoire estimée des modèles en cache', registry=REGISTRY)
+CACHE_MODELS_GAUGE = Gauge('snake_model_cache_models', 'Nombre de modèles en cache', registry=REGISTRY)
+
+
+def estimate_model_bytes(agent) -> int:
+    """Taille mémoire d'un agent SB3 : poids + buffers de la policy et état de l'optimiseur"""
+    total = sum(t.numel() * t.element_size() for t in agent.policy.state_dict().values())
+    optimizer = getattr(agent.policy, "optimizer", None)
+    if optimizer is not None:
+        for state in optimizer.state.values():
+            total += sum(v.numel() * v.element_size() for v in state.values() if hasattr(v, "numel"))
+    return total
+
+
+class LoadedModel:
+    def __init__(self, uuid: str, grid_size: int, agent, runner, nbytes: int, observation: dict = None,
+                 variant: str = "full"):
+        self.uuid = uuid
+        self.grid_size = grid_size
+        self.agent = agent  # None pour une variante optimisée (seul le runner est chargé)
+        self.runner = runner
+        self.nbytes = nbytes
+        self.observation = observation or {"mode": "grid"}  # Comment construire l'entrée du modèle
+        self.variant = variant  # "full", "int8" ou "distilled"
+
+
+class ModelCache:
+    """
+    Cache LRU borné des modèles chargés, indexé par uuid.
+
+    Le budget est exprimé en octets (estimation via estimate_model_bytes).
+    Quand il est dépassé, les modèles les moins récemment utilisés sont évincés,
+    sauf le dernier inséré (un modèle plus gros que le budget reste donc servable)
+    et les modèles épinglés (préchargés au démarrage du serving, voir pin()).
+    on_evict(entry) est appelé pour chaque modèle évincé, hors verrou.
+    """
+
+    def __init__(self, max_bytes: int, on_evict=None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._pinned = set()
+        self._lock = threading.Lock()
+
+    def get(self, uuid: str):
+        with self._lock:
+            entry = self._entries.get(uuid)
+            if entry is None:
+                CACHE_MISSES_COUNTER.inc()
+                return None
+            self._entries.move_to_end(uuid)
+        CACHE_HITS_COUNTER.inc()
+        return entry
+
+    def peek(self, uuid: str):
+        """Lecture sans effet sur l'ordre LRU ni sur les compteurs"""
+        return self._entries.get(uuid)
+
+    def pin(self, uuid: str):
+        """Exclut un modèle de l'éviction LRU (il compte toujours dans le budget)"""
+        with self._lock:
+            self._pinned.add(uuid)
+
+    @property
+    def pinned(self):
+        return set(self._pinned)
+
+    def put(self, entry: LoadedModel):
+        evicted = []
+        with self._lock:
+            previous = self._entries.pop(entry.uuid, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[entry.uuid] = entry
+            self._bytes += entry.nbytes
+
+            # Candidats dans l'ordre LRU, hors modèles épinglés et hors dernier inséré
+            candidates = [u for u in self._entries if u not in self._pinned and u != entry.uuid]
+            for uuid in candidates:
+                if self._bytes <= self.max_bytes:
+                    break
+                evicted.append(self._entries.pop(uuid))
+                self._bytes -= evicted[-1].nbytes
+                CACHE_EVICTIONS_COUNTER.inc()
+
+            CACHE_BYTES_GAUGE.set(self._bytes)
+            CACHE_MODELS_GAUGE.set(len(self._entries))
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+        return entry
+
+    def __contains__(self, uuid):
+        return uuid in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        return self._bytes
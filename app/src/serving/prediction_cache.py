@@ -0,0 +1,162 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Déplacements par action : 0=Haut, 1=Bas, 2=Gauche, 3=Droite
+ACTION_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# Surcoût mémoire d'une entrée hors clé packée (nœud de l'OrderedDict, tuple de clé, valeur)
+ENTRY_OVERHEAD = 200
+
+
+# =============================================================================
+# 1. SYMÉTRIES DU PLATEAU
+# =============================================================================
+# Les 8 symétries du carré : k rotations de 90° (np.rot90, sens anti-horaire) puis transposition éventuelle.
+TRANSFORMS = tuple((k, flip) for flip in (False, True) for k in range(4))
+
+
+def transform_grid(grid, transform):
+    k, flip = transform
+    grid = np.rot90(grid, k)
+    return grid.T if flip else grid
+
+
+def transform_point(point, g: int, transform):
+    """Position (ligne, colonne) dans la grille transformée"""
+    k, flip = transform
+    r, c = point
+    for _ in range(k):
+        r, c = g - 1 - c, r
+    return (c, r) if flip else (r, c)
+
+
+def _transform_delta(delta, transform):
+    k, flip = transform
+    dr, dc = delta
+    for _ in range(k):
+        dr, dc = -dc, dr
+    return (dc, dr) if flip else (dr, dc)
+
+
+# ACTION_MAPS[t][a] : action de la grille transformée qui correspond à l'action a de la grille d'origine
+ACTION_MAPS = tuple(np.array([ACTION_DELTAS.index(_transform_delta(d, t)) for d in ACTION_DELTAS])
+                    for t in TRANSFORMS)
+
+
+def pack_grids(grids):
+    """Grilles (N, G, G) de codes 0..3 → (N, ceil(G²/4)) octets, 2 bits par case"""
+    flat = grids.reshape(grids.shape[0], -1).astype(np.uint8)
+    padded = np.zeros((flat.shape[0], -(-flat.shape[1] // 4) * 4), dtype=np.uint8)
+    padded[:, :flat.shape[1]] = flat
+    return padded[:, 0::4] | (padded[:, 1::4] << 2) | (padded[:, 2::4] << 4) | (padded[:, 3::4] << 6)
+
+
+# =============================================================================
+# 2. CACHE LRU
+# =============================================================================
+class PredictionCache:
+    """
+    Cache LRU borné des sorties de /api/predict : (uuid, grille packée, extras) → (action, probabilités).
+
+    L'inférence servie est déterministe (argmax) et un uuid désigne des poids figés :
+    une position déjà vue se sert sans passer par le batcher ni par torch.
+    extras : ce qui compte en plus de la grille pour le modèle (tête et timers en égocentrique).
+
+    symmetries=True : la grille est ramenée à une forme canonique parmi ses 8 symétries
+    (tête comprise) et la réponse est remise dans l'orientation de la requête. Une position
+    et ses rotations / miroirs partagent alors une entrée, ce qui suppose une policy
+    (à peu près) équivariante : la première orientation calculée sert pour les 8.
+
+    Le budget est en octets (clé packée + surcoût fixe par entrée). Les compteurs
+    (hits, misses, évictions) sont de simples entiers lus au scrape.
+    """
+
+    def __init__(self, max_bytes: int, symmetries: bool = False):
+        self.max_bytes = max_bytes
+        self.symmetries = symmetries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def key(self, model_uuid: str, grid, head=None, extras=()):
+        """
+        (clé, index de symétrie) de la requête, ou (None, None) si elle n'est pas cachable
+        (cache désactivé, grille non carrée ou codes hors 0..3).
+        """
+        if not self.enabled:
+            return None, None
+        grid = np.asarray(grid)
+        if grid.ndim != 2 or grid.shape[0] != grid.shape[1] or grid.dtype.kind not in "iu" or grid.size == 0:
+            return None, None
+        if grid.min() < 0 or grid.max() > 3:
+            return None, None
+        g = grid.shape[0]
+        transforms = range(len(TRANSFORMS)) if self.symmetries else range(1)
+        packed = pack_grids(np.stack([transform_grid(grid, TRANSFORMS[t]) for t in transforms]))
+        candidates = [(packed[i].tobytes(), None if head is None else transform_point(head, g, TRANSFORMS[t]), t)
+                      for i, t in enumerate(transforms)]
+        grid_bytes, canonical_head, t = min(candidates, key=lambda c: (c[0], c[1] or ()))
+        return (model_uuid, g, grid_bytes, canonical_head, *extras), t
+
+    def get(self, key, transform: int):
+        """(action, probabilités) dans l'orientation de la requête, None si absent"""
+        if key is None:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        self.hits += 1
+        action, probs = value
+        mapping = ACTION_MAPS[transform]
+        return int(np.flatnonzero(mapping == action)[0]), probs[mapping].tolist()
+
+    def put(self, key, transform: int, action: int, probs):
+        """Stocke une réponse calculée dans l'orientation de la requête (rangée en forme canonique)"""
+        if key is None:
+            return
+        mapping = ACTION_MAPS[transform]
+        canonical = np.empty(len(mapping), dtype=np.float64)
+        canonical[mapping] = probs
+        nbytes = sys.getsizeof(key[2]) + ENTRY_OVERHEAD
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (int(mapping[action]), canonical)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._bytes -= sys.getsizeof(evicted[2]) + ENTRY_OVERHEAD
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0, "symmetries": self.symmetries,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        return self._bytes
@@ -0,0 +1,98 @@
+import struct
+
+import numpy as np
+
+from app.src.serving.prediction_cache import pack_grids
+
+# Canal binaire d'inférence (WebSocket /api/ws/predict), little-endian.
+#
+# Requête : en-tête REQUEST puis les cases de la grille, ligne par ligne
+#   seq u32 | model_id u16 | grid_size u8 | flags u8 | tête ligne u8 | tête colonne u8 | wall_timer u16 | wall_cooldown u16
+#   flags & FLAG_PACKED : 2 bits par case (codes 0..3, ceil(G²/4) octets), sinon 1 octet par case
+#   tête à NO_HEAD : absente (inutile pour les modèles à observation "grid")
+# Réponse : seq u32 | statut u8 | action u8 | 4 probabilités float16
+#
+# Un message WebSocket peut enchaîner plusieurs requêtes (une par partie) ; la réponse
+# enchaîne les réponses dans le même ordre.
+REQUEST = struct.Struct("<IHBBBBHH")
+REPLY = struct.Struct("<IBB4e")
+FLAG_PACKED = 1
+NO_HEAD = 255
+MAX_MODEL_ID = 0xFFFF  # model_id sur u16 (0 : modèle par défaut)
+
+STATUS_OK = 0
+STATUS_UNKNOWN_MODEL = 1
+STATUS_BAD_FRAME = 2
+STATUS_SERVER_ERROR = 3  # Échec d'inférence côté serveur (worker arrêté, pool fermé...) : la requête peut être rejouée
+
+
+class FrameError(ValueError):
+    pass
+
+
+# UNPACK_TABLE[octet] : ses 4 cases (bits de poids faible d'abord, comme pack_grids)
+UNPACK_TABLE = np.array([[(b >> shift) & 3 for shift in (0, 2, 4, 6)] for b in range(256)], dtype=np.uint8)
+
+
+def unpack_grids(packed, grid_size: int):
+    """Inverse de pack_grids : (N, ceil(G²/4)) octets → grilles (N, G, G) de codes 0..3"""
+    packed = np.asarray(packed, dtype=np.uint8)
+    cells = UNPACK_TABLE[packed].reshape(packed.shape[0], -1)
+    return cells[:, :grid_size * grid_size].reshape(-1, grid_size, grid_size)
+
+
+def grid_nbytes(grid_size: int, packed: bool):
+    cells = grid_size * grid_size
+    return -(-cells // 4) if packed else cells
+
+
+# =============================================================================
+# 1. REQUÊTES
+# =============================================================================
+def encode_request(seq: int, model_id: int, grid, head=None, wall_timer: int = 0, wall_cooldown: int = 0,
+                   packed: bool = True):
+    """Requête binaire ; head en (ligne, colonne)"""
+    grid = np.asarray(grid, dtype=np.uint8)
+    g = grid.shape[0]
+    cells = pack_grids(grid[None])[0] if packed else grid.ravel()
+    head_r, head_c = head if head is not None else (NO_HEAD, NO_HEAD)
+    return REQUEST.pack(seq, model_id, g, FLAG_PACKED if packed else 0, head_r, head_c, wall_timer,
+                        wall_cooldown) + cells.tobytes()
+
+
+def decode_requests(data: bytes):
+    """
+    Découpe un message en requêtes : [(seq, model_id, grille (G, G) uint8, tête ou None, wall_timer, wall_cooldown)].
+    FrameError si le message est tronqué.
+    """
+    requests, offset = [], 0
+    view = memoryview(data)
+    while offset < len(data):
+        if len(data) - offset < REQUEST.size:
+            raise FrameError(f"En-tête tronqué ({len(data) - offset} octets)")
+        seq, model_id, g, flags, head_r, head_c, wall_timer, wall_cooldown = REQUEST.unpack_from(view, offset)
+        offset += REQUEST.size
+        packed = bool(flags & FLAG_PACKED)
+        size = grid_nbytes(g, packed)
+        if g == 0 or len(data) - offset < size:
+            raise FrameError(f"Grille tronquée ou vide (requête {seq})")
+        cells = np.frombuffer(view[offset:offset + size], dtype=np.uint8)
+        offset += size
+        grid = unpack_grids(cells[None], g)[0] if packed else cells.reshape(g, g)
+        head = None if head_r == NO_HEAD else (head_r, head_c)
+        requests.append((seq, model_id, grid, head, wall_timer, wall_cooldown))
+    return requests
+
+
+# =============================================================================
+# 2. RÉPONSES
+# =============================================================================
+def encode_reply(seq: int, status: int, action: int = 0, probs=(0.0, 0.0, 0.0, 0.0)):
+    return REPLY.pack(seq, status, action, *probs)
+
+
+def decode_replies(data: bytes):
+    """[(seq, statut, action, probabilités)]"""
+    if len(data) % REPLY.size:
+        raise FrameError(f"Réponse de {len(data)} octets (multiple de {REPLY.size} attendu)")
+    return [(seq, status, action, list(probs)) for seq, status, action, *probs in REPLY.iter_unpack(data)]
@@ -0,0 +1,147 @@
+import threading
+import time
+
+import numpy as np
+from prometheus_client import Gauge, REGISTRY
+
+from app.src.env.snake_env import SnakeEnv
+from app.src.env.observations import DEFAULT_VIEW_RADIUS
+
+ACTIVE_SESSIONS_GAUGE = Gauge('snake_game_sessions_active', 'Parties serveur en mémoire', registry=REGISTRY)
+
+
+def _xy(pos):
+    """(row, col) côté env → [x, y] côté navigateur"""
+    return [pos[1], pos[0]] if pos is not None else None
+
+
+class GameSession:
+    """
+    Partie Snake jouée côté serveur pour un client : SnakeEnv + policy du modèle choisi.
+
+    Chaque tick produit une frame delta (tête ajoutée, queue retirée, pomme/murs
+    s'ils ont changé, action et probabilités) au lieu de la grille complète.
+    Les commandes place_food / place_wall passent par SnakeEnv.queue_interaction.
+    La partie est journalisée (seed + actions + interactions) : replay() la rend en binaire compact.
+    """
+
+    def __init__(self, session_id: str, model_uuid: str, runner, grid_size: int, game_mode: str = "classic",
+                 observation: dict = None):
+        self.session_id = session_id
+        self.model_uuid = model_uuid
+        self.runner = runner
+        observation = observation or {"mode": "grid"}
+        # Pas de troncature en jeu web : la partie dure jusqu'à la mort du serpent
+        self.env = SnakeEnv(grid_size=grid_size, max_steps=float("inf"), game_mode=game_mode,
+                            obs_mode=observation["mode"], view_radius=observation.get("radius", DEFAULT_VIEW_RADIUS),
+                            record=True)
+        self.paused = False
+        self.dead = False
+        self.seq = 0
+        self.last_active = time.time()
+
+    @property
+    def score(self):
+        return len(self.env.snake) - 1
+
+    def touch(self):
+        self.last_active = time.time()
+
+    def reset(self):
+        self.env.reset()
+        self.dead = False
+        self.paused = False
+        return self.snapshot()
+
+    def snapshot(self):
+        """Frame complète : envoyée au démarrage et à la reconnexion"""
+        self.seq += 1
+        return {
+            "type": "snapshot", "seq": self.seq, "grid_size": self.env.grid_size,
+            "game_mode": self.env.game_mode, "snake": [_xy(p) for p in self.env.snake],
+            "food": _xy(self.env.food), "walls": [_xy(w) for w in self.env.walls],
+            "score": self.score, "dead": self.dead, "paused": self.paused,
+        }
+
+    def observation(self):
+        return self.env._get_obs().astype(np.float32)
+
+    def replay(self):
+        """Journal binaire de la partie en cours (voir EpisodeLog / EpisodeReplayer)"""
+        return self.env.export_episode()
+
+    def interact(self, action_type: str, x: int, y: int):
+        if action_type in ("place_food", "place_wall"):
+            self.env.queue_interaction(action_type, int(x), int(y))
+        self.touch()
+
+    def step(self, action: int, probs):
+        """Joue l'action et retourne la frame delta correspondante"""
+        env = self.env
+        prev_head = env.snake[0]
+        prev_tail = env.snake[-1]
+        prev_len = len(env.snake)
+        prev_food = env.food
+        prev_walls = list(env.walls)
+
+        _, _, terminated, truncated, _ = env.step(action)
+        self.dead = bool(terminated or truncated)
+        # Collision : le serpent ne bouge pas (SnakeEnv ne met pas à jour le corps)
+        moved = env.snake[0] != prev_head
+        grew = len(env.snake) > prev_len
+
+        self.seq += 1
+        frame = {
+            "type": "frame", "seq": self.seq, "action": int(action), "probs": probs,
+            "head": None, "tail": None, "score": self.score, "dead": self.dead,
+        }
+        if moved:
+            frame["head"] = _xy(env.snake[0])
+            if not grew:
+                frame["tail"] = _xy(prev_tail)
+        if env.food != prev_food:
+            frame["food"] = _xy(env.food)
+        if env.walls != prev_walls:
+            frame["walls"] = [_xy(w) for w in env.walls]
+        return frame
+
+
+class GameSessionManager:
+    """Sessions de jeu par client, évincées après idle_timeout secondes sans activité"""
+
+    def __init__(self, idle_timeout: float = 120.0, max_sessions: int = 1000):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str):
+        return self._sessions.get(session_id)
+
+    def create(self, session_id: str, model_uuid: str, runner, grid_size: int, game_mode: str = "classic",
+               observation: dict = None):
+        self.evict_idle()
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions and session_id not in self._sessions:
+                # Plein : on libère la session la plus ancienne
+                oldest = min(self._sessions.values(), key=lambda s: s.last_active)
+                del self._sessions[oldest.session_id]
+            session = GameSession(session_id, model_uuid, runner, grid_size, game_mode, observation)
+            self._sessions[session_id] = session
+            ACTIVE_SESSIONS_GAUGE.set(len(self._sessions))
+        return session
+
+    def evict_idle(self):
+        limit = time.time() - self.idle_timeout
+        with self._lock:
+            for session_id in [sid for sid, s in self._sessions.items() if s.last_active < limit]:
+                del self._sessions[session_id]
+            ACTIVE_SESSIONS_GAUGE.set(len(self._sessions))
+
+    def remove(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            ACTIVE_SESSIONS_GAUGE.set(len(self._sessions))
+
+    def __len__(self):
+        return len(self._sessions)
@@ -0,0 +1,251 @@
+import itertools
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+import torch.multiprocessing as torch_mp
+from torch import nn
+
+from app.src.serving.inference import BaseRunner
+
+
+# =============================================================================
+# 1. WORKER
+# =============================================================================
+def _worker(worker_id: int, requests, results, torch_threads: int):
+    """
+    Boucle d'un processus d'inférence. Les réseaux reçus ("add") pointent sur la mémoire
+    partagée du processus API : aucun poids n'est recopié dans le worker.
+    """
+    torch.set_num_threads(torch_threads)
+    networks = {}
+    try:
+        while True:
+            cmd, *args = requests.get()
+            if cmd == "predict":
+                request_id, uuid, observations = args
+                try:
+                    with torch.inference_mode():
+                        logits = networks[uuid](torch.from_numpy(observations))
+                        probs = torch.softmax(logits, dim=1).numpy()
+                    results.put((request_id, worker_id, probs, None))
+                except Exception as e:
+                    results.put((request_id, worker_id, None, f"{type(e).__name__}: {e}"))
+            elif cmd == "add":
+                uuid, network = args
+                networks[uuid] = network.eval()
+            elif cmd == "remove":
+                networks.pop(args[0], None)
+            elif cmd == "close":
+                break
+    except KeyboardInterrupt:
+        pass
+
+
+def shared_actor(policy):
+    """
+    Chemin acteur d'une MlpPolicy (features → mlp acteur → logits), mêmes modules que la policy.
+    Ses poids sont déplacés en mémoire partagée : la policy du processus API les utilise toujours.
+    """
+    network = nn.Sequential(policy.pi_features_extractor, policy.mlp_extractor.policy_net, policy.action_net)
+    return network.share_memory()
+
+
+# =============================================================================
+# 2. POOL
+# =============================================================================
+class InferencePool:
+    """
+    N processus d'inférence qui partagent les poids des modèles chargés.
+
+    – register() place une seule fois les poids de la policy en mémoire partagée ; chaque worker
+      en reçoit une vue (torch.multiprocessing), pas une copie : la RAM des modèles ne dépend
+      pas du nombre de workers.
+    – unregister() (modèle évincé du cache) ne retire le réseau des workers qu'une fois le dernier
+      PooledRunner de ce modèle libéré : parties en cours et batchs en file restent servis.
+    – submit() envoie un batch d'observations au worker qui a le moins de batchs en vol et
+      renvoie un Future (action argmax, probabilités), résolu par un thread d'écoute.
+    – Chaque worker règle son nombre de threads torch (torch_threads, 1 par défaut : le
+      parallélisme vient des processus, pas des threads intra-op).
+    """
+
+    def __init__(self, n_workers: int, torch_threads: int = 1, start_method: str = "spawn"):
+        ctx = torch_mp.get_context(start_method)
+        self.n_workers = n_workers
+        self.torch_threads = torch_threads
+        self._results = ctx.Queue()
+        self._requests, self.processes = [], []
+        for w in range(n_workers):
+            requests = ctx.Queue()
+            process = ctx.Process(target=_worker, args=(w, requests, self._results, torch_threads), daemon=True,
+                                  name=f"snake-inference-{w}")
+            process.start()
+            self._requests.append(requests)
+            self.processes.append(process)
+
+        self.inflight = [0] * n_workers
+        self.completed = [0] * n_workers
+        self._networks = {}  # uuid -> réseau partagé (gardé en vie tant que les workers s'en servent)
+        self._runners = {}  # uuid -> PooledRunner encore vivants
+        self._evicted = set()  # uuids à retirer des workers dès que leur dernier runner est libéré
+        self._pending = {}  # request_id -> (Future, worker)
+        self._ids = itertools.count()
+        self._lock = threading.RLock()  # Réentrant : un runner peut être libéré (GC) sous le verrou
+        self.closed = False
+        self._listener = threading.Thread(target=self._listen, daemon=True, name="snake-inference-results")
+        self._listener.start()
+
+    # =========================================================================
+    # MODÈLES
+    # =========================================================================
+    def register(self, uuid: str, policy):
+        """Partage la policy avec les workers (une fois par uuid) et retourne un runner qui les sollicite"""
+        with self._lock:
+            network = self._networks.get(uuid)
+            if network is None:
+                network = self._networks[uuid] = shared_actor(policy)
+                for requests in self._requests:
+                    requests.put(("add", uuid, network))
+            self._evicted.discard(uuid)
+            self._runners[uuid] = self._runners.get(uuid, 0) + 1
+        runner = PooledRunner(self, uuid, tuple(policy.observation_space.shape))
+        weakref.finalize(runner, self._release, uuid)
+        return runner
+
+    def unregister(self, uuid: str):
+        """Le modèle n'est plus servi : les workers le relâchent dès qu'aucun runner ne s'en sert"""
+        with self._lock:
+            if uuid not in self._networks:
+                return
+            self._evicted.add(uuid)
+            if not self._runners.get(uuid):
+                self._drop(uuid)
+
+    def _release(self, uuid: str):
+        with self._lock:
+            self._runners[uuid] = self._runners.get(uuid, 1) - 1
+            if not self._runners[uuid] and uuid in self._evicted:
+                self._drop(uuid)
+
+    def _drop(self, uuid: str):
+        self._networks.pop(uuid, None)
+        self._runners.pop(uuid, None)
+        self._evicted.discard(uuid)
+        if not self.closed:
+            for requests in self._requests:
+                requests.put(("remove", uuid))
+
+    def __contains__(self, uuid):
+        return uuid in self._networks
+
+    @property
+    def shared_bytes(self):
+        """Poids en mémoire partagée (une seule fois, quel que soit le nombre de workers)"""
+        return sum(p.numel() * p.element_size() for net in list(self._networks.values()) for p in net.parameters())
+
+    # =========================================================================
+    # REQUÊTES
+    # =========================================================================
+    def submit(self, uuid: str, observations: np.ndarray):
+        """Batch (B, *obs_shape) → Future de (actions (B,), probabilités (B, n_actions))"""
+        observations = np.array(observations, dtype=np.float32)  # Copie : sérialisée plus tard par la file
+        future = Future()
+        with self._lock:
+            if self.closed:
+                raise RuntimeError("Pool d'inférence fermé")
+            alive = [w for w, p in enumerate(self.processes) if p.is_alive()]
+            if not alive:
+                raise RuntimeError("Aucun worker d'inférence vivant")
+            worker = min(alive, key=lambda w: self.inflight[w])  # Moins chargé, le plus bas en cas d'égalité
+            request_id = next(self._ids)
+            self._pending[request_id] = (future, worker)
+            self.inflight[worker] += 1
+        self._requests[worker].put(("predict", request_id, uuid, observations))
+        return future
+
+    def _listen(self):
+        """Résout les Futures à mesure que les workers répondent ; échoue ceux d'un worker mort"""
+        last_check = time.monotonic()
+        while not self.closed:
+            if time.monotonic() - last_check > 1.0:
+                self._fail_dead_workers()
+                last_check = time.monotonic()
+            try:
+                request_id, worker, probs, error = self._results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                future, _ = self._pending.pop(request_id, (None, None))
+                if future is not None:
+                    self.inflight[worker] -= 1
+                    self.completed[worker] += 1
+            if future is None:
+                continue
+            if error is not None:
+                # Échec côté worker : erreur serveur (les observations mal formées sont refusées avant l'envoi)
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result((probs.argmax(axis=1), probs))
+
+    def _fail_dead_workers(self):
+        with self._lock:
+            dead = {w for w, p in enumerate(self.processes) if not p.is_alive()}
+            lost = [(rid, future, w) for rid, (future, w) in self._pending.items() if w in dead]
+            for rid, _, w in lost:
+                del self._pending[rid]
+                self.inflight[w] -= 1
+        for _, future, w in lost:
+            future.set_exception(RuntimeError(f"Worker d'inférence {w} arrêté"))
+
+    def stats(self):
+        return {
+            "workers": self.n_workers, "alive": sum(p.is_alive() for p in self.processes),
+            "torch_threads": self.torch_threads, "inflight": list(self.inflight), "completed": list(self.completed),
+            "models": len(self._networks), "shared_bytes": self.shared_bytes,
+        }
+
+    def worker_pids(self):
+        return {w: p.pid for w, p in enumerate(self.processes)}
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for requests, process in zip(self._requests, self.processes):
+            if process.is_alive():
+                requests.put(("close",))
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._listener.join(timeout=2)
+        with self._lock:
+            pending, self._pending = list(self._pending.values()), {}
+        for future, _ in pending:
+            future.set_exception(RuntimeError("Pool d'inférence fermé"))
+
+
+class PooledRunner(BaseRunner):
+    """
+    Même interface que PolicyRunner, mais le forward tourne dans un worker du pool.
+    submit() (non bloquant) est utilisé par le batcher ; predict_batch() attend la réponse.
+    """
+
+    def __init__(self, pool: InferencePool, uuid: str, obs_shape):
+        self.pool = pool
+        self.uuid = uuid
+        self.obs_shape = tuple(obs_shape)
+
+    def submit(self, observations: np.ndarray):
+        self.check_shape(observations)
+        return self.pool.submit(self.uuid, observations)
+
+    def predict_batch(self, observations: np.ndarray):
+        return self.submit(observations).result()
+
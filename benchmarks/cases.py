@@ -0,0 +1,247 @@
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+# =============================================================================
+# 1. OUTILS DE MESURE
+# =============================================================================
+def metric(name: str, value: float, unit: str, higher_is_better: bool):
+    return {"name": name, "value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def percentile_us(samples, q):
+    return float(np.percentile(np.asarray(samples) * 1e6, q))
+
+
+def timed_loop(fn, n: int):
+    """Temps moyen d'un appel de fn (µs), mesuré sur n appels"""
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def grow_snake(env, length: int):
+    """Remplace le serpent par un corps de `length` cases en serpentin (ligne par ligne)"""
+    g = env.grid_size
+    env._set_cell(env.food, 0)
+    env.food = None
+    while env.snake:
+        env._pop_tail()
+    path = [(r, c if r % 2 == 0 else g - 1 - c) for r in range(g) for c in range(g)]
+    for pos in path[:length]:
+        env._push_head(pos)
+    env._place_food()
+
+
+# =============================================================================
+# 2. ENVIRONNEMENT
+# =============================================================================
+def bench_env(grid_sizes, game_modes, n_steps: int):
+    """Steps/s de SnakeEnv (actions aléatoires, reset automatique)"""
+    from app.src.env.snake_env import SnakeEnv
+
+    results = []
+    rng = np.random.default_rng(0)
+    for grid_size in grid_sizes:
+        for game_mode in game_modes:
+            env = SnakeEnv(grid_size=grid_size, game_mode=game_mode)
+            actions = rng.integers(0, 4, size=n_steps)
+            start = time.perf_counter()
+            for action in actions:
+                _, _, terminated, truncated, _ = env.step(int(action))
+                if terminated or truncated:
+                    env.reset()
+            fps = n_steps / (time.perf_counter() - start)
+            results.append(metric(f"env.steps_per_sec[g={grid_size},mode={game_mode}]", fps, "steps/s", True))
+    return results
+
+
+def bench_observation(grid_sizes, fill_ratios, n_calls: int):
+    """Coût de l'observation et du placement de pomme selon la longueur du serpent"""
+    from app.src.env.snake_env import SnakeEnv
+
+    results = []
+    for grid_size in grid_sizes:
+        env = SnakeEnv(grid_size=grid_size)
+        for ratio in fill_ratios:
+            length = max(1, int(grid_size * grid_size * ratio))
+            env.reset()
+            grow_snake(env, length)
+            tag = f"g={grid_size},len={length}"
+            results.append(metric(f"env.obs_us[{tag}]", timed_loop(env._get_obs, n_calls), "µs", False))
+
+            def place_food():
+                env._set_cell(env.food, 0)
+                env.food = None
+                env._place_food()
+
+            results.append(metric(f"env.place_food_us[{tag}]", timed_loop(place_food, n_calls), "µs", False))
+    return results
+
+
+# =============================================================================
+# 3. SERVING
+# =============================================================================
+def _make_agent(grid_size: int):
+    from stable_baselines3 import PPO
+    from app.src.env.snake_env import SnakeEnv
+
+    return PPO("MlpPolicy", SnakeEnv(grid_size=grid_size), verbose=0, seed=0, device="cpu")
+
+
+def bench_model_load(grid_sizes, repeats: int):
+    """PPO.load + construction du PolicyRunner (chemin de ModelManager.ensure_loaded, hors téléchargement)"""
+    from stable_baselines3 import PPO
+    from app.src.serving.inference import PolicyRunner
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for grid_size in grid_sizes:
+            path = Path(temp_dir) / f"model_{grid_size}.zip"
+            _make_agent(grid_size).save(path)
+            samples = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                PolicyRunner(PPO.load(path, device="cpu").policy)
+                samples.append(time.perf_counter() - start)
+            results.append(metric(f"serving.model_load_ms[g={grid_size}]", np.median(samples) * 1e3, "ms", False))
+    return results
+
+
+async def _predict_latencies(client, grid, n_requests: int, concurrency: int):
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        response = await client.post("/api/predict", json={"grid": grid})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    for _ in range(n_requests // concurrency):
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+    return latencies
+
+
+def bench_predict(grid_sizes, n_requests: int, concurrency: int):
+    """Latence p50/p99 de /api/predict en processus (ASGI), seule et sous charge concurrente"""
+    import httpx
+    from app.main import app
+    from app.routers import api
+    from app.src.serving.inference import PolicyRunner
+    from app.src.serving.model_cache import LoadedModel
+
+    async def run(grid, uuid):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await _predict_latencies(client, grid, 20, 1)  # Échauffement
+            single = await _predict_latencies(client, grid, n_requests, 1)
+            concurrent = await _predict_latencies(client, grid, n_requests, concurrency)
+        return single, concurrent
+
+    results = []
+    previous_uuid = api.manager.current_uuid
+    try:
+        for grid_size in grid_sizes:
+            uuid = f"bench-{grid_size}"
+            agent = _make_agent(grid_size)
+            api.manager.cache.put(LoadedModel(uuid, grid_size, agent, PolicyRunner(agent.policy), 0))
+            api.manager.current_uuid = uuid
+            grid = np.zeros((grid_size, grid_size), dtype=int)
+            grid[grid_size // 2, grid_size // 2] = 1
+            grid[0, 0] = 2
+
+            single, concurrent = asyncio.run(run(grid.tolist(), uuid))
+            for label, samples in (("single", single), (f"concurrent{concurrency}", concurrent)):
+                for q in (50, 99):
+                    results.append(metric(f"serving.predict_p{q}_us[g={grid_size},{label}]",
+                                          percentile_us(samples, q), "µs", False))
+    finally:
+        api.manager.current_uuid = previous_uuid
+    return results
+
+
+def bench_predict_decode(grid_sizes, n_calls: int):
+    """Décodage d'une requête par tick : JSON validé par pydantic (/predict) vs trame binaire (/ws/predict)"""
+    import json
+    from app.routers.serving import GameState
+    from app.src.serving import protocol
+
+    results = []
+    for grid_size in grid_sizes:
+        grid = np.random.default_rng(0).integers(0, 4, size=(grid_size, grid_size))
+        body = json.dumps({"grid": grid.tolist(), "uuid": "0" * 36})
+        frame = protocol.encode_request(1, 1, grid)
+        json_us = timed_loop(lambda: np.array(GameState.model_validate_json(body).grid), n_calls)
+        binary_us = timed_loop(lambda: protocol.decode_requests(frame), n_calls)
+        results.append(metric(f"serving.predict_decode_us[g={grid_size},format=json]", json_us, "µs", False))
+        results.append(metric(f"serving.predict_decode_us[g={grid_size},format=binary]", binary_us, "µs", False))
+    return results
+
+
+def bench_inference_pool(grid_sizes, worker_counts, n_batches: int, batch_size: int = 64):
+    """Batchs/s servis par le pool de workers d'inférence (poids partagés) selon le nombre de workers"""
+    from app.src.serving.worker_pool import InferencePool
+
+    results = []
+    for n_workers in worker_counts:
+        pool = InferencePool(n_workers, torch_threads=1)
+        try:
+            for grid_size in grid_sizes:
+                runner = pool.register(f"bench-{grid_size}", _make_agent(grid_size).policy)
+                batch = np.zeros((batch_size, grid_size, grid_size), dtype=np.float32)
+                for future in [runner.submit(batch) for _ in range(2 * n_workers)]:  # Échauffement
+                    future.result()
+                start = time.perf_counter()
+                for future in [runner.submit(batch) for _ in range(n_batches)]:
+                    future.result()
+                results.append(metric(f"serving.pool_batches_per_s[g={grid_size},workers={n_workers}]",
+                                      n_batches / (time.perf_counter() - start), "batchs/s", True))
+        finally:
+            pool.close()
+    return results
+
+
+def bench_cold_start(repeats: int):
+    """Temps d'import de l'app de serving et de l'app complète, chacune dans un interpréteur neuf"""
+    import os
+    import subprocess
+    import sys
+
+    root = Path(__file__).resolve().parent.parent
+    env = {**os.environ, "HF_HUB_TOKEN": os.getenv("HF_HUB_TOKEN") or "bench"}
+    results = []
+    for label, module in (("serving", "app.src.serving.main"), ("full", "app.main")):
+        code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+        samples = [float(subprocess.run([sys.executable, "-c", code], cwd=root, env=env, check=True,
+                                        capture_output=True, text=True).stdout.split()[-1])
+                   for _ in range(repeats)]
+        results.append(metric(f"serving.import_ms[app={label}]", np.median(samples) * 1e3, "ms", False))
+    return results
+
+
+# =============================================================================
+# 4. ENTRAÎNEMENT
+# =============================================================================
+def bench_training(grid_sizes, backends, n_envs: int, timesteps: int):
+    """Timesteps/s de PPO.learn (collecte + mise à jour) selon le backend VecEnv"""
+    from stable_baselines3 import PPO
+    from app.src.agent.training.train import make_training_env
+
+    results = []
+    for grid_size in grid_sizes:
+        for backend in backends:
+            env = make_training_env(backend, grid_size, "classic", n_envs)
+            try:
+                agent = PPO("MlpPolicy", env, verbose=0, seed=0, device="cpu", n_steps=256, batch_size=256)
+                start = time.perf_counter()
+                agent.learn(total_timesteps=timesteps)
+                fps = agent.num_timesteps / (time.perf_counter() - start)
+            finally:
+                env.close()
+            results.append(metric(f"train.ppo_fps[g={grid_size},vec_env={backend}]", fps, "timesteps/s", True))
+    return results
@@ -0,0 +1,137 @@
+"""
+Runner unique des benchmarks de performance.
+
+    python -m benchmarks.run                      # mesure + comparaison à la baseline
+    python -m benchmarks.run --save-baseline      # enregistre les mesures comme nouvelle baseline
+    python -m benchmarks.run --suites env,predict --threshold 0.15
+
+Code de sortie 1 si une métrique régresse de plus de --threshold (20 % par défaut)
+par rapport à la baseline JSON.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks import cases
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "baseline.json"
+SUITES = ("env", "obs", "load", "predict", "pool", "startup", "train")
+
+
+# =============================================================================
+# 1. COMPARAISON À LA BASELINE
+# =============================================================================
+def compare(results, baseline, threshold: float):
+    """
+    Retourne [(nom, baseline, mesure, variation)] pour les métriques qui régressent
+    de plus de threshold (variation > 0 = plus lent / plus coûteux).
+    """
+    reference = {m["name"]: m for m in baseline.get("metrics", [])}
+    regressions = []
+    for m in results:
+        ref = reference.get(m["name"])
+        if ref is None or ref["value"] <= 0:
+            continue
+        if m["higher_is_better"]:
+            change = (ref["value"] - m["value"]) / ref["value"]
+        else:
+            change = (m["value"] - ref["value"]) / ref["value"]
+        if change > threshold:
+            regressions.append((m["name"], ref["value"], m["value"], change))
+    return regressions
+
+
+def load_baseline(path: Path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(path: Path, results):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "created_at": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+            "machine": {"platform": platform.platform(), "processor": platform.processor(),
+                        "python": platform.python_version()},
+            "metrics": results,
+        }, f, indent=4)
+
+
+# =============================================================================
+# 2. EXÉCUTION
+# =============================================================================
+def run_suites(suites, grid_sizes, quick: bool = False):
+    scale = 0.1 if quick else 1.0
+    n = lambda count: max(10, int(count * scale))
+
+    results = []
+    if "env" in suites:
+        results += cases.bench_env(grid_sizes, ("classic", "walls"), n_steps=n(50_000))
+    if "obs" in suites:
+        results += cases.bench_observation(grid_sizes, (0.0, 0.25, 0.75), n_calls=n(20_000))
+    if "load" in suites:
+        results += cases.bench_model_load(grid_sizes, repeats=3 if quick else 10)
+    if "predict" in suites:
+        results += cases.bench_predict(grid_sizes, n_requests=n(1_000), concurrency=32)
+        results += cases.bench_predict_decode(grid_sizes, n_calls=n(5_000))
+    if "pool" in suites:
+        workers = sorted({1, os.cpu_count() or 1})
+        results += cases.bench_inference_pool(grid_sizes, workers, n_batches=n(2_000))
+    if "startup" in suites:
+        results += cases.bench_cold_start(repeats=1 if quick else 5)
+    if "train" in suites:
+        results += cases.bench_training(grid_sizes, ("dummy", "batched"), n_envs=8, timesteps=n(8_192))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks Snake RL (env, inférence, entraînement)")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"Sous-ensemble de {', '.join(SUITES)}")
+    parser.add_argument("--grid-sizes", default="10,20,40")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.2, help="Régression tolérée (0.2 = 20 %%)")
+    parser.add_argument("--output", type=Path, default=None, help="Écrit aussi les mesures dans ce fichier JSON")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--quick", action="store_true", help="Moins d'itérations (fumée / CI)")
+    args = parser.parse_args(argv)
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Suites inconnues : {', '.join(sorted(unknown))}")
+    grid_sizes = [int(g) for g in args.grid_sizes.split(",")]
+
+    results = run_suites(suites, grid_sizes, quick=args.quick)
+    for m in results:
+        print(f"{m['name']:<60} {m['value']:>14.2f} {m['unit']}")
+
+    if args.output:
+        save_baseline(args.output, results)
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"💾 Baseline enregistrée : {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"⚠️ Pas de baseline ({args.baseline}) : lancez avec --save-baseline")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, ref, value, change in regressions:
+        print(f"❌ Régression {name} : {ref:.2f} → {value:.2f} ({change:+.0%})")
+    if regressions:
+        return 1
+    print(f"✅ Aucune régression au-delà de {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
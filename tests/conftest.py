@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+
+# --- FIXTURE ---
+@pytest.fixture
+def model_store(tmp_path, monkeypatch):
+    """
+    Store local (remplaçant hors-ligne du dépôt HF) pointé par SNAKE_MODEL_STORE_DIR / SNAKE_CATALOG_DIR.
+    model_store(uuid, grid_size, agent) y enregistre un modèle (PPO non entraîné par défaut) et retourne son dossier.
+    """
+    root = tmp_path / "store"
+    monkeypatch.setenv("SNAKE_MODEL_STORE_DIR", str(root))
+    monkeypatch.setenv("SNAKE_CATALOG_DIR", str(tmp_path / "catalog"))
+
+    def add_model(uuid: str, grid_size: int = 6, agent=None):
+        from stable_baselines3 import PPO
+        from app.src.env.snake_env import SnakeEnv
+
+        folder = root / f"{grid_size}x{grid_size}" / uuid
+        folder.mkdir(parents=True)
+        agent = agent or PPO("MlpPolicy", SnakeEnv(grid_size=grid_size), verbose=0, seed=0)
+        agent.save(folder / "model.zip")
+        (folder / "metadata.json").write_text(json.dumps({"uuid": uuid, "grid_size": grid_size}))
+        return folder
+
+    return add_model
@@ -67,15 +67,16 @@ async def test_invalid_grid_size_type(app_transport):
     assert response.status_code == 422
 
 
-# --- LE TEST CORRIGÉ AVEC LE BON CHEMIN ---
+# --- CATALOGUE SUR UN STORE LOCAL (remplaçant hors-ligne du dépôt HF) ---
 @pytest.mark.asyncio
-async def test_list_models_structure(app_transport, mocker, tmp_path):
+async def test_list_models_structure(app_transport, monkeypatch, tmp_path):
     """
-    On utilise 'mocker' pour simuler HuggingFace.
+    On utilise SNAKE_MODEL_STORE_DIR pour simuler HuggingFace.
     """
 
-    # Création d'un faux fichier metadata.json
-    fake_meta_file = tmp_path / "metadata.json"
+    # Création d'un faux fichier metadata.json dans l'arborescence du dépôt
+    model_dir = tmp_path / "store" / "10x10" / "fake-uuid-123"
+    model_dir.mkdir(parents=True)
     fake_data = {
         "uuid": "fake-uuid-123",
         "grid_size": 10,
@@ -83,14 +84,10 @@ async def test_list_models_structure(app_transport, mocker, tmp_path):
         "final_mean_reward": 150.5,
         "date": "2023-10-27"
     }
-    fake_meta_file.write_text(json.dumps(fake_data))
+    (model_dir / "metadata.json").write_text(json.dumps(fake_data))
 
-    # On mock 'HfApi' dans le fichier 'app/routers/api.py'
-    mock_hf_api = mocker.patch("app.routers.api.HfApi")
-    mock_hf_api.return_value.list_repo_files.return_value = ["model_folder/metadata.json"]
-
-    # On mock 'hf_hub_download' au même endroit
-    mocker.patch("app.routers.api.hf_hub_download", return_value=str(fake_meta_file))
+    monkeypatch.setenv("SNAKE_MODEL_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setenv("SNAKE_CATALOG_DIR", str(tmp_path / "catalog"))
 
     # Exécution du test
     async with httpx.AsyncClient(transport=app_transport, base_url=BASE_URL) as ac:
@@ -146,4 +143,24 @@ async def test_websocket_connection_status():
 def get_metric_value(metrics_text, metric_name, grid_size=10):
     pattern = rf'{metric_name}{{grid_size="{grid_size}"}}\s+(\d+\.?\d*)'
     match = re.search(pattern, metrics_text)
-    return float(match.group(1)) if match else 0.0
\ No newline at end of file
+    return float(match.group(1)) if match else 0.0
+
+# --- REPRISE D'UN RUN ---
+@pytest.mark.asyncio
+async def test_resume_keeps_the_run_profile_and_checkpoint_interval(app_transport, monkeypatch):
+    from types import SimpleNamespace
+    from app.routers import api
+
+    config = {"timesteps": 1000, "grid_size": 8, "n_envs": 2, "game_mode": "classic", "base_uuid": None,
+              "vec_env": "dummy", "profile": "sample", "checkpoint_every": 10000}
+    checkpoint = SimpleNamespace(state={"config": config})
+    monkeypatch.setattr(api, "get_checkpoint_manager", lambda run_id: SimpleNamespace(latest=lambda: checkpoint))
+    submitted = {}
+    scheduler = SimpleNamespace(stats=lambda: {"running": [], "queued": []},
+                                submit=lambda run_id, **kwargs: submitted.update(kwargs) or 0)
+    monkeypatch.setattr(api, "training_scheduler", scheduler)
+
+    async with httpx.AsyncClient(transport=app_transport, base_url=BASE_URL) as ac:
+        response = await ac.post("/api/train/resume/run-resume")
+    assert response.json()["status"] == "started"
+    assert (submitted["profile"], submitted["checkpoint_every"]) == ("sample", 10000)
@@ -0,0 +1,64 @@
+import asyncio
+
+import numpy as np
+import pytest
+import torch
+from stable_baselines3 import PPO
+
+from app.src.env.snake_env import SnakeEnv
+from app.src.serving.batching import InferenceBatcher, BATCH_SIZE_HISTOGRAM
+from app.src.serving.inference import PolicyRunner
+
+
+# --- FIXTURE ---
+@pytest.fixture(scope="module")
+def agent():
+    return PPO("MlpPolicy", SnakeEnv(grid_size=6), verbose=0, seed=0)
+
+
+@pytest.fixture(scope="module")
+def runner(agent):
+    return PolicyRunner(agent.policy)
+
+
+def reference(agent, obs):
+    with torch.no_grad():
+        t_obs = agent.policy.obs_to_tensor(np.expand_dims(obs, 0))[0]
+        probs = agent.policy.get_distribution(t_obs).distribution.probs.numpy()[0]
+    return int(probs.argmax()), probs
+
+
+# --- TESTS ---
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch(agent, runner):
+    batcher = InferenceBatcher(max_batch_size=8, max_wait_ms=50)
+    rng = np.random.default_rng(0)
+    grids = [rng.integers(0, 4, size=(6, 6)).astype(np.float32) for _ in range(8)]
+
+    before = BATCH_SIZE_HISTOGRAM.labels(model="m1")._sum.get()
+    results = await asyncio.gather(*(batcher.predict("m1", runner, g) for g in grids))
+    assert BATCH_SIZE_HISTOGRAM.labels(model="m1")._sum.get() - before == 8
+
+    for grid, (action, probs) in zip(grids, results):
+        ref_action, ref_probs = reference(agent, grid)
+        assert action == ref_action
+        assert np.allclose(probs, ref_probs, atol=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_flushed_after_max_wait(runner):
+    batcher = InferenceBatcher(max_batch_size=64, max_wait_ms=1)
+    grid = np.zeros((6, 6), dtype=np.float32)
+    action, probs = await asyncio.wait_for(batcher.predict("m2", runner, grid), timeout=5)
+    assert 0 <= action < 4
+    assert len(probs) == 4
+    assert sum(probs) == pytest.approx(1.0, abs=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_forward_error_is_propagated(runner):
+    batcher = InferenceBatcher(max_batch_size=1, max_wait_ms=1)
+    wrong_shape = np.zeros((3, 3), dtype=np.float32)
+    with pytest.raises(ValueError):
+        await batcher.predict("m3", runner, wrong_shape)
@@ -0,0 +1,33 @@
+import json
+
+from benchmarks.run import compare, main
+
+
+def m(name, value, higher_is_better):
+    return {"name": name, "value": value, "unit": "", "higher_is_better": higher_is_better}
+
+
+# --- TESTS ---
+
+def test_compare_flags_regressions_in_both_directions():
+    baseline = {"metrics": [m("fps", 1000.0, True), m("latency", 10.0, False), m("obs", 1.0, False)]}
+    results = [m("fps", 700.0, True), m("latency", 11.0, False), m("obs", 2.0, False), m("new", 5.0, True)]
+
+    regressions = compare(results, baseline, threshold=0.2)
+    # fps -30 % et obs +100 % régressent ; latency +10 % reste sous le seuil ; "new" n'a pas de référence
+    assert [name for name, *_ in regressions] == ["fps", "obs"]
+
+
+def test_runner_saves_baseline_then_fails_on_regression(tmp_path):
+    baseline_path = tmp_path / "baseline.json"
+    args = ["--suites", "obs", "--grid-sizes", "6", "--quick", "--baseline", str(baseline_path)]
+
+    assert main(args + ["--save-baseline"]) == 0
+    assert main(args + ["--threshold", "100"]) == 0
+
+    # Baseline artificiellement 1000x plus rapide : toutes les métriques régressent
+    data = json.loads(baseline_path.read_text())
+    for metric in data["metrics"]:
+        metric["value"] /= 1000
+    baseline_path.write_text(json.dumps(data))
+    assert main(args) == 1
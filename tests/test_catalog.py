@@ -0,0 +1,105 @@
+import json
+import time
+
+import pytest
+
+from app.src.agent.utils.catalog import ModelCatalog
+from app.src.agent.utils.model_store import LocalModelStore
+
+
+def write_model(root, uuid, grid_size=10, reward=0.0):
+    folder = root / f"{grid_size}x{grid_size}" / uuid
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / "metadata.json").write_text(json.dumps({
+        "uuid": uuid, "grid_size": grid_size, "final_mean_reward": reward, "game_mode": "classic"
+    }))
+    (folder / "model.zip").write_bytes(b"zip")
+    return folder
+
+
+class CountingStore(LocalModelStore):
+    """Store local qui compte les téléchargements"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.downloads = []
+
+    def download(self, path, revision=None):
+        self.downloads.append(path)
+        return super().download(path, revision)
+
+
+# --- FIXTURE ---
+@pytest.fixture
+def store(tmp_path):
+    root = tmp_path / "store"
+    write_model(root, "uuid-a", 10, 1.5)
+    write_model(root, "uuid-b", 20, -0.5)
+    return CountingStore(root)
+
+
+# --- TESTS ---
+
+def test_refresh_indexes_models_and_resolves_paths(store, tmp_path):
+    catalog = ModelCatalog(store, tmp_path / "catalog.json")
+    catalog.refresh()
+
+    assert {m["uuid"] for m in catalog.list_models()} == {"uuid-a", "uuid-b"}
+    assert catalog.get("uuid-b")["grid_size"] == 20
+    assert catalog.model_path("uuid-a") == "10x10/uuid-a/model.zip"
+
+
+def test_refresh_only_downloads_changed_metadata(store, tmp_path):
+    catalog = ModelCatalog(store, tmp_path / "catalog.json")
+    catalog.refresh()
+    assert len(store.downloads) == 2
+
+    store.downloads.clear()
+    catalog.refresh()
+    assert store.downloads == []
+
+    time.sleep(0.01)
+    write_model(store.root, "uuid-a", 10, 9.0)
+    write_model(store.root, "uuid-c", 10, 0.0)
+    catalog.refresh()
+    assert sorted(store.downloads) == ["10x10/uuid-a/metadata.json", "10x10/uuid-c/metadata.json"]
+    assert catalog.get("uuid-a")["final_mean_reward"] == 9.0
+
+
+def test_index_is_persisted_and_reloaded(store, tmp_path):
+    ModelCatalog(store, tmp_path / "catalog.json").refresh()
+
+    store.downloads.clear()
+    reloaded = ModelCatalog(store, tmp_path / "catalog.json")
+    assert reloaded.get("uuid-a", refresh_on_miss=False) is not None
+    reloaded.refresh()
+    assert store.downloads == []
+
+
+def test_add_registers_uploaded_model(store, tmp_path):
+    catalog = ModelCatalog(store, tmp_path / "catalog.json")
+    catalog.refresh()
+    catalog.add({"uuid": "uuid-new", "grid_size": 10, "hf_folder": "10x10/uuid-new"})
+    assert catalog.get("uuid-new", refresh_on_miss=False)["folder"] == "10x10/uuid-new"
+
+
+def test_removed_models_disappear(store, tmp_path):
+    catalog = ModelCatalog(store, tmp_path / "catalog.json")
+    catalog.refresh()
+    (store.root / "20x20" / "uuid-b" / "metadata.json").unlink()
+    catalog.refresh()
+    assert catalog.get("uuid-b", refresh_on_miss=False) is None
+
+
+def test_unknown_uuids_refresh_at_most_once_per_interval(store, tmp_path, monkeypatch):
+    catalog = ModelCatalog(store, tmp_path / "catalog.json", miss_interval=60)
+    refreshes = []
+    monkeypatch.setattr(catalog, "refresh", lambda force=False: refreshes.append(force))
+
+    for i in range(20):
+        assert catalog.get(f"random-{i}") is None
+    assert len(refreshes) == 1
+
+    catalog._last_miss_refresh -= 60
+    catalog.model_path("random-again")
+    assert len(refreshes) == 2
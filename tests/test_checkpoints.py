@@ -0,0 +1,68 @@
+import numpy as np
+from stable_baselines3 import PPO
+
+from app.src.agent.training.checkpoints import AsyncCheckpointCallback, CheckpointManager
+from app.src.agent.utils.model_store import LocalModelStore
+from app.src.env.snake_vec_env import SnakeVecEnv
+
+
+def make_agent():
+    return PPO("MlpPolicy", SnakeVecEnv(n_envs=2, grid_size=5), n_steps=32, batch_size=32, n_epochs=1, verbose=0)
+
+
+def params(agent):
+    return np.concatenate([p.detach().cpu().numpy().ravel() for p in agent.policy.parameters()])
+
+
+# --- TESTS ---
+
+def test_checkpoints_are_written_uploaded_and_pruned(tmp_path):
+    store = LocalModelStore(tmp_path / "store")
+    manager = CheckpointManager("run-1", root=tmp_path / "ckpt", store=store, keep_last=2)
+    agent = make_agent()
+    for steps in (64, 128, 192):
+        agent.num_timesteps = steps
+        manager.save_async(agent, {"timesteps_done": steps})
+    manager.wait()
+
+    assert manager.local_checkpoints() == ["ckpt_000000000128", "ckpt_000000000192"]
+    assert manager._remote_checkpoints() == ["ckpt_000000000128", "ckpt_000000000192"]
+
+    latest = manager.latest()
+    assert latest.state["num_timesteps"] == 192 and latest.state["timesteps_done"] == 192
+    restored = PPO.load(latest.model_path)
+    np.testing.assert_allclose(params(restored), params(agent))
+    # L'état de l'optimiseur fait partie du checkpoint
+    assert restored.policy.optimizer.state_dict()["param_groups"] == agent.policy.optimizer.state_dict()["param_groups"]
+
+    manager.clear()
+    assert manager.local_checkpoints() == [] and manager._remote_checkpoints() == []
+    manager.close()
+
+
+def test_latest_falls_back_to_the_store(tmp_path):
+    store = LocalModelStore(tmp_path / "store")
+    writer = CheckpointManager("run-2", root=tmp_path / "host-a", store=store)
+    agent = make_agent()
+    agent.num_timesteps = 64
+    writer.save_async(agent, {"config": {"grid_size": 5}})
+    writer.close()
+
+    # Autre machine (ou disque perdu après redéploiement) : rien en local
+    reader = CheckpointManager("run-2", root=tmp_path / "host-b", store=store)
+    latest = reader.latest()
+    assert latest is not None and latest.state["config"] == {"grid_size": 5}
+    assert PPO.load(latest.model_path).num_timesteps == 64
+    assert CheckpointManager("other-run", root=tmp_path / "host-b", store=store).latest() is None
+    reader.close()
+
+
+def test_callback_checkpoints_at_the_configured_interval(tmp_path):
+    manager = CheckpointManager("run-3", root=tmp_path, keep_last=10)
+    agent = make_agent()
+    callback = AsyncCheckpointCallback(manager, every=64, state_fn=lambda steps: {"timesteps_done": steps})
+    agent.learn(total_timesteps=256, callback=callback)
+    manager.close()
+
+    steps = [int(name.split("_")[1]) for name in manager.local_checkpoints()]
+    assert len(steps) == 4 and all(b - a >= 64 for a, b in zip(steps, steps[1:]))
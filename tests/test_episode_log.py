@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from app.src.env.episode_log import EpisodeLog, EpisodeReplayer
+from app.src.env.snake_env import SnakeEnv
+
+
+def play(env, n_steps, seed, interactions=None):
+    """Joue des actions aléatoires ; retourne les grilles après chaque step (frame 0 = reset)"""
+    rng = np.random.default_rng(seed)
+    env.reset(seed=seed)
+    grids = [env._grid.copy()]
+    for t in range(n_steps):
+        for kind, x, y in (interactions or {}).get(t, ()):
+            if kind == "set_game_mode":
+                env.set_game_mode(x)
+            else:
+                env.queue_interaction(kind, x, y)
+        _, _, terminated, truncated, _ = env.step(int(rng.integers(4)))
+        grids.append(env._grid.copy())
+        if terminated or truncated:
+            break
+    return grids
+
+
+# --- TESTS ---
+
+def test_seeded_reset_is_reproducible_per_env():
+    a = play(SnakeEnv(grid_size=8, game_mode="walls", max_steps=200), 200, seed=3)
+    b = play(SnakeEnv(grid_size=8, game_mode="walls", max_steps=200), 200, seed=3)
+    assert len(a) == len(b) and all((x == y).all() for x, y in zip(a, b))
+
+    foods = {tuple(np.argwhere(SnakeEnv(grid_size=8).reset(seed=s)[0] == 2)[0]) for s in range(20)}
+    assert len(foods) > 1
+
+
+def test_log_roundtrip_and_replay_every_frame():
+    env = SnakeEnv(grid_size=8, game_mode="classic", max_steps=300, record=True)
+    interactions = {2: [("place_wall", 0, 0)], 3: [("set_game_mode", "walls", 0)], 5: [("place_food", 1, 1)]}
+    grids = play(env, 300, seed=11, interactions=interactions)
+    data = env.export_episode()
+
+    # 2 bits par action + quelques octets par interaction
+    assert len(data) < 40 + len(grids) // 4 + 1 + 11 * len(interactions)
+    log = EpisodeLog.from_bytes(data)
+    assert log.seed == 11 and len(log) == len(grids) - 1 and len(log.events) == 3
+
+    replayer = EpisodeReplayer(log, snapshot_every=8)
+    assert replayer.verify()
+    for t in [len(grids) - 1, 0, 9, 3, 17, len(grids) // 2]:
+        np.testing.assert_array_equal(replayer.frame(t)["grid"], grids[t])
+    assert all((f["grid"] == g).all() for f, g in zip(replayer.frames(), grids))
+    with pytest.raises(IndexError):
+        replayer.frame(len(grids))
+
+
+def test_out_of_grid_interactions_are_rejected_when_recorded():
+    log = EpisodeLog(seed=0, grid_size=8)
+    for kind, x, y in (("place_food", -1, 2), ("place_wall", 3, 8), ("set_game_mode", 2, 0)):
+        with pytest.raises(ValueError):
+            log.add_event(kind, x, y)
+    assert log.events == []
+
+    env = SnakeEnv(grid_size=8, record=True)
+    env.reset(seed=3)
+    env.queue_interaction("place_food", -1, 70000)  # Ignoré par l'env : rien à journaliser
+    env.step(0)
+    assert env.episode_log.events == [] and EpisodeLog.from_bytes(env.export_episode()).events == []
+
+
+def test_unseeded_recording_draws_an_explicit_seed(tmp_path):
+    env = SnakeEnv(grid_size=6, record=True)
+    grids = play(env, 50, seed=None)
+    path = tmp_path / "episode.snkr"
+    path.write_bytes(env.export_episode())
+
+    replayer = EpisodeReplayer(EpisodeLog.load(path))
+    assert replayer.verify()
+    np.testing.assert_array_equal(replayer.frame(len(grids) - 1)["grid"], grids[-1])
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from app.src.agent.evaluating.evaluate import evaluate_model
+
+GRID = 6
+
+
+# --- TESTS ---
+
+def test_evaluation_report_is_saved_to_metadata(model_store):
+    folder = model_store("uuid-eval", GRID)
+    report = evaluate_model("uuid-eval", n_episodes=20, n_workers=1, chunk_size=8, max_steps=50)
+
+    assert report["episodes"] == 20
+    assert 0 <= report["score"]["min"] <= report["score"]["median"] <= report["score"]["max"]
+    assert 1 <= report["length"]["max"] <= 50
+    assert sum(report["death_causes"].values()) == pytest.approx(1.0)
+    assert set(report["death_causes"]) <= {"border", "self", "wall", "board_full", "timeout"}
+    assert report["episodes_per_second"] > 0
+
+    metadata = json.loads((folder / "metadata.json").read_text())
+    assert metadata["evaluations"]["classic"]["episodes"] == 20
+
+
+def test_process_pool_matches_single_process(model_store):
+    model_store("uuid-eval", GRID)
+    single = evaluate_model("uuid-eval", n_episodes=16, n_workers=1, chunk_size=8, max_steps=50, save=False)
+    pooled = evaluate_model("uuid-eval", n_episodes=16, n_workers=2, chunk_size=8, max_steps=50, save=False)
+
+    # Mêmes seeds, mêmes lots : résultats identiques quel que soit le nombre de processus
+    assert pooled["n_workers"] == 2
+    for key in ("score", "length", "reward", "death_causes"):
+        assert pooled[key] == single[key]
@@ -0,0 +1,119 @@
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from stable_baselines3 import PPO
+
+from app.main import app
+from app.routers import api, serving
+from app.src.env.snake_env import SnakeEnv
+from app.src.serving.inference import PolicyRunner
+from app.src.serving.model_cache import LoadedModel
+from app.src.serving.sessions import GameSession, GameSessionManager
+
+
+# --- FIXTURE ---
+@pytest.fixture(scope="module")
+def runner():
+    return PolicyRunner(PPO("MlpPolicy", SnakeEnv(grid_size=8), verbose=0, seed=0).policy)
+
+
+def apply_frame(state, frame):
+    """Reproduit côté test ce que fait game.js avec une frame delta"""
+    if frame["head"]:
+        state["snake"].insert(0, frame["head"])
+    if frame["tail"]:
+        state["snake"].pop()
+    if "food" in frame:
+        state["food"] = frame["food"]
+    if "walls" in frame:
+        state["walls"] = frame["walls"]
+
+
+# --- TESTS ---
+
+def test_delta_frames_rebuild_server_state(runner):
+    session = GameSession("s", "m", runner, grid_size=8, game_mode="walls")
+    session.env.WALL_RANDOM_PROB = 0.3
+    rng = np.random.default_rng(0)
+
+    for _ in range(20):
+        state = session.reset()
+        while not session.dead:
+            if rng.random() < 0.1:
+                session.interact("place_food", int(rng.integers(8)), int(rng.integers(8)))
+            frame = session.step(int(rng.integers(4)), [0.25] * 4)
+            apply_frame(state, frame)
+            assert state["snake"] == [[c, r] for r, c in session.env.snake]
+            assert state["food"] == [session.env.food[1], session.env.food[0]]
+            assert state["walls"] == [[c, r] for r, c in session.env.walls]
+            assert frame["score"] == len(session.env.snake) - 1
+
+
+def test_idle_sessions_are_evicted(runner):
+    sessions = GameSessionManager(idle_timeout=60)
+    old = sessions.create("old", "m", runner, grid_size=8)
+    sessions.create("fresh", "m", runner, grid_size=8)
+    old.last_active = time.time() - 120
+
+    sessions.evict_idle()
+    assert sessions.get("old") is None
+    assert sessions.get("fresh") is not None
+
+
+def test_websocket_game_streams_frames(runner, monkeypatch):
+    api.manager.cache.put(LoadedModel("ws-model", 8, None, runner, 0))
+    monkeypatch.setattr(serving, "GAME_TICK_SECONDS", 0.001)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/api/ws/game") as websocket:
+            websocket.send_json({"type": "start", "uuid": "ws-model", "grid_size": 8, "session_id": "ws-1"})
+            snapshot = websocket.receive_json()
+            assert snapshot["type"] == "snapshot"
+            assert snapshot["snake"] == [[4, 4]]
+
+            websocket.send_json({"type": "place_food", "x": 0, "y": 0})
+            frame = websocket.receive_json()
+            assert frame["type"] == "frame"
+            assert len(frame["probs"]) == 4
+            assert 0 <= frame["action"] < 4
+
+    assert api.game_sessions.get("ws-1") is not None
+    api.game_sessions.remove("ws-1")
+
+
+def test_websocket_start_rejects_malformed_messages():
+    with TestClient(app) as client:
+        with client.websocket_connect("/api/ws/game") as websocket:
+            for message in ({"type": "start"}, {"type": "start", "uuid": "m", "grid_size": "huit"}):
+                websocket.send_json(message)
+                assert websocket.receive_json()["type"] == "error"
+            websocket.send_json({"type": "pause"})  # Connexion toujours ouverte
+            assert websocket.receive_json() == {"type": "error", "message": "Send 'start' first"}
+
+
+def test_websocket_game_survives_bad_messages_and_inference_errors(monkeypatch):
+    class BrokenRunner:
+        def predict_batch(self, observations):
+            raise RuntimeError("Worker d'inférence 0 arrêté")
+
+    api.manager.cache.put(LoadedModel("broken-game-model", 8, None, BrokenRunner(), 0))
+    monkeypatch.setattr(serving, "GAME_TICK_SECONDS", 0.001)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/api/ws/game") as websocket:
+            websocket.send_json({"type": "start", "uuid": "broken-game-model", "grid_size": 8,
+                                 "session_id": "ws-broken"})
+            assert websocket.receive_json()["type"] == "snapshot"
+            # Inférence en échec : erreur et partie mise en pause, sans fermer la connexion
+            assert websocket.receive_json() == {"type": "error", "message": "Inference error", "paused": True}
+
+            websocket.send_json({"type": "place_food", "x": "abc", "y": 1})
+            websocket.send_json([1, 2])
+            websocket.send_text("pas du json")
+            assert [websocket.receive_json()["type"] for _ in range(3)] == ["error"] * 3
+            websocket.send_json({"type": "reset"})
+            assert websocket.receive_json()["type"] == "snapshot"
+
+    api.game_sessions.remove("ws-broken")
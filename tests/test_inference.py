@@ -0,0 +1,62 @@
+import httpx
+import numpy as np
+import pytest
+import torch
+from stable_baselines3 import PPO
+
+from app.main import app
+from app.routers import api
+from app.src.env.snake_env import SnakeEnv
+from app.src.serving.inference import PolicyRunner
+from app.src.serving.model_cache import LoadedModel
+
+BASE_URL = "http://testserver"
+
+
+# --- FIXTURE ---
+@pytest.fixture(scope="module")
+def agent():
+    return PPO("MlpPolicy", SnakeEnv(grid_size=8), verbose=0, seed=1)
+
+
+# --- TESTS ---
+
+def test_runner_matches_sb3_predict(agent):
+    runner = PolicyRunner(agent.policy, initial_batch_size=2)
+    rng = np.random.default_rng(0)
+    grids = rng.integers(0, 4, size=(5, 8, 8)).astype(np.float32)
+
+    # Le batch (5) dépasse le tenseur préalloué (2) : il doit être agrandi
+    actions, probs = runner.predict_batch(grids)
+    for grid, action, p in zip(grids, actions, probs):
+        sb3_action, _ = agent.predict(grid, deterministic=True)
+        with torch.no_grad():
+            t_obs = agent.policy.obs_to_tensor(grid[np.newaxis])[0]
+            sb3_probs = agent.policy.get_distribution(t_obs).distribution.probs.numpy()[0]
+        assert action == int(sb3_action)
+        assert np.allclose(p, sb3_probs, atol=1e-6)
+
+
+def test_runner_rejects_wrong_shape(agent):
+    runner = PolicyRunner(agent.policy)
+    with pytest.raises(ValueError):
+        runner.predict(np.zeros((4, 4), dtype=np.float32))
+
+
+@pytest.mark.asyncio
+async def test_predict_payload_with_loaded_model(agent, monkeypatch):
+    api.manager.cache.put(LoadedModel("test-uuid", 8, agent, PolicyRunner(agent.policy), 0))
+    monkeypatch.setattr(api.manager, "current_uuid", "test-uuid")
+
+    grid = [[0] * 8 for _ in range(8)]
+    grid[4][4] = 1
+    grid[1][2] = 2
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=BASE_URL) as ac:
+        response = await ac.post("/api/predict", json={"grid": grid})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"action", "probabilities"}
+    assert isinstance(data["action"], int)
+    assert len(data["probabilities"]) == 4
+    assert data["action"] == int(np.argmax(data["probabilities"]))
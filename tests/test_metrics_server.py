@@ -0,0 +1,95 @@
+import asyncio
+import socket
+import urllib.request
+
+import numpy as np
+import pytest
+from prometheus_client import generate_latest
+
+from app.src.exporter import metrics_server
+from app.src.exporter.metrics_server import (AggregatedHistogram, EXPORTER_REGISTRY, INFERENCE_LATENCY,
+                                             SnakeCollector, start_metrics_server)
+from app.src.serving.batching import InferenceBatcher
+from app.src.serving.model_cache import ModelCache
+
+
+class FakeState:
+    def __init__(self, trainings):
+        self.active_trainings = trainings
+
+
+class FakeRunner:
+    def predict_batch(self, observations):
+        n = observations.shape[0]
+        return np.zeros(n, dtype=int), np.full((n, 4), 0.25)
+
+
+def sample_value(collector, name, labels=None):
+    for family in collector.collect():
+        for sample in family.samples:
+            if sample.name == name and (labels is None or all(sample.labels.get(k) == v for k, v in labels.items())):
+                return sample.value
+    return None
+
+
+# --- TESTS ---
+
+def test_aggregated_histogram_uses_le_buckets():
+    hist = AggregatedHistogram((0.1, 1.0))
+    hist.observe_many("m", [0.05, 0.1, 0.5, 2.0])
+
+    buckets, total = hist.snapshot()["m"]
+    assert buckets == [("0.1", 2.0), ("1.0", 3.0), ("+Inf", 4.0)]
+    assert total == pytest.approx(2.65)
+
+
+def test_collector_reads_training_state_and_cache():
+    collector = SnakeCollector()
+    collector.training_state = FakeState({
+        "run-a": {"status": "running", "progress": 0.5, "timesteps": 5000,
+                  "stats": {"env_steps_per_sec": 1200.0, "updates_per_sec": 3.0, "mean_reward": 0.7}},
+        "run-b": {"status": "queued", "progress": 0, "timesteps": 0, "stats": {"status": "queued"}},
+    })
+    cache = ModelCache(max_bytes=1000)
+    collector.model_cache = cache
+
+    run_a = {"run_id": "run-a"}
+    assert sample_value(collector, "snake_training_progress_ratio", run_a) == 0.5
+    assert sample_value(collector, "snake_training_env_steps_per_second", run_a) == 1200.0
+    assert sample_value(collector, "snake_training_updates_per_second", run_a) == 3.0
+    assert sample_value(collector, "snake_training_mean_reward", run_a) == 0.7
+    assert sample_value(collector, "snake_training_progress_ratio", {"run_id": "run-b"}) is None
+    assert sample_value(collector, "snake_training_runs", {"status": "queued"}) == 1
+    assert sample_value(collector, "snake_model_cache_capacity_bytes") == 1000
+    assert sample_value(collector, "snake_model_cache_occupancy_ratio") == 0.0
+    assert sample_value(collector, "snake_process_rss_bytes", {"role": "api"}) > 0
+
+
+@pytest.mark.asyncio
+async def test_batcher_records_latency_per_model():
+    INFERENCE_LATENCY.clear()
+    batcher = InferenceBatcher(max_batch_size=2, max_wait_ms=50)
+    runner = FakeRunner()
+    obs = np.zeros((4, 4), dtype=np.float32)
+
+    await asyncio.gather(batcher.predict("model-x", runner, obs), batcher.predict("model-x", runner, obs))
+
+    buckets, total = INFERENCE_LATENCY.snapshot()["model-x"]
+    assert buckets[-1] == ("+Inf", 2.0)
+    assert total > 0
+
+
+def test_exporter_serves_its_own_registry(monkeypatch):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    monkeypatch.setattr(metrics_server, "_server_started", False)
+
+    assert start_metrics_server(port, addr="127.0.0.1")
+    assert not start_metrics_server(port, addr="127.0.0.1")  # Déjà démarré
+    body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+
+    assert "snake_process_rss_bytes" in body
+    assert "snake_inference_latency_seconds" in body
+    # Registre séparé : les métriques HTTP de l'API n'y sont pas
+    assert "http_requests_total" not in generate_latest(EXPORTER_REGISTRY).decode()
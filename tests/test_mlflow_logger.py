@@ -0,0 +1,63 @@
+import threading
+import time
+
+from app.src.agent.utils.mlflow_logger import AsyncMetricLogger
+
+
+class FakeClient:
+    """Client MLflow lent, qui peut échouer sur les premiers appels"""
+
+    def __init__(self, latency=0.0, failures=0):
+        self.latency = latency
+        self.failures = failures
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def log_batch(self, run_id, metrics):
+        time.sleep(self.latency)
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("tracking server down")
+            self.batches.append(list(metrics))
+
+
+# --- TESTS ---
+
+def test_log_metrics_does_not_wait_for_the_server():
+    client = FakeClient(latency=0.5)
+    logger = AsyncMetricLogger("run", client=client, flush_interval=0.05)
+
+    start = time.perf_counter()
+    for step in range(100):
+        logger.log_metrics({"rollout/ep_rew_mean": step, "train/loss": -step}, step=step)
+    assert time.perf_counter() - start < 0.1
+
+    logger.close()
+    metrics = [m for batch in client.batches for m in batch]
+    assert len(metrics) == 200
+    assert metrics[-1].key == "train/loss" and metrics[-1].step == 99
+
+
+def test_batches_are_capped_by_size():
+    client = FakeClient()
+    logger = AsyncMetricLogger("run", client=client, max_batch=10, flush_interval=60)
+
+    logger.log_metrics({f"m{i}": i for i in range(25)}, step=1)
+    assert logger.flush(timeout=5)
+    assert [len(batch) for batch in client.batches] == [10, 10, 5]
+    logger.close()
+
+
+def test_failed_batches_are_retried_then_dropped():
+    client = FakeClient(failures=2)
+    logger = AsyncMetricLogger("run", client=client, flush_interval=0.01, backoff=0.01, max_retries=3)
+    logger.log_metrics({"a": 1.0}, step=1)
+    logger.close()
+    assert len(client.batches) == 1 and logger.sent == 1 and logger.dropped == 0
+
+    client = FakeClient(failures=10)
+    logger = AsyncMetricLogger("run", client=client, flush_interval=0.01, backoff=0.01, max_retries=2)
+    logger.log_metrics({"a": 1.0, "b": 2.0}, step=1)
+    logger.close()
+    assert client.batches == [] and logger.dropped == 2
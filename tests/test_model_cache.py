@@ -0,0 +1,78 @@
+import httpx
+import pytest
+from stable_baselines3 import PPO
+
+from app.main import app
+from app.routers import api
+from app.src.env.snake_env import SnakeEnv
+from app.src.serving.inference import PolicyRunner
+from app.src.serving.model_cache import (
+    ModelCache, LoadedModel, estimate_model_bytes, CACHE_EVICTIONS_COUNTER, CACHE_HITS_COUNTER
+)
+
+BASE_URL = "http://testserver"
+
+
+def fake_entry(uuid, nbytes):
+    return LoadedModel(uuid, 10, agent=None, runner=None, nbytes=nbytes)
+
+
+# --- TESTS ---
+
+def test_lru_eviction_respects_budget():
+    cache = ModelCache(max_bytes=100)
+    evictions = CACHE_EVICTIONS_COUNTER._value.get()
+
+    cache.put(fake_entry("a", 40))
+    cache.put(fake_entry("b", 40))
+    assert cache.get("a") is not None  # "a" devient le plus récent
+    cache.put(fake_entry("c", 40))
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.total_bytes == 80
+    assert CACHE_EVICTIONS_COUNTER._value.get() - evictions == 1
+
+
+def test_oversized_model_stays_servable():
+    cache = ModelCache(max_bytes=10)
+    cache.put(fake_entry("a", 5))
+    cache.put(fake_entry("big", 50))
+    assert len(cache) == 1
+    assert cache.get("big") is not None
+
+
+def test_estimate_model_bytes_counts_weights():
+    agent = PPO("MlpPolicy", SnakeEnv(grid_size=6), verbose=0)
+    n_params = sum(p.numel() for p in agent.policy.parameters())
+    assert estimate_model_bytes(agent) >= n_params * 4
+
+
+@pytest.mark.asyncio
+async def test_predict_routes_each_session_to_its_model(monkeypatch):
+    agents = {size: PPO("MlpPolicy", SnakeEnv(grid_size=size), verbose=0) for size in (6, 8)}
+
+    def fake_ensure_loaded(uuid, grid_size):
+        entry = api.manager.cache.get(uuid)
+        if entry is None:
+            agent = agents[grid_size]
+            entry = api.manager.cache.put(LoadedModel(uuid, grid_size, agent, PolicyRunner(agent.policy), 0))
+        return entry
+
+    monkeypatch.setattr(api.manager, "ensure_loaded", fake_ensure_loaded)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=BASE_URL) as ac:
+        for session, uuid, size in (("s1", "model-6", 6), ("s2", "model-8", 8)):
+            res = await ac.post("/api/load", json={"uuid": uuid, "grid_size": size, "session_id": session})
+            assert res.status_code == 200
+
+        hits = CACHE_HITS_COUNTER._value.get()
+        for session, size in (("s1", 6), ("s2", 8)):
+            grid = [[0] * size for _ in range(size)]
+            res = await ac.post("/api/predict", json={"grid": grid, "session_id": session})
+            assert res.status_code == 200
+            assert len(res.json()["probabilities"]) == 4
+        assert CACHE_HITS_COUNTER._value.get() - hits == 2
+
+    assert api.manager.sessions["s1"] == "model-6"
+    assert api.manager.sessions["s2"] == "model-8"
@@ -0,0 +1,92 @@
+import httpx
+import numpy as np
+import pytest
+from stable_baselines3 import PPO
+
+from app.src.env.observations import (N_FEATURES, WALL, egocentric_batch, observation_from_grid, spec_from_space)
+from app.src.env.snake_env import SnakeEnv
+from app.src.env.snake_vec_env import SnakeVecEnv
+
+RADIUS = 2
+SIDE = 2 * RADIUS + 1
+
+
+# --- TESTS ---
+
+@pytest.mark.parametrize("grid_size", [8, 40])
+def test_egocentric_size_does_not_depend_on_the_grid(grid_size):
+    env = SnakeEnv(grid_size=grid_size, obs_mode="egocentric", view_radius=RADIUS)
+    obs, _ = env.reset(seed=0)
+    assert env.observation_space.shape == (SIDE * SIDE + N_FEATURES,)
+    assert obs.shape == env.observation_space.shape and obs.dtype == np.float32
+    assert env.observation_space.contains(obs)
+
+    window = obs[:SIDE * SIDE].reshape(SIDE, SIDE)
+    assert window[RADIUS, RADIUS] == 1  # La tête est au centre
+    food_dr, food_dc, length = obs[SIDE * SIDE:SIDE * SIDE + 3]
+    head = env.snake[0]
+    assert food_dr == pytest.approx((env.food[0] - head[0]) / grid_size)
+    assert food_dc == pytest.approx((env.food[1] - head[1]) / grid_size)
+    assert length == pytest.approx(1 / grid_size ** 2)
+
+
+def test_cells_outside_the_board_are_walls():
+    grids = np.zeros((1, 6, 6), dtype=np.int8)
+    obs = egocentric_batch(grids, np.array([[0, 5]]), np.array([[3, 3]]), np.array([1]), np.zeros(1), np.zeros(1),
+                           RADIUS)
+    window = obs[0, :SIDE * SIDE].reshape(SIDE, SIDE)
+    assert (window[:RADIUS] == WALL).all()  # Au-dessus de la première ligne
+    assert (window[:, RADIUS + 1:] == WALL).all()  # À droite de la dernière colonne
+    assert (window[RADIUS:, :RADIUS + 1] == 0).all()
+
+
+def test_vec_env_matches_single_env_observations():
+    vec_env = SnakeVecEnv(n_envs=3, grid_size=7, seed=0, obs_mode="egocentric", view_radius=RADIUS)
+    obs = vec_env.reset()
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        obs, _, dones, infos = vec_env.step(rng.integers(0, 4, size=3))
+        for i in range(3):
+            if dones[i]:
+                continue
+            head = vec_env.body[i, vec_env.head_ptr[i]]
+            # Même observation que celle reconstruite depuis la grille (chemin du serving)
+            expected = observation_from_grid(vec_env.grids[i], {"mode": "egocentric", "radius": RADIUS},
+                                             head=tuple(head), wall_cooldown=vec_env.wall_cooldown[i])
+            np.testing.assert_allclose(obs[i], expected)
+    assert obs.shape == (3, SIDE * SIDE + N_FEATURES)
+
+
+def test_spec_is_recovered_from_the_model_space():
+    assert spec_from_space(SnakeEnv(grid_size=6).observation_space) == {"mode": "grid"}
+    env = SnakeEnv(grid_size=6, obs_mode="egocentric", view_radius=3)
+    assert spec_from_space(env.observation_space) == {"mode": "egocentric", "radius": 3}
+
+
+@pytest.mark.asyncio
+async def test_predict_builds_the_egocentric_observation():
+    from app.main import app
+    from app.routers import api
+    from app.src.serving.inference import PolicyRunner
+    from app.src.serving.model_cache import LoadedModel
+
+    agent = PPO("MlpPolicy", SnakeEnv(grid_size=6, obs_mode="egocentric", view_radius=RADIUS), verbose=0)
+    api.manager.cache.put(LoadedModel("ego-model", 6, agent, PolicyRunner(agent.policy), 0,
+                                      {"mode": "egocentric", "radius": RADIUS}))
+    grid = [[0] * 12 for _ in range(12)]  # Grille plus grande que celle d'entraînement : même modèle
+    grid[5][5], grid[2][7] = 1, 2
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as ac:
+        ok = await ac.post("/api/predict", json={"grid": grid, "uuid": "ego-model", "head": [5, 5]})
+        missing_head = await ac.post("/api/predict", json={"grid": grid, "uuid": "ego-model"})
+
+    assert ok.status_code == 200 and 0 <= ok.json()["action"] < 4
+    assert missing_head.status_code == 400
+
+
+def test_ppo_trains_on_egocentric_batched_env():
+    from app.src.agent.training.train import make_training_env
+    env = make_training_env("batched", 20, "classic", 4, {"mode": "egocentric", "radius": RADIUS})
+    agent = PPO("MlpPolicy", env, n_steps=32, batch_size=64, n_epochs=1, verbose=0)
+    agent.learn(total_timesteps=256)
+    assert agent.observation_space.shape == (SIDE * SIDE + N_FEATURES,)
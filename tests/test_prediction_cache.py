@@ -0,0 +1,96 @@
+import httpx
+import numpy as np
+import pytest
+
+from app.main import app
+from app.routers import api, serving
+from app.src.serving.model_cache import LoadedModel
+from app.src.serving.prediction_cache import TRANSFORMS, PredictionCache, transform_grid, transform_point
+
+BASE_URL = "http://testserver"
+
+
+class TowardFoodRunner:
+    """Policy équivariante : va vers la pomme selon l'axe le plus éloigné ; compte ses forwards"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_batch(self, observations):
+        self.calls += 1
+        actions, probs = [], []
+        for grid in observations:
+            head = np.argwhere(grid == 1)[0]
+            food = np.argwhere(grid == 2)[0]
+            dr, dc = food - head
+            action = (0 if dr < 0 else 1) if abs(dr) > abs(dc) else (2 if dc < 0 else 3)
+            p = np.full(4, 0.1)
+            p[action] = 0.7
+            actions.append(action)
+            probs.append(p)
+        return np.array(actions), np.array(probs)
+
+
+def board():
+    grid = np.zeros((7, 7), dtype=np.int64)
+    grid[5, 4], grid[1, 2] = 1, 2  # Tête, pomme en haut à gauche (|Δligne| ≠ |Δcolonne|)
+    return grid
+
+
+# --- TESTS ---
+
+def test_symmetric_grids_share_one_canonical_key():
+    cache = PredictionCache(max_bytes=1 << 20, symmetries=True)
+    keys = {cache.key("m", transform_grid(board(), t))[0] for t in TRANSFORMS}
+    assert len(keys) == 1
+
+    plain = PredictionCache(max_bytes=1 << 20)
+    assert len({plain.key("m", transform_grid(board(), t))[0] for t in TRANSFORMS}) == 8
+    assert plain.key("m", np.full((3, 3), 7))[0] is None  # Codes hors 0..3 : pas de cache
+
+
+def test_cached_answer_is_mapped_back_to_each_orientation():
+    cache = PredictionCache(max_bytes=1 << 20, symmetries=True)
+    runner = TowardFoodRunner()
+    for t in TRANSFORMS:
+        grid = transform_grid(board(), t)
+        key, transform = cache.key("m", grid, head=transform_point((5, 4), 7, t))
+        cached = cache.get(key, transform)
+        actions, probs = runner.predict_batch(grid[None])
+        if cached is None:
+            cache.put(key, transform, int(actions[0]), probs[0])
+        else:
+            assert cached[0] == actions[0]
+            np.testing.assert_allclose(cached[1], probs[0])
+    assert cache.stats()["hits"] == 7 and len(cache) == 1
+
+
+def test_lru_budget_and_stats():
+    cache = PredictionCache(max_bytes=1000)
+    for i in range(20):
+        grid = np.zeros((6, 6), dtype=np.int64)
+        grid.flat[i] = 1
+        key, t = cache.key("m", grid)
+        assert cache.get(key, t) is None
+        cache.put(key, t, 0, [1.0, 0.0, 0.0, 0.0])
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000 and stats["evictions"] == 20 - stats["entries"] > 0
+    assert stats["misses"] == 20 and stats["hit_ratio"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_predict_serves_repeated_positions_from_cache(monkeypatch):
+    runner = TowardFoodRunner()
+    api.manager.cache.put(LoadedModel("cached-model", 7, None, runner, 0))
+    monkeypatch.setattr(serving, "prediction_cache", PredictionCache(max_bytes=1 << 20, symmetries=True))
+
+    grids = [transform_grid(board(), t).tolist() for t in TRANSFORMS]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=BASE_URL) as ac:
+        answers = [(await ac.post("/api/predict", json={"grid": g, "uuid": "cached-model"})).json() for g in grids]
+        stats = (await ac.get("/api/predict/cache")).json()
+
+    assert runner.calls == 1
+    assert stats["hits"] == 7 and stats["entries"] == 1
+    for grid, answer in zip(grids, answers):
+        assert answer["action"] == int(TowardFoodRunner().predict_batch(np.array(grid)[None])[0][0])
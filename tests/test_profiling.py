@@ -0,0 +1,60 @@
+import time
+
+from stable_baselines3 import PPO
+
+from app.src.agent.utils.profiling import PhaseProfilingCallback, PhaseTimer, SamplingProfiler
+from app.src.env.snake_vec_env import SnakeVecEnv
+
+
+# --- TESTS ---
+
+def test_phase_timer_accumulates_and_can_be_disabled():
+    timer = PhaseTimer()
+    for _ in range(2):
+        with timer.phase("upload"):
+            time.sleep(0.01)
+    assert timer.counts["upload"] == 2
+    assert timer.summary()["upload"] >= 0.02
+    assert set(timer.as_metrics()) == {"perf/upload_seconds"}
+
+    disabled = PhaseTimer(enabled=False)
+    with disabled.phase("upload"):
+        pass
+    assert disabled.summary() == {}
+
+
+def test_callback_splits_rollout_and_train():
+    timer = PhaseTimer()
+    logged = []
+    callback = PhaseProfilingCallback(timer, log_fn=lambda metrics, step: logged.append((step, metrics)))
+
+    agent = PPO("MlpPolicy", SnakeVecEnv(n_envs=4, grid_size=6, seed=0), n_steps=32, batch_size=64,
+                n_epochs=1, verbose=0, seed=0)
+    agent.learn(total_timesteps=256, callback=callback)
+
+    # 256 / (4 * 32) = 2 itérations : 2 collectes et 2 mises à jour
+    summary = timer.summary()
+    assert timer.counts["rollout"] == 2
+    assert timer.counts["train"] == 2
+    assert summary["rollout"] > 0 and summary["train"] > 0
+    assert callback.env_steps_per_sec > 0
+    assert [step for step, m in logged if "perf/env_steps_per_sec" in m] == [128, 256]
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+def test_sampling_profiler_dumps_folded_stacks(tmp_path):
+    profiler = SamplingProfiler(interval=0.001).start()
+    busy_loop(0.2)
+    profiler.stop()
+
+    path = profiler.dump(tmp_path / "run.folded")
+    lines = path.read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("busy_loop" in line for line in lines)
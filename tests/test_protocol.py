@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from stable_baselines3 import PPO
+
+from app.main import app
+from app.routers import serving
+from app.src.env.snake_env import SnakeEnv
+from app.src.serving import protocol
+from app.src.serving.inference import PolicyRunner
+from app.src.serving.model_cache import LoadedModel
+from app.src.serving.prediction_cache import PredictionCache, pack_grids
+
+
+def board(g, seed=0):
+    return np.random.default_rng(seed).integers(0, 4, size=(g, g)).astype(np.uint8)
+
+
+# --- TESTS ---
+
+def test_frames_roundtrip_packed_and_raw():
+    for g in (5, 7, 8):
+        grid = board(g, seed=g)
+        np.testing.assert_array_equal(protocol.unpack_grids(pack_grids(grid[None]), g)[0], grid)
+
+    data = (protocol.encode_request(7, 1, board(7), head=(3, 2), wall_timer=4, wall_cooldown=9)
+            + protocol.encode_request(8, 0, board(5, seed=1), packed=False))
+    assert len(data) == 2 * protocol.REQUEST.size + 13 + 25  # 49 cases sur 2 bits, 25 sur un octet
+    (seq, model_id, grid, head, timer, cooldown), second = protocol.decode_requests(data)
+    assert (seq, model_id, head, timer, cooldown) == (7, 1, (3, 2), 4, 9)
+    np.testing.assert_array_equal(grid, board(7))
+    assert second[0] == 8 and second[3] is None
+    np.testing.assert_array_equal(second[2], board(5, seed=1))
+
+    with pytest.raises(protocol.FrameError):
+        protocol.decode_requests(data[:-1])
+    reply = protocol.encode_reply(3, protocol.STATUS_OK, 2, (0.1, 0.2, 0.3, 0.4))
+    assert protocol.decode_replies(reply * 2)[1][:3] == (3, protocol.STATUS_OK, 2)
+
+
+def test_binary_channel_matches_json_predict(monkeypatch):
+    agent = PPO("MlpPolicy", SnakeEnv(grid_size=8), verbose=0, seed=0)
+    serving.manager.cache.put(LoadedModel("binary-model", 8, agent, PolicyRunner(agent.policy), 0))
+    monkeypatch.setattr(serving, "prediction_cache", PredictionCache(max_bytes=0))
+    grids = []
+    for seed in range(3):
+        grid = np.zeros((8, 8), dtype=np.uint8)
+        grid[4, seed + 1], grid[seed, 6] = 1, 2
+        grids.append(grid)
+
+    with TestClient(app) as client:
+        expected = [client.post("/api/predict", json={"grid": g.tolist(), "uuid": "binary-model"}).json()
+                    for g in grids]
+        with client.websocket_connect("/api/ws/predict") as websocket:
+            websocket.send_json({"type": "bind", "uuid": "binary-model", "grid_size": 8})
+            bound = websocket.receive_json()
+            assert bound["type"] == "bound"
+
+            # Trois parties dans un message, plus un model_id inconnu
+            websocket.send_bytes(b"".join(protocol.encode_request(seq, bound["model_id"], g)
+                                          for seq, g in enumerate(grids)) + protocol.encode_request(9, 42, grids[0]))
+            replies = protocol.decode_replies(websocket.receive_bytes())
+
+            websocket.send_bytes(b"\x00" * 3)
+            assert websocket.receive_json()["type"] == "error"
+
+    assert [r[0] for r in replies] == [0, 1, 2, 9]
+    assert replies[3][1] == protocol.STATUS_UNKNOWN_MODEL
+    for (seq, status, action, probs), answer in zip(replies, expected):
+        assert status == protocol.STATUS_OK and action == answer["action"]
+        np.testing.assert_allclose(probs, answer["probabilities"], atol=1e-3)
+
+
+def test_binary_channel_reports_server_errors(monkeypatch):
+    class BrokenRunner:
+        def predict_batch(self, observations):
+            raise RuntimeError("Worker d'inférence 0 arrêté")
+
+    serving.manager.cache.put(LoadedModel("broken-model", 8, None, BrokenRunner(), 0))
+    monkeypatch.setattr(serving, "prediction_cache", PredictionCache(max_bytes=0))
+    with TestClient(app) as client:
+        with client.websocket_connect("/api/ws/predict") as websocket:
+            websocket.send_json({"type": "bind", "uuid": "broken-model", "grid_size": 8})
+            model_id = websocket.receive_json()["model_id"]
+            websocket.send_bytes(protocol.encode_request(5, model_id, board(8)))
+            (seq, status, _, _), = protocol.decode_replies(websocket.receive_bytes())
+    assert (seq, status) == (5, protocol.STATUS_SERVER_ERROR)
+
+
+def test_text_frames_are_validated_and_bindings_capped(monkeypatch):
+    agent = PPO("MlpPolicy", SnakeEnv(grid_size=8), verbose=0, seed=0)
+    for uuid in ("bind-a", "bind-b"):
+        serving.manager.cache.put(LoadedModel(uuid, 8, agent, PolicyRunner(agent.policy), 0))
+    monkeypatch.setattr(serving, "PREDICT_MAX_BINDINGS", 1)
+    with TestClient(app) as client:
+        with client.websocket_connect("/api/ws/predict") as websocket:
+            websocket.send_json([1])  # JSON valide mais pas un objet
+            assert websocket.receive_json()["type"] == "error"
+            for uuid, expected in (("bind-a", "bound"), ("bind-a", "bound"), ("bind-b", "error")):
+                websocket.send_json({"type": "bind", "uuid": uuid, "grid_size": 8})
+                assert websocket.receive_json()["type"] == expected
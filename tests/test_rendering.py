@@ -0,0 +1,97 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from stable_baselines3 import PPO
+
+from app.src.env.rendering import (PALETTE, FrameArchiveWriter, GifWriter, read_frame_archive, render_batch,
+                                   render_grid, render_indexed, to_rgb)
+from app.src.env.snake_env import SnakeEnv
+from app.src.env.snake_vec_env import SnakeVecEnv
+
+
+def random_frames(n, seed=0):
+    """Frames d'index de palette qui changent peu d'une frame à l'autre (cas d'une partie)"""
+    grids = np.zeros((n, 10, 10), dtype=np.int8)
+    rng = np.random.default_rng(seed)
+    for t in range(n):
+        grids[t, rng.integers(10), rng.integers(10)] = rng.integers(1, 4)
+    return render_indexed(grids, cell_size=6)
+
+
+# --- TESTS ---
+
+def test_rgb_array_uses_the_pygame_layout_without_pygame():
+    env = SnakeEnv(grid_size=7, render_mode="rgb_array", game_mode="walls")
+    env.reset(seed=0)
+    env.queue_interaction("place_wall", 0, 0)
+    env.step(0)
+    assert env.walls == [(0, 0)]
+    frame = env.render()
+    cs = env.cell_size
+
+    assert frame.shape == (env.window_size, env.window_size, 3) and frame.dtype == np.uint8
+    (hr, hc), (fr, fc) = env.snake[0], env.food
+    assert tuple(frame[hr * cs + 1, hc * cs + 1]) == (46, 204, 113)
+    assert tuple(frame[fr * cs + 1, fc * cs + 1]) == (231, 76, 60)
+    assert tuple(frame[1, 1]) == (52, 152, 219) and tuple(frame[cs // 2, cs // 2]) == (41, 128, 185)
+    assert (frame[7 * cs:] == PALETTE[0]).all()  # Marge de la fenêtre (500 n'est pas multiple de 7)
+
+    code = ("import sys; from app.src.env.snake_env import SnakeEnv; e = SnakeEnv(render_mode='rgb_array'); "
+            "e.reset(seed=0); e.render(); assert 'pygame' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_batch_matches_single_grid_renders():
+    vec_env = SnakeVecEnv(n_envs=4, grid_size=9, seed=0, game_mode="walls")
+    vec_env.reset()
+    for _ in range(20):
+        vec_env.step(np.random.default_rng(0).integers(0, 4, size=4))
+    heads = vec_env.body[np.arange(4), vec_env.head_ptr]
+
+    batch = render_batch(vec_env.grids, heads, cell_size=5)
+    for i in range(4):
+        np.testing.assert_array_equal(batch[i], render_grid(vec_env.grids[i], heads[i], cell_size=5))
+    np.testing.assert_array_equal(to_rgb(render_indexed(vec_env.grids, heads, cell_size=5)), batch)
+    assert vec_env.render().shape[2] == 3 and len(vec_env.get_images()) == 4
+
+
+def test_gif_is_readable_frame_by_frame(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    from PIL import ImageSequence
+    frames = random_frames(12)
+    frames[5] = frames[4]  # Frame identique : fusionnée avec la précédente (durée doublée)
+
+    with GifWriter(tmp_path / "episode.gif", fps=10) as writer:
+        writer.write(frames)
+    assert writer.n_frames == 12
+
+    decoded = [np.array(f.convert("RGB")) for f in ImageSequence.Iterator(Image.open(tmp_path / "episode.gif"))]
+    expected = [frame for t, frame in enumerate(frames) if t != 5]
+    assert len(decoded) == len(expected)
+    for image, frame in zip(decoded, expected):
+        np.testing.assert_array_equal(image, to_rgb(frame))
+
+
+def test_frame_archive_roundtrip(tmp_path):
+    frames = random_frames(8)
+    with FrameArchiveWriter(tmp_path / "episode.snkf") as writer:
+        for frame in frames:
+            writer.write(frame)
+        with pytest.raises(ValueError):
+            writer.write(frames[0, :10])
+    np.testing.assert_array_equal(np.stack(list(read_frame_archive(tmp_path / "episode.snkf"))), frames)
+
+
+def test_evaluation_episodes_are_recorded(tmp_path):
+    from app.src.agent.evaluating.evaluate import play_episodes
+    from app.src.serving.inference import PolicyRunner
+
+    agent = PPO("MlpPolicy", SnakeEnv(grid_size=6), verbose=0, seed=0)
+    results = play_episodes(PolicyRunner(agent.policy), 6, [0, 1, 2], max_steps=30, record_dir=tmp_path,
+                            record_format="snkf", cell_size=4)
+
+    for r in results:
+        frames = list(read_frame_archive(tmp_path / f"episode_{r['seed']}.snkf"))
+        assert len(frames) == r["length"] + 1 and frames[0].shape == (24, 24)
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from app.src.serving.model_cache import LoadedModel, ModelCache
+
+BASE_URL = "http://testserver"
+GRID = 6
+
+
+# --- TESTS ---
+
+def test_serving_app_does_not_import_training_stack():
+    env = {k: v for k, v in os.environ.items() if k != "HF_HUB_TOKEN"}  # Ne doit plus être requis à l'import
+    code = ("import sys; import app.src.serving.main; "
+            "print([m for m in ('mlflow', 'stable_baselines3', 'torch', 'app.src.agent.training.train') "
+            "if m in sys.modules])")
+    result = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+@pytest.mark.asyncio
+async def test_ready_after_pinned_models_are_loaded_and_warmed(model_store, monkeypatch):
+    from app.routers.serving import ModelManager
+    from app.src.serving import main
+
+    model_store("uuid-pinned", GRID)
+    state = main.StartupState(["uuid-pinned", "uuid-missing"], budget_seconds=600)
+    manager = ModelManager(cache_mb=0)  # Budget nul : seul l'épinglage garde le modèle
+    monkeypatch.setattr(main, "startup", state)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url=BASE_URL) as ac:
+        assert (await ac.get("/health")).status_code == 200
+        assert (await ac.get("/ready")).status_code == 503
+
+        main.preload(state, manager)
+        response = await ac.get("/ready")
+
+    report = response.json()
+    assert response.status_code == 200 and report["within_budget"] and report["failed"] == ["uuid-missing"]
+    assert set(report["phases"]) == {"imports", "preload", "warmup"} and "uuid-pinned" in report["phases"]["warmup"]
+    assert manager.current_uuid == "uuid-pinned" and manager.cache.pinned == {"uuid-pinned"}
+
+    manager.cache.put(LoadedModel("other", GRID, None, None, 10))
+    assert "uuid-pinned" in manager.cache
+
+
+def test_preload_failure_is_reported_instead_of_blocking_readiness(monkeypatch):
+    from app.routers.serving import ModelManager
+    from app.src.serving import main
+
+    def unreachable_catalog():
+        raise ConnectionError("hub injoignable")
+
+    monkeypatch.setattr(main, "get_catalog", unreachable_catalog)
+    state = main.StartupState(["uuid-a", "uuid-b"], budget_seconds=600)
+    main.preload(state, ModelManager(cache_mb=0))
+
+    report = state.report()
+    assert report["ready"] and report["failed"] == ["uuid-a", "uuid-b"]
+    assert report["error"] == "hub injoignable"
+
+
+def test_pinned_models_are_never_evicted():
+    cache = ModelCache(max_bytes=100)
+    cache.put(LoadedModel("pinned", GRID, None, None, 60))
+    cache.pin("pinned")
+    cache.put(LoadedModel("a", GRID, None, None, 30))
+    cache.put(LoadedModel("b", GRID, None, None, 30))
+
+    assert "pinned" in cache and "a" not in cache and "b" in cache
+    assert cache.total_bytes == 90
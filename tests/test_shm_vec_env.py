@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from stable_baselines3.common.monitor import Monitor
+
+from app.src.env.shm_vec_env import ShmSubprocVecEnv
+from app.src.env.snake_env import SnakeEnv
+
+
+def make_env():
+    return Monitor(SnakeEnv(grid_size=10))
+
+
+# --- FIXTURE ---
+@pytest.fixture(scope="module")
+def vec_env():
+    env = ShmSubprocVecEnv([make_env] * 6, n_workers=3)
+    yield env
+    env.close()
+
+
+# --- TESTS ---
+
+def test_reset_writes_observations_to_shared_memory(vec_env):
+    obs = vec_env.reset()
+    assert obs.shape == (6, 10, 10)
+    assert obs.dtype == np.int8
+    # Un serpent au centre et une pomme par partie, dans chaque tranche de worker
+    assert (obs[:, 5, 5] == 1).all()
+    assert ((obs == 2).sum(axis=(1, 2)) == 1).all()
+
+
+def test_step_autoresets_with_monitor_infos(vec_env):
+    vec_env.reset()
+    # Tout droit vers le haut depuis (5, 5) : mort au 6e pas
+    for _ in range(5):
+        obs, rewards, dones, infos = vec_env.step(np.zeros(6, dtype=np.int64))
+        assert not dones.any()
+
+    obs, rewards, dones, infos = vec_env.step(np.zeros(6, dtype=np.int64))
+    assert dones.all()
+    assert np.allclose(rewards, -1.0)
+    for info in infos:
+        assert info["episode"]["l"] == 6
+        assert info["TimeLimit.truncated"] is False
+        assert info["terminal_observation"].shape == (10, 10)
+    # Auto-reset : la nouvelle observation repart du centre
+    assert (obs[:, 5, 5] == 1).all()
+
+
+def test_attribute_and_method_calls_are_routed_per_worker(vec_env):
+    vec_env.reset()
+    assert vec_env.get_attr("grid_size") == [10] * 6
+
+    vec_env.env_method("set_game_mode", "walls", indices=[1, 4])
+    assert vec_env.get_attr("game_mode") == ["classic", "walls", "classic", "classic", "walls", "classic"]
+    assert vec_env.env_is_wrapped(Monitor, indices=[5]) == [True]
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from app.src.env.snake_env import SnakeEnv
+
+
+def rebuild_grid(env):
+    """Reconstruit la grille depuis snake / food / walls (ancienne implémentation de _get_obs)"""
+    grid = np.zeros((env.grid_size, env.grid_size), dtype=np.int8)
+    for r, c in env.snake:
+        grid[r, c] = 1
+    if env.food:
+        grid[env.food[0], env.food[1]] = 2
+    for r, c in env.walls:
+        grid[r, c] = 3
+    return grid
+
+
+# --- TESTS ---
+
+@pytest.mark.parametrize("game_mode", ["classic", "walls"])
+def test_incremental_state_matches_rebuilt_grid(game_mode):
+    env = SnakeEnv(grid_size=6, game_mode=game_mode, max_steps=200)
+    env.WALL_RANDOM_PROB = 0.5
+    rng = np.random.default_rng(0)
+
+    for _ in range(50):
+        obs, _ = env.reset()
+        done = False
+        while not done:
+            obs, reward, terminated, truncated, _ = env.step(int(rng.integers(4)))
+            done = terminated or truncated
+
+            assert obs.dtype == np.int8 and obs.shape == (6, 6)
+            assert (obs == rebuild_grid(env)).all()
+            assert env._body_set == set(env.snake)
+            free = sorted(env._free[:env._n_free])
+            assert free == np.flatnonzero(obs.ravel() == 0).tolist()
+
+
+def test_observation_is_a_copy():
+    env = SnakeEnv(grid_size=10)
+    obs, _ = env.reset()
+    obs[:] = 3
+    assert env.get_state()["grid"][0][0] == 0
+
+
+def test_queued_food_and_wall_interactions():
+    env = SnakeEnv(grid_size=10, game_mode="walls")
+    env.reset()
+    env.WALL_RANDOM_PROB = 0.0
+
+    # Mur demandé sur une case vide : posé au step suivant
+    env.queue_interaction("place_wall", x=0, y=0)
+    obs, *_ = env.step(3)
+    assert env.walls == [(0, 0)]
+    assert obs[0, 0] == 3
+
+    # Pomme demandée sur le mur : refusée, placée ailleurs sur une case vide
+    env._set_cell(env.food, 0)
+    env.pending_food_position = (0, 0)
+    assert env._place_food()
+    assert env.food != (0, 0)
+    assert env.pending_food_position == (0, 0)
+
+
+def test_set_game_mode_classic_clears_walls():
+    env = SnakeEnv(grid_size=10, game_mode="walls")
+    env.reset()
+    env.WALL_RANDOM_PROB = 1.0
+    obs, *_ = env.step(3)
+    assert (obs == 3).sum() == 1
+
+    env.set_game_mode("classic")
+    assert env.walls == []
+    assert (env._get_obs() == 3).sum() == 0
+
+
+def test_death_cause_reported_on_termination():
+    env = SnakeEnv(grid_size=6)
+    env.reset()
+    env.food = None  # Pas de pomme sur le trajet
+    for _ in range(3):
+        _, _, terminated, _, info = env.step(0)
+        assert not terminated and info == {}
+    _, _, terminated, _, info = env.step(0)
+    assert terminated
+    assert info["death_cause"] == "border"
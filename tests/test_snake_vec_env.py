@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from app.src.env.snake_env import SnakeEnv
+from app.src.env.snake_vec_env import SnakeVecEnv, BODY, FOOD, WALL
+
+
+# --- FIXTURE ---
+@pytest.fixture
+def vec_env():
+    env = SnakeVecEnv(n_envs=8, grid_size=10, seed=0)
+    env.reset()
+    return env
+
+
+# --- TESTS ---
+
+def test_reset_observation_contract(vec_env):
+    obs = vec_env.reset()
+    assert obs.shape == (8, 10, 10)
+    assert obs.dtype == np.int8
+    # Un serpent au centre et une pomme par partie
+    assert (obs == BODY).sum(axis=(1, 2)).tolist() == [1] * 8
+    assert (obs == FOOD).sum(axis=(1, 2)).tolist() == [1] * 8
+    assert (obs[:, 5, 5] == BODY).all()
+
+
+def test_border_collision_terminates_and_autoresets(vec_env):
+    # Le serpent part de (5, 5) : 5 pas vers le haut suffisent à sortir de la grille
+    vec_env.grids[:, :5, 5] = 0
+    vec_env.food[:] = (9, 9)
+    vec_env.grids[:] = np.where(vec_env.grids == FOOD, 0, vec_env.grids)
+    vec_env.grids[:, 9, 9] = FOOD
+
+    for _ in range(5):
+        obs, rewards, dones, infos = vec_env.step(np.zeros(8, dtype=np.int64))
+        assert not dones.any()
+        assert np.allclose(rewards, -0.01)
+
+    obs, rewards, dones, infos = vec_env.step(np.zeros(8, dtype=np.int64))
+    assert dones.all()
+    assert np.allclose(rewards, -1.0)
+    for info in infos:
+        assert info["episode"]["l"] == 6
+        assert info["episode"]["r"] == pytest.approx(-1.05)
+        assert info["TimeLimit.truncated"] is False
+        assert info["terminal_observation"][0, 5] == BODY
+    # Auto-reset : la nouvelle observation repart du centre
+    assert (obs[:, 5, 5] == BODY).all()
+
+
+def test_eating_grows_snake_and_respawns_food(vec_env):
+    vec_env.grids[:] = np.where(vec_env.grids == FOOD, 0, vec_env.grids)
+    vec_env.food[:] = (5, 6)
+    vec_env.grids[:, 5, 6] = FOOD
+
+    obs, rewards, dones, _ = vec_env.step(np.full(8, 3, dtype=np.int64))
+    assert np.allclose(rewards, 1.0)
+    assert not dones.any()
+    assert (vec_env.length == 2).all()
+    assert (obs == BODY).sum(axis=(1, 2)).tolist() == [2] * 8
+    assert (obs == FOOD).sum(axis=(1, 2)).tolist() == [1] * 8
+
+
+def test_truncation_after_max_steps():
+    env = SnakeVecEnv(n_envs=2, grid_size=10, max_steps=4, seed=1)
+    env.reset()
+    # Aller-retour gauche/droite sur une case libre : jamais de collision
+    env.grids[:] = np.where(env.grids == FOOD, 0, env.grids)
+    env.food[:] = (0, 0)
+    env.grids[:, 0, 0] = FOOD
+    for action in (2, 3, 2):
+        _, _, dones, _ = env.step(np.full(2, action, dtype=np.int64))
+        assert not dones.any()
+    _, _, dones, infos = env.step(np.full(2, 3, dtype=np.int64))
+    assert dones.all()
+    assert all(info["TimeLimit.truncated"] for info in infos)
+
+
+def test_walls_mode_spawns_and_expires_walls():
+    env = SnakeVecEnv(n_envs=64, grid_size=10, game_mode="walls", seed=2)
+    env.WALL_RANDOM_PROB = 1.0
+    env.reset()
+    env._update_walls()
+    assert env.has_wall.all()
+    assert ((env.grids == WALL).sum(axis=(1, 2)) == 1).all()
+
+    for _ in range(env.WALL_DURATION):
+        env._update_walls()
+    env.WALL_RANDOM_PROB = 0.0
+    env._update_walls()
+    assert not env.has_wall.any()
+    assert not (env.grids == WALL).any()
+
+
+def test_walls_timers_match_snake_env():
+    """Même cycle mur / recharge que SnakeEnv (3 steps de mur, 6 de recharge), step par step"""
+    single = SnakeEnv(grid_size=10, game_mode="walls")
+    single.reset(seed=4)
+    vec_env = SnakeVecEnv(n_envs=1, grid_size=10, game_mode="walls", seed=4)
+    vec_env.reset()
+    # Apparition forcée dans le coin (0, 0), loin du serpent qui tourne en carré au centre
+    for env in (single, vec_env):
+        env.WALL_RANDOM_PROB = 1.0
+    single._sample_empty_cell = lambda: (0, 0)
+    vec_env._sample_empty_cells = lambda idx: (np.zeros((len(idx), 2), dtype=np.int64), np.ones(len(idx), bool))
+    assert tuple(single.food) != (0, 0) and vec_env.grids[0, 0, 0] != FOOD
+
+    timers = []
+    for t in range(30):
+        action = (3, 1, 2, 0)[t % 4]
+        single.step(action)
+        vec_env.step(np.array([action]))
+        timers.append((single.wall_timer, single.wall_cooldown))
+        assert (int(vec_env.wall_timer[0]), int(vec_env.wall_cooldown[0])) == timers[-1], f"step {t}"
+    assert max(cooldown for _, cooldown in timers) == single.WALL_COOLDOWN_TIME
+
+
+def test_ppo_learns_on_batched_env():
+    from stable_baselines3 import PPO
+
+    env = SnakeVecEnv(n_envs=4, grid_size=6, seed=3)
+    agent = PPO("MlpPolicy", env, n_steps=32, batch_size=32, n_epochs=1, verbose=0)
+    agent.learn(total_timesteps=256)
+    assert agent.num_timesteps >= 256
+    assert len(agent.ep_info_buffer) > 0
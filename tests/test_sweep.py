@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+
+from app.src.agent.training.sweep import SuccessiveHalving, rung_budgets, run_sweep, sample_config
+
+
+def drain(scheduler, scores):
+    """Exécute l'ordonnanceur séquentiellement avec des scores fixes par essai"""
+    jobs = []
+    while (job := scheduler.next_job()) is not None:
+        jobs.append(job)
+        scheduler.report(job[0], job[1], scores[job[0]])
+    return jobs
+
+
+# --- TESTS ---
+
+def test_budgets_and_sampling():
+    assert rung_budgets(1_000, 9_000, 3) == [1_000, 3_000, 9_000]
+    assert rung_budgets(1_000, 5_000, 2) == [1_000, 2_000, 4_000, 5_000]
+
+    space = {"learning_rate": ("log", 1e-4, 1e-2), "gamma": ("uniform", 0.9, 0.99), "net_arch": [[32], [64, 64]]}
+    config = sample_config(space, np.random.default_rng(0))
+    assert 1e-4 <= config["learning_rate"] <= 1e-2 and 0.9 <= config["gamma"] <= 0.99
+    assert config["net_arch"] in space["net_arch"]
+    assert config == sample_config(space, np.random.default_rng(0))
+
+
+def test_successive_halving_keeps_the_top_third_per_rung():
+    scores = list(range(9))  # L'essai 8 est le meilleur
+    scheduler = SuccessiveHalving(9, [100, 300, 900], eta=3, mode="sha")
+    jobs = drain(scheduler, scores)
+
+    assert [job for job in jobs if job[1] == 1] == [(8, 1), (7, 1), (6, 1)]
+    assert [job for job in jobs if job[1] == 2] == [(8, 2)]
+    assert scheduler.best() == (8, 2, 8)
+
+
+def test_asha_promotes_without_waiting_for_the_whole_rung():
+    scheduler = SuccessiveHalving(9, [100, 300, 900], eta=3, mode="asha")
+    scores = [5, 1, 2, 0, 0, 0, 0, 0, 0]
+    jobs = drain(scheduler, scores)
+
+    # Dès 3 résultats au rung 0, le meilleur (essai 0) monte avant que les autres essais ne démarrent
+    assert jobs.index((0, 1)) < jobs.index((3, 0))
+    assert scheduler.best()[0] == 0
+    # Les essais faibles ne dépassent jamais le premier rung
+    assert all(rung == 0 for trial_id, rung in jobs if trial_id in (3, 4, 5))
+
+
+def test_sweep_registers_best_trial(tmp_path, monkeypatch):
+    monkeypatch.setenv("SNAKE_MODEL_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setenv("SNAKE_CATALOG_DIR", str(tmp_path / "catalog"))
+    space = {"learning_rate": ("log", 1e-4, 1e-3), "n_steps": [32, 64], "batch_size": [32], "n_envs": [2],
+             "net_arch": [[16], [32, 32]]}
+
+    summary = run_sweep(5, n_trials=3, cores=2, space=space, min_timesteps=128, max_timesteps=256, eta=2,
+                        eval_episodes=4, work_dir=str(tmp_path / "work"))
+
+    assert summary["budgets"] == [128, 256]
+    assert sum(t["max_rung"] == 1 for t in summary["trials"]) == 1
+    metadata = json.loads((tmp_path / "store" / "5x5" / summary["uuid"] / "metadata.json").read_text())
+    assert metadata["type"] == "sweep" and metadata["hyperparams"] == summary["best"]["config"]
+    assert metadata["grid_size"] == 5 and metadata["n_envs"] == 2
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import api
+from app.src.serving.hub import BroadcastHub
+
+
+async def next_message(stream):
+    return await asyncio.wait_for(stream.__anext__(), timeout=2)
+
+
+# --- TESTS ---
+
+@pytest.mark.asyncio
+async def test_subscriber_gets_latest_then_only_new_messages():
+    hub = BroadcastHub()
+    hub.publish("run:a", {"progress": 0.1})
+    hub.publish("run:a", {"progress": 0.2})
+
+    stream = hub.subscribe("run:a")
+    assert await next_message(stream) == {"progress": 0.2}  # Rattrapage coalescé
+
+    hub.publish("run:a", {"progress": 0.3})
+    assert await next_message(stream) == {"progress": 0.3}
+    await stream.aclose()
+    assert hub.subscriber_count("run:a") == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_keeps_most_recent_messages():
+    hub = BroadcastHub(queue_size=2)
+    stream = hub.subscribe("runs", initial={"n": 0})
+    assert await next_message(stream) == {"n": 0}
+
+    for n in range(1, 6):
+        hub.publish("runs", {"n": n})
+    assert [await next_message(stream), await next_message(stream)] == [{"n": 4}, {"n": 5}]
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_publish_from_another_thread():
+    hub = BroadcastHub()
+    stream = hub.subscribe("run:b", initial={"progress": 0})
+    await next_message(stream)
+
+    thread = threading.Thread(target=hub.publish, args=("run:b", {"progress": 1}))
+    thread.start()
+    thread.join()
+    assert await next_message(stream) == {"progress": 1}
+    await stream.aclose()
+
+
+def test_training_websockets_are_pushed_by_state_manager():
+    manager = api.training_manager
+    manager.update("hub-run", 0.5, [], {"mean_reward": 1.0}, 500, 1000)
+    try:
+        with TestClient(app) as client:
+            with client.websocket_connect("/api/ws/trainings") as runs_ws, \
+                    client.websocket_connect("/api/ws/training/hub-run") as run_ws:
+                assert "hub-run" in runs_ws.receive_json()["runs"]
+                assert run_ws.receive_json()["current_step"] == 500
+
+                manager.update("hub-run", 0.8, [], {"mean_reward": 2.0}, 800, 1000)
+                assert run_ws.receive_json()["stats"] == {"mean_reward": 2.0}
+
+                manager.stop_training("hub-run")
+                assert run_ws.receive_json() == {"status": "finished"}
+                assert "hub-run" not in runs_ws.receive_json()["runs"]
+    finally:
+        manager.stop_training("hub-run")
+
+
+def test_unknown_run_reports_finished():
+    with TestClient(app) as client:
+        with client.websocket_connect("/api/ws/training/never-started") as websocket:
+            assert websocket.receive_json() == {"status": "finished"}
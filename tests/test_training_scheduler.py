@@ -0,0 +1,99 @@
+import os
+import time
+
+from app.src.agent.training import train
+from app.src.agent.training.scheduler import TrainingScheduler
+from app.src.agent.training.train import TrainingStateManager
+
+
+def fake_train(run_id, timesteps=1, steps=10, delay=0.05, **kwargs):
+    """Remplace train_snake dans le worker : publie sa progression et respecte l'annulation"""
+    manager = train.training_manager
+    for i in range(steps):
+        if manager.should_stop(run_id):
+            manager.update(run_id, 0, [], {"status": "cancelled"}, 0, timesteps, status="cancelled")
+            return
+        manager.update(run_id, (i + 1) / steps, [], {"mean_reward": float(i)}, i + 1, steps)
+        time.sleep(delay)
+
+
+def crash_once_train(run_id, marker, **kwargs):
+    """Premier lancement : le processus meurt brutalement ; le suivant se termine normalement"""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(3)
+    train.training_manager.update(run_id, 1.0, [], {}, 1, 1)
+
+
+class RecordingStateManager(TrainingStateManager):
+    def __init__(self):
+        super().__init__()
+        self.history = []
+
+    def update(self, run_id, progress, grids, stats=None, timesteps=0, total_timesteps=1, status="running"):
+        self.history.append((run_id, status, progress))
+        super().update(run_id, progress, grids, stats, timesteps, total_timesteps, status)
+
+
+def wait_for(predicate, timeout=60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+# --- TESTS ---
+
+def test_jobs_run_out_of_process_in_fifo_order():
+    state = RecordingStateManager()
+    scheduler = TrainingScheduler(state, max_workers=1, nice=0, target=fake_train)
+    try:
+        assert scheduler.submit("job-1", timesteps=10, steps=5) == 0
+        assert scheduler.submit("job-2", timesteps=10, steps=5) == 1
+        assert state.get_status("job-2")["status"] == "queued"
+
+        # Terminés normalement : les entrées sont retirées du manager
+        assert wait_for(lambda: not state.active_trainings)
+        running = [run_id for run_id, status, _ in state.history if status == "running"]
+        assert running.index("job-1") < running.index("job-2")
+        assert ("job-1", "running", 1.0) in state.history
+        # Attente de job-2 (démarrage du worker de job-1 compris) : une publication par position, pas par tick
+        queued = [run_id for run_id, status, _ in state.history if status == "queued"]
+        assert queued.count("job-2") <= 2
+        assert wait_for(lambda: scheduler.stats() == {"max_workers": 1, "running": [], "queued": []})
+    finally:
+        scheduler.shutdown()
+
+
+def test_cancel_running_and_queued_jobs():
+    state = RecordingStateManager()
+    scheduler = TrainingScheduler(state, max_workers=1, nice=0, target=fake_train)
+    try:
+        scheduler.submit("long", timesteps=10, steps=1000, delay=0.05)
+        scheduler.submit("waiting", timesteps=10)
+        assert wait_for(lambda: (state.active_trainings.get("long") or {}).get("status") == "running")
+
+        assert scheduler.cancel("waiting")
+        assert scheduler.stats()["queued"] == []
+        assert scheduler.cancel("long")
+
+        assert wait_for(lambda: ("long", "cancelled", 0) in state.history)
+        assert state.get_status("long")["status"] == "cancelled"
+        assert wait_for(lambda: scheduler.stats()["running"] == [])
+        assert not any(run_id == "waiting" and status == "running" for run_id, status, _ in state.history)
+    finally:
+        scheduler.shutdown()
+
+
+def test_crashed_worker_is_restarted_with_the_same_run_id(tmp_path):
+    state = RecordingStateManager()
+    scheduler = TrainingScheduler(state, max_workers=1, nice=0, target=crash_once_train, max_restarts=1)
+    try:
+        scheduler.submit("flaky", timesteps=1, marker=str(tmp_path / "crashed"))
+        assert wait_for(lambda: ("flaky", "running", 1.0) in state.history)
+        assert wait_for(lambda: not state.active_trainings)
+        assert not any(status == "error" for _, status, _ in state.history)
+    finally:
+        scheduler.shutdown()
@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+import pytest
+import torch
+from stable_baselines3 import PPO
+
+from app.src.agent.optimizing.variants import (VARIANT_FILES, collect_states, distill, optimize_model,
+                                               quantize_int8)
+from app.src.env.snake_env import SnakeEnv
+from app.src.serving.inference import PolicyRunner, VariantRunner
+
+GRID = 6
+
+
+def decisive_agent():
+    """Policy non entraînée mais aux logits marqués (sinon l'argmax d'une policy quasi uniforme est du bruit)"""
+    agent = PPO("MlpPolicy", SnakeEnv(grid_size=GRID), verbose=0, seed=0)
+    with torch.no_grad():
+        agent.policy.action_net.weight.mul_(50)
+    return agent
+
+
+# --- TESTS ---
+
+def test_variants_follow_the_teacher():
+    agent = decisive_agent()
+    teacher = PolicyRunner(agent.policy)
+    states = collect_states(teacher, GRID, {"mode": "grid"}, n_states=2000)
+    actions, probs = teacher.predict_batch(states)
+
+    int8 = VariantRunner(quantize_int8(agent.policy), (GRID, GRID), "int8")
+    assert (int8.predict_batch(states)[0] == actions).mean() > 0.95
+    action, p = int8.predict(states[0])
+    assert 0 <= action < 4 and sum(p) == pytest.approx(1.0, abs=1e-5)
+
+    student = VariantRunner(distill(states[:1600], probs[:1600], hidden=(32,), epochs=10), (GRID, GRID), "distilled")
+    assert (student.predict_batch(states[1600:])[0] == actions[1600:]).mean() > 0.8
+    with pytest.raises(ValueError):
+        student.predict_batch(np.zeros((1, GRID + 1, GRID + 1), dtype=np.float32))
+
+
+def test_pipeline_stores_variants_and_manager_serves_them(model_store):
+    from app.routers.api import ModelManager
+
+    folder = model_store("uuid-variants", GRID, decisive_agent())
+    report = optimize_model("uuid-variants", n_states=1500, distill_hidden=(32,), distill_epochs=5)
+    metadata = json.loads((folder / "metadata.json").read_text())
+    assert set(metadata["variants"]) == {"full", *VARIANT_FILES}
+    for name, file in VARIANT_FILES.items():
+        assert (folder / file).is_file() and metadata["variants"][name]["file"] == file
+        assert metadata["variants"][name]["latency_us_p50"] > 0
+    assert report["int8"]["bytes"] < report["full"]["bytes"]
+
+    entry = ModelManager(variant="int8", min_agreement=0.0).ensure_loaded("uuid-variants", GRID)
+    assert entry.variant == "int8" and entry.agent is None and isinstance(entry.runner, VariantRunner)
+    assert 0 <= entry.runner.predict(np.zeros((GRID, GRID), dtype=np.float32))[0] < 4
+
+    # Accord insuffisant : repli sur le modèle complet
+    entry = ModelManager(variant="distilled", min_agreement=1.01).ensure_loaded("uuid-variants", GRID)
+    assert entry.variant == "full" and isinstance(entry.runner, PolicyRunner)
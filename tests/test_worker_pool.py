@@ -0,0 +1,119 @@
+import gc
+
+import httpx
+import numpy as np
+import pytest
+import torch
+from fastapi.testclient import TestClient
+from stable_baselines3 import PPO
+
+from app.routers.serving import ModelManager
+from app.src.env.snake_env import SnakeEnv
+from app.src.serving.inference import PolicyRunner
+from app.src.serving.model_cache import LoadedModel
+from app.src.serving.worker_pool import InferencePool, PooledRunner
+
+BASE_URL = "http://testserver"
+GRID = 6
+
+
+# --- FIXTURE ---
+@pytest.fixture(scope="module")
+def pool():
+    pool = InferencePool(n_workers=2, torch_threads=1)
+    yield pool
+    pool.close()
+
+
+# --- TESTS ---
+
+def test_workers_serve_the_shared_weights(pool):
+    agent = PPO("MlpPolicy", SnakeEnv(grid_size=GRID), verbose=0, seed=0)
+    runner = pool.register("shared", agent.policy)
+    states = np.random.default_rng(0).integers(0, 4, size=(16, GRID, GRID)).astype(np.float32)
+
+    actions, probs = runner.predict_batch(states)
+    expected_actions, expected_probs = PolicyRunner(agent.policy).predict_batch(states)
+    np.testing.assert_array_equal(actions, expected_actions)
+    np.testing.assert_allclose(probs, expected_probs, atol=1e-6)
+
+    # Les workers lisent les poids du processus API (pas une copie) : logits à zéro → probabilités uniformes
+    with torch.no_grad():
+        agent.policy.action_net.weight.zero_()
+        agent.policy.action_net.bias.zero_()
+    np.testing.assert_allclose(runner.predict_batch(states)[1], 0.25, atol=1e-6)
+    assert pool.shared_bytes > 0
+
+    # Batchs simultanés : répartis sur les deux workers
+    completed = list(pool.stats()["completed"])
+    for future in [runner.submit(states) for _ in range(6)]:
+        future.result(timeout=30)
+    assert all(after > before for after, before in zip(pool.stats()["completed"], completed))
+
+    with pytest.raises(ValueError):
+        runner.submit(states[:, :3])  # Refusé avant l'envoi : erreur client
+    with pytest.raises(RuntimeError):
+        pool.submit("unknown", states).result(timeout=30)  # Échec côté worker : erreur serveur
+
+    # Évincé mais encore référencé : servi jusqu'à la libération du dernier runner
+    pool.unregister("shared")
+    assert "shared" in pool and runner.predict_batch(states)[0].shape == (16,)
+    del runner
+    gc.collect()
+    assert "shared" not in pool
+
+
+@pytest.mark.asyncio
+async def test_manager_routes_full_models_through_the_pool(pool, model_store, monkeypatch):
+    from app.main import app
+    from app.routers import serving
+
+    model_store("uuid-pool", GRID)
+    manager = ModelManager(cache_mb=0)
+    manager.pool = pool
+    monkeypatch.setattr(serving, "manager", manager)
+    entry = manager.ensure_loaded("uuid-pool", GRID)
+    assert isinstance(entry.runner, PooledRunner) and "uuid-pool" in pool
+
+    grid = [[0] * GRID for _ in range(GRID)]
+    grid[3][3], grid[0][1] = 1, 2
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=BASE_URL) as ac:
+        response = await ac.post("/api/predict", json={"grid": grid, "uuid": "uuid-pool"})
+        assert (await ac.get("/api/inference/pool")).json()["workers"] == 2
+    expected = PolicyRunner(entry.agent.policy).predict(np.array(grid, dtype=np.float32))
+    assert response.json()["action"] == expected[0]
+
+    # Budget nul : le modèle suivant évince celui-ci, que les workers relâchent
+    del entry
+    manager.cache.put(LoadedModel("other", GRID, None, None, 1))
+    gc.collect()
+    assert "uuid-pool" not in manager.cache and "uuid-pool" not in pool
+
+
+def test_session_keeps_playing_after_its_model_is_evicted(pool, model_store, monkeypatch):
+    from app.main import app
+    from app.routers import serving
+
+    model_store("uuid-session", GRID)
+    manager = ModelManager(cache_mb=0)
+    manager.pool = pool
+    monkeypatch.setattr(serving, "manager", manager)
+    monkeypatch.setattr(serving, "GAME_TICK_SECONDS", 0.001)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/api/ws/game") as websocket:
+            websocket.send_json({"type": "start", "uuid": "uuid-session", "grid_size": GRID,
+                                 "session_id": "pool-session"})
+            assert websocket.receive_json()["type"] == "snapshot"
+
+            manager.cache.put(LoadedModel("other", GRID, None, None, 1))  # Évince le modèle de la partie
+            assert "uuid-session" not in manager.cache and "uuid-session" in pool
+            # Nouvelle partie (la précédente a pu mourir) : sa première frame vient du modèle évincé
+            websocket.send_json({"type": "reset"})
+            while websocket.receive_json()["type"] != "snapshot":
+                pass
+            assert websocket.receive_json()["type"] == "frame"
+
+    serving.game_sessions.remove("pool-session")
+    gc.collect()
+    assert "uuid-session" not in pool
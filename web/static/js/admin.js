@@ -11,8 +11,7 @@ const ignoredJobs = new Set();
 
 document.addEventListener('DOMContentLoaded', () => {
     loadModels();
-    syncActiveJobs();
-    setInterval(syncActiveJobs, 5000);
+    connectRunsFeed();
     updateTimestepDisplay();
 });
 
@@ -138,10 +137,27 @@ function modifyTimesteps(amount) {
 function updateTimestepDisplay() { document.getElementById('ts-display').innerText = currentTimesteps.toLocaleString('en-US'); }
 
 // --- MONITORING (ANTI-CLIGNOTEMENT) ---
-async function syncActiveJobs() {
+// La liste des runs est poussée par le serveur à chaque création / fin de run
+function connectRunsFeed() {
+    const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const socket = new WebSocket(`${wsProtocol}//${window.location.host}/api/ws/trainings`);
+    socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type === 'runs') syncActiveJobs(data.runs);
+    };
+    // Reconnexion (redémarrage serveur, coupure réseau) avec resynchronisation HTTP
+    socket.onclose = () => setTimeout(() => { fetchActiveJobs(); connectRunsFeed(); }, 3000);
+}
+
+async function fetchActiveJobs() {
     try {
         const res = await fetch(`${API_BASE_URL}/api/train/active`);
-        const ids = await res.json();
+        syncActiveJobs(await res.json());
+    } catch(e) {}
+}
+
+function syncActiveJobs(ids) {
+    try {
         const msg = document.getElementById('no-jobs-msg');
 
         // Filtrer les IDs : on ne garde que ceux qui ne sont PAS dans la liste ignorée
@@ -246,6 +262,13 @@ function listenToJob(runId) {
             return;
         }
 
+        if (data.stats && data.stats.status === 'queued') {
+            // En file d'attente : aucun worker d'entraînement libre pour l'instant
+            const stepsEl = document.getElementById(`steps-${runId}`);
+            if(stepsEl) stepsEl.innerText = `QUEUED (#${(data.stats.position || 0) + 1})`;
+            return;
+        }
+
         if (data.stats) {
             let current = data.current_step || 0;
             let total = data.total_steps || 1;
@@ -334,7 +357,8 @@ async function launchTraining() {
             ignoredJobs.delete(data.run_id);
             createJobCard(data.run_id);
             listenToJob(data.run_id);
-            showAlert("Started", `Sequence started (${currentTimesteps} steps).`, "success");
+            if (data.status === 'queued') showAlert("Queued", `Sequence queued (${currentTimesteps} steps).`, "success");
+            else showAlert("Started", `Sequence started (${currentTimesteps} steps).`, "success");
         }
     } catch(e) { showAlert("Error", "Failed to start", "error"); }
 }
\ No newline at end of file
@@ -1,5 +1,7 @@
 // On utilise l'origine dynamique pour fonctionner en local ET en prod sans changer le code
 const API_BASE_URL = window.location.origin;
+// Identifiant de session : chaque onglet garde son propre modèle côté serveur
+const SESSION_ID = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : String(Math.random()).slice(2);
 
 const canvas = document.getElementById('snakeCanvas');
 const ctx = canvas.getContext('2d');
@@ -21,17 +23,19 @@ let score = 0;
 let isPlaying = false;
 let isPaused = false;
 let isDead = false;
-let gameLoopInterval = null;
+
+// --- PARTIE CÔTÉ SERVEUR (WebSocket) ---
+// Le serveur fait tourner SnakeEnv + l'agent et pousse des frames delta à chaque tick
+let gameSocket = null;
+let activeModel = null;
 
 // --- INTERACTIVE VARIABLES ---
 let activeGameMode = 'classic'; // 'classic' ou 'walls' (déterminé par le modèle chargé)
 let walls = [];
-let wallTimer = 0;
-const WALL_DURATION = 2;
 
-// Logique Pomme
-let nextFoodManual = false;
+// Logique Pomme (la position choisie est utilisée par le serveur à la prochaine pomme)
 let isPlacingFood = false;
+let queuedFood = null;
 
 // Logique Mur
 let canPlaceWall = true;
@@ -77,21 +81,25 @@ function updateToolsState() {
 
 // --- BOUTON : PLAN NEXT FOOD ---
 function toggleFoodPlanning() {
+    if (!isPlaying || isDead) return;
+    isPlacingFood = !isPlacingFood;
+    if (isPlacingFood) {
+        setFoodButton('armed', "CLICK GRID NOW!");
+    } else {
+        setFoodButton(queuedFood ? 'armed' : null, queuedFood ? "WAITING FOR EAT..." : "🍎 PLAN NEXT FOOD");
+    }
+    draw();
+}
+
+function setFoodButton(cssClass, label) {
     const btn = document.getElementById('btn-plan-food');
-    nextFoodManual = !nextFoodManual;
+    btn.classList.toggle('armed', cssClass === 'armed');
+    btn.innerText = label;
+}
 
-    if (nextFoodManual) {
-        btn.classList.add('armed');
-        btn.innerText = "WAITING FOR EAT...";
-    } else {
-        btn.classList.remove('armed');
-        btn.innerText = "PLAN NEXT FOOD";
-        if (isPlacingFood) {
-            isPlacingFood = false;
-            isPlaying = true;
-            placeFood();
-            gameLoopInterval = setInterval(gameStep, 150);
-        }
+function sendCommand(message) {
+    if (gameSocket && gameSocket.readyState === WebSocket.OPEN) {
+        gameSocket.send(JSON.stringify(message));
     }
 }
 
@@ -153,122 +161,105 @@ function onCanvasClick(e) {
 
     if (col < 0 || col >= GRID_SIZE || row < 0 || row >= GRID_SIZE) return;
 
-    // 1. POMME
+    // 1. POMME : envoyée au serveur, posée à la prochaine pomme mangée
     if (isPlacingFood) {
         if (!snake.some(p => p.x === col && p.y === row) && !walls.some(w => w.x === col && w.y === row)) {
-            food = {x: col, y: row};
+            queuedFood = {x: col, y: row};
             isPlacingFood = false;
-            nextFoodManual = false;
-            document.getElementById('btn-plan-food').classList.remove('armed');
-            document.getElementById('btn-plan-food').innerText = "🍎 PLAN NEXT FOOD";
-
-            isPlaying = true;
-            statusText.innerText = "ONLINE - RUNNING";
-            statusText.style.color = "var(--text-main)";
-            gameLoopInterval = setInterval(gameStep, 150);
+            sendCommand({type: 'place_food', x: col, y: row});
+            setFoodButton('armed', "WAITING FOR EAT...");
             draw();
         }
     }
-    // 2. MUR
+    // 2. MUR : posé par le serveur dès que son cooldown le permet
     else if (isPlacingWall && activeGameMode === 'walls' && canPlaceWall) {
         if (!snake.some(p => p.x === col && p.y === row) && !(food.x === col && food.y === row)) {
-            walls.push({x: col, y: row});
-            wallTimer = WALL_DURATION + 1;
+            sendCommand({type: 'place_wall', x: col, y: row});
             startWallCooldown();
             draw();
         }
     }
 }
 
-// --- GAME LOOP ---
-async function gameStep() {
-    if (!isPlaying || isPaused || isDead) return;
-
-    if (walls.length > 0) {
-        wallTimer--;
-        if (wallTimer <= 0) walls = [];
-    }
-
-    let grid = Array(GRID_SIZE).fill().map(() => Array(GRID_SIZE).fill(0));
-    snake.forEach(p => grid[p.y][p.x] = 1);
-    grid[food.y][food.x] = 2;
-    walls.forEach(w => grid[w.y][w.x] = 3);
-
-    try {
-        const res = await fetch(`${API_BASE_URL}/api/predict`, {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({ grid: grid })
-        });
-
-        if (!res.ok) return;
-        const data = await res.json();
-
-        if (isPaused || !isPlaying) return;
-
-        if (data.probabilities) {
-            updateBrainBar('prob-up', data.probabilities[0]);
-            updateBrainBar('prob-down', data.probabilities[1]);
-            updateBrainBar('prob-left', data.probabilities[2]);
-            updateBrainBar('prob-right', data.probabilities[3]);
-        }
-
-        const actionsLabels = ["UP", "DOWN", "LEFT", "RIGHT"];
-        actionEl.innerText = actionsLabels[data.action] || "UNKNOWN";
-
-        moveSnake(data.action);
-        draw();
-
-    } catch (e) { console.error(e); }
+// --- FRAMES SERVEUR ---
+function toPoint(pair) {
+    return pair ? {x: pair[0], y: pair[1]} : null;
 }
 
-function moveSnake(action) {
-    let head = { ...snake[0] };
-    if (action === 0) head.y -= 1;
-    if (action === 1) head.y += 1;
-    if (action === 2) head.x -= 1;
-    if (action === 3) head.x += 1;
+function applySnapshot(msg) {
+    GRID_SIZE = msg.grid_size;
+    CELL_SIZE = canvas.width / GRID_SIZE;
+    snake = msg.snake.map(toPoint);
+    food = toPoint(msg.food) || {};
+    walls = msg.walls.map(toPoint);
+    score = msg.score;
+    scoreEl.innerText = score;
+    isDead = msg.dead;
+    isPaused = msg.paused;
+    isPlaying = !isDead;
+    draw();
+}
 
-    const hitWall = walls.some(w => w.x === head.x && w.y === head.y);
-    if (head.x < 0 || head.x >= GRID_SIZE || head.y < 0 || head.y >= GRID_SIZE ||
-        snake.some(p => p.x === head.x && p.y === head.y) || hitWall) {
-        gameOver();
-        return;
+function applyFrame(msg) {
+    // Delta : nouvelle tête, queue retirée, pomme / murs seulement s'ils ont changé
+    if (msg.head) snake.unshift(toPoint(msg.head));
+    if (msg.tail) snake.pop();
+    if (msg.food) {
+        food = toPoint(msg.food);
+        if (queuedFood) {
+            queuedFood = null;
+            setFoodButton(null, "🍎 PLAN NEXT FOOD");
+        }
     }
+    if (msg.walls) walls = msg.walls.map(toPoint);
 
-    snake.unshift(head);
+    if (msg.probs) {
+        updateBrainBar('prob-up', msg.probs[0]);
+        updateBrainBar('prob-down', msg.probs[1]);
+        updateBrainBar('prob-left', msg.probs[2]);
+        updateBrainBar('prob-right', msg.probs[3]);
+    }
+    const actionsLabels = ["UP", "DOWN", "LEFT", "RIGHT"];
+    actionEl.innerText = actionsLabels[msg.action] || "UNKNOWN";
 
-    if (head.x === food.x && head.y === food.y) {
-        score++;
-        scoreEl.innerText = score;
+    score = msg.score;
+    scoreEl.innerText = score;
 
-        if (nextFoodManual) {
-            isPlaying = false;
-            clearInterval(gameLoopInterval);
-            isPlacingFood = true;
-            statusText.innerText = "WAITING FOR PLACEMENT";
-            statusText.style.color = "var(--neon-pink)";
-            document.getElementById('btn-plan-food').innerText = "CLICK GRID NOW!";
-            draw();
-        } else {
-            placeFood();
-        }
+    if (msg.dead) {
+        gameOver();
     } else {
-        snake.pop();
+        draw();
     }
 }
 
-function placeFood() {
-    let valid = false;
-    while (!valid) {
-        food = {
-            x: Math.floor(Math.random() * GRID_SIZE),
-            y: Math.floor(Math.random() * GRID_SIZE)
-        };
-        const onSnake = snake.some(p => p.x === food.x && p.y === food.y);
-        const onWall = walls.some(w => w.x === food.x && w.y === food.y);
-        valid = !onSnake && !onWall;
+function connectGame(model) {
+    if (gameSocket) {
+        gameSocket.onclose = null;
+        gameSocket.close();
     }
+    const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    gameSocket = new WebSocket(`${protocol}://${window.location.host}/api/ws/game`);
+
+    gameSocket.onopen = () => {
+        gameSocket.send(JSON.stringify({
+            type: 'start', uuid: model.uuid, grid_size: model.grid_size,
+            game_mode: model.game_mode || 'classic', session_id: SESSION_ID
+        }));
+    };
+    gameSocket.onmessage = (event) => {
+        const msg = JSON.parse(event.data);
+        if (msg.type === 'snapshot') applySnapshot(msg);
+        else if (msg.type === 'frame') applyFrame(msg);
+        else if (msg.type === 'error') {
+            console.error(msg.message);
+            // Inférence en échec : le serveur a mis la partie en pause
+            if (msg.paused && !isPaused) togglePause();
+        }
+    };
+    gameSocket.onclose = () => {
+        // Reconnexion : le serveur reprend la session (même SESSION_ID) tant qu'elle n'est pas évincée
+        if (activeModel === model) setTimeout(() => connectGame(model), 1000);
+    };
 }
 
 function draw() {
@@ -306,7 +297,7 @@ function draw() {
         ctx.shadowBlur = 0;
     });
 
-    if (!isPlacingFood) {
+    if (food.x !== undefined) {
         ctx.shadowBlur = 15;
         ctx.shadowColor = "#bc13fe";
         ctx.fillStyle = "#bc13fe";
@@ -314,6 +305,14 @@ function draw() {
         ctx.shadowBlur = 0;
     }
 
+    // Prochaine pomme planifiée (en attente côté serveur)
+    if (queuedFood) {
+        ctx.strokeStyle = "#bc13fe";
+        ctx.lineWidth = 2;
+        ctx.strokeRect(queuedFood.x * CELL_SIZE + 3, queuedFood.y * CELL_SIZE + 3, CELL_SIZE - 6, CELL_SIZE - 6);
+        ctx.lineWidth = 1;
+    }
+
     snake.forEach((part, index) => {
         if (index === 0) {
             ctx.fillStyle = isDead ? "#ff0000" : "#00f3ff";
@@ -390,11 +389,12 @@ async function selectModel(model, cardElement) {
         const res = await fetch(`${API_BASE_URL}/api/load`, {
             method: 'POST',
             headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({ uuid: model.uuid, grid_size: model.grid_size })
+            body: JSON.stringify({ uuid: model.uuid, grid_size: model.grid_size, session_id: SESSION_ID })
         });
         if (res.ok) {
             GRID_SIZE = model.grid_size;
             CELL_SIZE = canvas.width / GRID_SIZE;
+            activeModel = model;
 
             activeModelNameEl.innerText = `AGENT: ${model.uuid.substring(0, 8)}`;
             activeModelNameEl.innerHTML += ` <span style="font-size:0.5em; color:var(--neon-pink)">[${model.grid_size}x${model.grid_size}]</span>`;
@@ -405,23 +405,12 @@ async function selectModel(model, cardElement) {
             overlayEl.style.display = 'none';
             pauseBtn.disabled = false;
             resetGame();
+            connectGame(model);
         }
     } catch (e) { console.error(e); }
 }
 
-async function resetGame() {
-    if (gameLoopInterval) clearInterval(gameLoopInterval);
-
-    try {
-        await fetch(`${API_BASE_URL}/api/start`, {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({ grid_size: GRID_SIZE })
-        });
-    } catch (e) {
-        console.error("Erreur métrique start_game:", e);
-    }
-
+function resetGame() {
     snake = [{x: Math.floor(GRID_SIZE/2), y: Math.floor(GRID_SIZE/2)}];
     score = 0;
     scoreEl.innerText = score;
@@ -429,23 +418,21 @@ async function resetGame() {
     isDead = false;
     isPaused = false;
     isPlacingFood = false;
-    nextFoodManual = false;
+    queuedFood = null;
     walls = [];
-    wallTimer = 0;
 
-    const btnFood = document.getElementById('btn-plan-food');
-    btnFood.classList.remove('armed');
-    btnFood.innerText = "🍎 PLAN NEXT FOOD";
+    setFoodButton(null, "🍎 PLAN NEXT FOOD");
 
     updateToolsState();
 
     statusText.innerText = "ONLINE - RUNNING";
     statusText.style.color = "var(--text-main)";
     pauseBtn.disabled = false;
+    pauseBtn.innerText = "PAUSE";
 
-    placeFood();
+    // Le serveur renvoie un snapshot de la nouvelle partie
+    sendCommand({type: 'reset'});
     draw();
-    gameLoopInterval = setInterval(gameStep, 150);
 }
 
 function updateBrainBar(elementId, probability) {
@@ -461,6 +448,7 @@ function updateBrainBar(elementId, probability) {
 function togglePause() {
     if (!isPlaying) return;
     isPaused = !isPaused;
+    sendCommand({type: isPaused ? 'pause' : 'resume'});
     if (isPaused) {
         statusText.innerText = "SYSTEM PAUSED";
         statusText.style.color = "#ffaa00";
@@ -475,7 +463,6 @@ function togglePause() {
 function gameOver() {
     isPlaying = false;
     isDead = true;
-    clearInterval(gameLoopInterval);
     statusText.innerText = "GAME OVER";
     pauseBtn.disabled = true;
     draw();